@@ -40,16 +40,17 @@ class EthereumInterface:
         # TODO: maybe find a better way to do this:
         Account.enable_unaudited_hdwallet_features()
 
-        # get pk and address of the top 20 accounts
+        # get pk and address of the top accounts (20 unless the deployer funded more)
+        num_accounts = self.testnet_data.get('num_accounts', 20)
         self.accounts = []
-        for i in range(20):
+        for i in range(num_accounts):
             account = Account.from_mnemonic(self.mnemonic, account_path=f"m/44'/60'/0'/0/{i}")
             self.accounts.append({
                 'address': account.address,
                 'private_key': account.key.hex()
             })
 
-        print('Accounts:', self.accounts)
+        print(f'Loaded {len(self.accounts)} accounts')
     
     @external
     def get_eth_balance(self, address: str) -> int:
@@ -96,7 +97,20 @@ class EthereumInterface:
         return transfer_events
 
     @external
-    def get_swap_history(self, sourceToken: str, targetToken: str) -> list:
+    def get_block_number(self) -> int:
+        w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        return w3.eth.block_number
+
+    def get_swap_events(self, from_block: int, to_block: int) -> list:
+        orderbook_address = self.testnet_data['orderbook_address']
+        orderbook_abi = self.testnet_data['orderbook_abi']
+        w3 = Web3(Web3.HTTPProvider(self.rpc_url))
+        contract = w3.eth.contract(address=orderbook_address, abi=orderbook_abi)
+        swap_events = contract.events.Swap().get_logs(from_block=from_block, to_block=to_block)
+        return swap_events
+
+    @external
+    def get_swap_history(self, sourceToken: str, targetToken: str, from_block: int = 0, to_block='latest') -> list:
         
         orderbook_address = self.testnet_data['orderbook_address']
         orderbook_abi = self.testnet_data['orderbook_abi']
@@ -104,7 +118,7 @@ class EthereumInterface:
         contract = w3.eth.contract(address=orderbook_address, abi=orderbook_abi)
         # on the orderbook: event Swap(address indexed user, address indexed sourceToken, address indexed targetToken, uint256 sourceAmount, uint256 targetAmount);
         # find events with targetToken = address_1 or address_2 and sourceToken is the other
-        swap_events = contract.events.Swap().get_logs(from_block=0, to_block='latest', argument_filters={'sourceToken': sourceToken, 'targetToken': targetToken})
+        swap_events = contract.events.Swap().get_logs(from_block=from_block, to_block=to_block, argument_filters={'sourceToken': sourceToken, 'targetToken': targetToken})
         
         return swap_events
 
@@ -322,6 +336,26 @@ class EthereumInterface:
             available_addresses = list(self.token_symbol_by_address.keys())
             raise ValueError(f"Token address '{address}' not found.")
 
+_shared_interfaces = {}
+
+def get_ethereum_interface(backend: str = "hardhat", num_accounts: int = 20) -> EthereumInterface:
+    """
+    Return the process-wide interface for `backend` ("hardhat" or "simulated").
+
+    Orchestrators share one instance so the simulated ledger's state is the
+    same everywhere it is read. `num_accounts` only applies to the simulated
+    ledger; the hardhat backend uses the accounts funded by the deployer.
+    """
+    if backend not in _shared_interfaces:
+        if backend == "hardhat":
+            _shared_interfaces[backend] = EthereumInterface()
+        elif backend == "simulated":
+            from agent_evm_interface.simulated_ledger import SimulatedEthereumInterface
+            _shared_interfaces[backend] = SimulatedEthereumInterface(num_accounts=num_accounts)
+        else:
+            raise ValueError(f"Unknown EVM backend '{backend}'. Use 'hardhat' or 'simulated'.")
+    return _shared_interfaces[backend]
+
 @init
 def initialize_evm_interface() -> EthereumInterface:
     ei = EthereumInterface()
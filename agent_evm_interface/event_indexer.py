@@ -0,0 +1,241 @@
+import logging
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    last_block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS swaps (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    user TEXT NOT NULL,
+    source_token TEXT NOT NULL,
+    target_token TEXT NOT NULL,
+    source_amount TEXT NOT NULL,
+    target_amount TEXT NOT NULL,
+    source_units REAL NOT NULL,
+    target_units REAL NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS idx_swaps_pair ON swaps (source_token, target_token, block_number);
+CREATE INDEX IF NOT EXISTS idx_swaps_user ON swaps (user, block_number);
+CREATE TABLE IF NOT EXISTS transfers (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    token TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    units REAL NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS idx_transfers_token ON transfers (token, block_number);
+CREATE INDEX IF NOT EXISTS idx_transfers_sender ON transfers (sender, block_number);
+CREATE INDEX IF NOT EXISTS idx_transfers_recipient ON transfers (recipient, block_number);
+"""
+
+
+class EventIndexer:
+    """
+    Local store of orderbook `Swap` and ERC20 `Transfer` logs.
+
+    Logs are pulled from the node incrementally: every `sync()` only asks for
+    blocks after the stored cursor, so price history, per-agent fills and
+    volume queries never rescan the chain. Amounts are kept verbatim as
+    decimal strings (uint256 does not fit in SQLite integers) next to a float
+    copy scaled by the token decimals for aggregation.
+    """
+
+    def __init__(self, ethereum_interface, db_path: str = ":memory:", max_block_range: int = 2000):
+        self.ethereum_interface = ethereum_interface
+        self.max_block_range = max_block_range
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._decimals: Dict[str, int] = {}
+
+    @property
+    def last_block(self) -> int:
+        row = self.conn.execute("SELECT last_block FROM cursor WHERE id = 0").fetchone()
+        return row[0] if row else -1
+
+    def _set_last_block(self, block_number: int):
+        self.conn.execute(
+            "INSERT INTO cursor (id, last_block) VALUES (0, ?) "
+            "ON CONFLICT (id) DO UPDATE SET last_block = excluded.last_block",
+            (block_number,)
+        )
+
+    def _units(self, token: str, amount: int) -> float:
+        if token not in self._decimals:
+            self._decimals[token] = self.ethereum_interface.get_erc20_info(token)['decimals']
+        return amount / (10 ** self._decimals[token])
+
+    def sync(self) -> Tuple[int, int]:
+        """
+        Ingest all logs between the cursor and the current head.
+
+        Returns the (from_block, to_block) range that was scanned, or an empty
+        range (from_block > to_block) when the store is already up to date.
+        """
+        head = self.ethereum_interface.get_block_number()
+        start = self.last_block + 1
+        from_block = start
+        while from_block <= head:
+            to_block = min(from_block + self.max_block_range - 1, head)
+            self._ingest_range(from_block, to_block)
+            from_block = to_block + 1
+        if start <= head:
+            logger.debug(f"Indexed blocks {start}-{head}")
+        return start, head
+
+    def _ingest_range(self, from_block: int, to_block: int):
+        swap_rows = []
+        for event in self.ethereum_interface.get_swap_events(from_block, to_block):
+            args = event['args']
+            swap_rows.append((
+                event['blockNumber'],
+                event['logIndex'],
+                event['transactionHash'].hex(),
+                args['user'],
+                args['sourceToken'],
+                args['targetToken'],
+                str(args['sourceAmount']),
+                str(args['targetAmount']),
+                self._units(args['sourceToken'], args['sourceAmount']),
+                self._units(args['targetToken'], args['targetAmount'])
+            ))
+
+        transfer_rows = []
+        for token_address in self.ethereum_interface.token_addresses:
+            events = self.ethereum_interface.get_erc20_transfer_events(token_address, from_block, to_block)
+            for event in events:
+                args = event['args']
+                transfer_rows.append((
+                    event['blockNumber'],
+                    event['logIndex'],
+                    event['transactionHash'].hex(),
+                    token_address,
+                    args['from'],
+                    args['to'],
+                    str(args['value']),
+                    self._units(token_address, args['value'])
+                ))
+
+        # Logs and cursor are committed together so a crash never skips blocks
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO swaps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", swap_rows
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?)", transfer_rows
+            )
+            self._set_last_block(to_block)
+
+    def get_swap_history(self, source_token: str, target_token: str,
+                         from_block: int = 0, to_block: Optional[int] = None) -> List[Dict]:
+        """Indexed equivalent of `EthereumInterface.get_swap_history`."""
+        to_block = self.last_block if to_block is None else to_block
+        rows = self.conn.execute(
+            "SELECT block_number, log_index, tx_hash, user, source_amount, target_amount "
+            "FROM swaps WHERE source_token = ? AND target_token = ? "
+            "AND block_number BETWEEN ? AND ? ORDER BY block_number, log_index",
+            (source_token, target_token, from_block, to_block)
+        ).fetchall()
+        return [{
+            'block_number': block_number,
+            'log_index': log_index,
+            'tx_hash': tx_hash,
+            'user': user,
+            'source_token': source_token,
+            'target_token': target_token,
+            'source_amount': int(source_amount),
+            'target_amount': int(target_amount)
+        } for block_number, log_index, tx_hash, user, source_amount, target_amount in rows]
+
+    def get_price_history(self, token: str, quote_token: str,
+                          from_block: int = 0, to_block: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Per-block volume-weighted execution price of `token` in `quote_token`,
+        combining buys (quote -> token) and sells (token -> quote).
+        """
+        to_block = self.last_block if to_block is None else to_block
+        rows = self.conn.execute(
+            "SELECT block_number, "
+            "SUM(CASE WHEN source_token = :quote THEN source_units ELSE target_units END), "
+            "SUM(CASE WHEN source_token = :quote THEN target_units ELSE source_units END) "
+            "FROM swaps "
+            "WHERE ((source_token = :quote AND target_token = :token) "
+            "    OR (source_token = :token AND target_token = :quote)) "
+            "AND block_number BETWEEN :from_block AND :to_block "
+            "GROUP BY block_number ORDER BY block_number",
+            {'token': token, 'quote': quote_token, 'from_block': from_block, 'to_block': to_block}
+        ).fetchall()
+        return [(block_number, quote_units / token_units) for block_number, quote_units, token_units in rows if token_units > 0]
+
+    def get_vwap(self, token: str, quote_token: str,
+                 from_block: int = 0, to_block: Optional[int] = None) -> Optional[float]:
+        """Volume-weighted execution price over a block range, None if no swaps."""
+        to_block = self.last_block if to_block is None else to_block
+        quote_units, token_units = self.conn.execute(
+            "SELECT "
+            "SUM(CASE WHEN source_token = :quote THEN source_units ELSE target_units END), "
+            "SUM(CASE WHEN source_token = :quote THEN target_units ELSE source_units END) "
+            "FROM swaps "
+            "WHERE ((source_token = :quote AND target_token = :token) "
+            "    OR (source_token = :token AND target_token = :quote)) "
+            "AND block_number BETWEEN :from_block AND :to_block",
+            {'token': token, 'quote': quote_token, 'from_block': from_block, 'to_block': to_block}
+        ).fetchone()
+        if not token_units:
+            return None
+        return quote_units / token_units
+
+    def get_agent_fills(self, address: str, from_block: int = 0, to_block: Optional[int] = None) -> List[Dict]:
+        """All swaps executed by `address`, oldest first."""
+        to_block = self.last_block if to_block is None else to_block
+        rows = self.conn.execute(
+            "SELECT block_number, tx_hash, source_token, target_token, source_units, target_units "
+            "FROM swaps WHERE user = ? AND block_number BETWEEN ? AND ? "
+            "ORDER BY block_number, log_index",
+            (address, from_block, to_block)
+        ).fetchall()
+        return [{
+            'block_number': block_number,
+            'tx_hash': tx_hash,
+            'source_token': source_token,
+            'target_token': target_token,
+            'source_amount': source_units,
+            'target_amount': target_units
+        } for block_number, tx_hash, source_token, target_token, source_units, target_units in rows]
+
+    def get_volume(self, token: str, from_block: int = 0, to_block: Optional[int] = None) -> float:
+        """Swap volume of `token` (in token units, both directions) over a block range."""
+        to_block = self.last_block if to_block is None else to_block
+        (volume,) = self.conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN source_token = :token THEN source_units ELSE target_units END), 0) "
+            "FROM swaps WHERE (source_token = :token OR target_token = :token) "
+            "AND block_number BETWEEN :from_block AND :to_block",
+            {'token': token, 'from_block': from_block, 'to_block': to_block}
+        ).fetchone()
+        return volume
+
+    def get_transfer_volume(self, token: str, from_block: int = 0, to_block: Optional[int] = None) -> float:
+        """Total `Transfer` volume of `token` over a block range."""
+        to_block = self.last_block if to_block is None else to_block
+        (volume,) = self.conn.execute(
+            "SELECT COALESCE(SUM(units), 0) FROM transfers "
+            "WHERE token = ? AND block_number BETWEEN ? AND ?",
+            (token, from_block, to_block)
+        ).fetchone()
+        return volume
+
+    def close(self):
+        self.conn.close()
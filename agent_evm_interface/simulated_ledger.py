@@ -0,0 +1,369 @@
+import hashlib
+import json
+import math
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from agent_evm_interface.agent_evm_interface import EthereumInterface
+
+
+MAX_UINT256 = float(2**256 - 1)
+DECIMALS = 18
+
+
+def _fake_address(label: str) -> str:
+    digest = hashlib.sha256(label.encode()).hexdigest()
+    return '0x' + digest[:40]
+
+
+class SimulatedEthereumInterface(EthereumInterface):
+    """
+    In-process stand-in for `EthereumInterface` backed by NumPy arrays.
+
+    Exposes the same methods the crypto mechanism and orchestrator use
+    (balances, allowances, mint/transfer/approve, `get_pair_info` pricing and
+    fee-charging `swap`) and replays the OrderBook contract's constant-product
+    formula, so a round costs array updates instead of JSON-RPC round-trips.
+
+    Balances, allowances and pool reserves are float64 matrices in base units
+    (account x token, token x token). Amounts therefore carry ~15 significant
+    digits rather than exact uint256 arithmetic, and no gas is charged.
+    Every state-changing call mines one block and emits the same `Swap` /
+    `Transfer` events as the contracts, so `EventIndexer` works unchanged.
+    It subclasses `EthereumInterface` only so it can be passed wherever the
+    real interface is expected; none of the web3 code paths are used.
+    """
+
+    def __init__(
+        self,
+        token_config_path: Optional[str] = None,
+        num_accounts: int = 20,
+        fee: int = 1,
+        pool_base_amount: int = 10000,
+        initial_eth: float = 10000.0
+    ):
+        self.rpc_url = None
+        self.fee = fee
+
+        if token_config_path is None:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            token_config_path = os.path.join(os.path.dirname(current_dir), 'agent_evm_testnet/testnet.json')
+        with open(token_config_path, 'r') as f:
+            token_config = json.load(f)['tokens']
+
+        self.token_symbols = [token['symbol'] for token in token_config]
+        self.token_address_by_symbol = {symbol: _fake_address(f"token:{symbol}") for symbol in self.token_symbols}
+        self.token_addresses = [self.token_address_by_symbol[symbol] for symbol in self.token_symbols]
+        self.token_symbol_by_address = {
+            address: symbol for symbol, address in self.token_address_by_symbol.items()
+        }
+        self.token_index = {address: i for i, address in enumerate(self.token_addresses)}
+        orderbook_address = _fake_address("orderbook")
+
+        self.testnet_data = {
+            'orderbook_address': orderbook_address,
+            'orderbook_abi': [],
+            'token_addresses': self.token_address_by_symbol,
+            'token_symbols': self.token_symbols,
+            'token_abi': [],
+            'initial_prices': {token['symbol']: token['initial_price_usd'] for token in token_config},
+            'num_accounts': num_accounts
+        }
+
+        self.accounts = []
+        for i in range(num_accounts):
+            private_key = '0x' + hashlib.sha256(f"account:{i}".encode()).hexdigest()
+            self.accounts.append({
+                'address': _fake_address(private_key),
+                'private_key': private_key
+            })
+        self.address_by_key = {account['private_key']: account['address'] for account in self.accounts}
+        self.minter_address = self.accounts[0]['address']
+
+        n_tokens = len(self.token_symbols)
+        capacity = max(64, num_accounts + 1)
+        self.row_by_address: Dict[str, int] = {}
+        self.balances = np.zeros((capacity, n_tokens))
+        self.allowances = np.zeros((capacity, n_tokens))
+        self.eth_balances = np.zeros(capacity)
+        self.total_supply = np.zeros(n_tokens)
+        # reserves[a, b] mirrors OrderBook.total_pool_balance[a][b]
+        self.reserves = np.zeros((n_tokens, n_tokens))
+        # Allowances to spenders other than the orderbook are rare, keep them sparse
+        self.other_allowances: Dict[tuple, float] = {}
+
+        self.block_number = 0
+        self.swap_events: List[dict] = []
+        self.transfer_events: List[dict] = []
+
+        self.orderbook_row = self._row(orderbook_address)
+        for account in self.accounts:
+            self.eth_balances[self._row(account['address'])] = initial_eth * 10**18
+
+        # Same bootstrap as testnet_deployer: mint supply to account[0] and seed TOKEN-USDC pools
+        quote = self.token_index[self.token_address_by_symbol['USDC']]
+        minter_row = self._row(self.minter_address)
+        for token in token_config:
+            t = self.token_index[self.token_address_by_symbol[token['symbol']]]
+            self._mint(minter_row, t, token['initial_supply'] * 10**DECIMALS)
+        for token in token_config:
+            if token['symbol'] == 'USDC':
+                continue
+            t = self.token_index[self.token_address_by_symbol[token['symbol']]]
+            token_amount = pool_base_amount * 10**DECIMALS
+            usdc_amount = math.floor(pool_base_amount * token['initial_price_usd'] * 10**DECIMALS)
+            self._transfer(minter_row, self.orderbook_row, t, token_amount)
+            self._transfer(minter_row, self.orderbook_row, quote, usdc_amount)
+            self.reserves[t, quote] += token_amount
+            self.reserves[quote, t] += usdc_amount
+
+    # -- internal state helpers -------------------------------------------
+
+    def _row(self, address: str) -> int:
+        row = self.row_by_address.get(address)
+        if row is None:
+            row = len(self.row_by_address)
+            if row >= self.balances.shape[0]:
+                self._grow(2 * self.balances.shape[0])
+            self.row_by_address[address] = row
+        return row
+
+    def _grow(self, capacity: int):
+        extra = capacity - self.balances.shape[0]
+        self.balances = np.vstack([self.balances, np.zeros((extra, self.balances.shape[1]))])
+        self.allowances = np.vstack([self.allowances, np.zeros((extra, self.allowances.shape[1]))])
+        self.eth_balances = np.concatenate([self.eth_balances, np.zeros(extra)])
+
+    def _sender(self, private_key: str) -> str:
+        try:
+            return self.address_by_key[private_key]
+        except KeyError:
+            raise ValueError("Unknown private key for simulated ledger")
+
+    def _token(self, contract_address: str) -> int:
+        try:
+            return self.token_index[contract_address]
+        except KeyError:
+            raise ValueError(f"Token address '{contract_address}' not found.")
+
+    def _next_tx(self, label: str) -> str:
+        self.block_number += 1
+        return hashlib.sha256(f"{self.block_number}:{label}".encode()).hexdigest()
+
+    def _log(self, events: List[dict], tx_hash: str, args: dict, address: str):
+        events.append({
+            'address': address,
+            'blockNumber': self.block_number,
+            'logIndex': len(events),
+            'transactionHash': bytes.fromhex(tx_hash),
+            'args': args
+        })
+
+    def _mint(self, row: int, t: int, amount: float):
+        self.balances[row, t] += amount
+        self.total_supply[t] += amount
+
+    def _transfer(self, from_row: int, to_row: int, t: int, amount: float):
+        if self.balances[from_row, t] < amount:
+            raise ValueError("ERC20: transfer amount exceeds balance")
+        self.balances[from_row, t] -= amount
+        self.balances[to_row, t] += amount
+
+    # -- EthereumInterface API --------------------------------------------
+
+    def get_block_number(self) -> int:
+        return self.block_number
+
+    def get_eth_balance(self, address: str) -> int:
+        row = self.row_by_address.get(address)
+        return 0 if row is None else int(self.eth_balances[row])
+
+    def get_erc20_balance(self, address: str, contract_address: str) -> int:
+        t = self._token(contract_address)
+        row = self.row_by_address.get(address)
+        return 0 if row is None else int(self.balances[row, t])
+
+    def get_erc20_allowance(self, owner: str, spender: str, contract_address: str) -> int:
+        t = self._token(contract_address)
+        if spender == self.testnet_data['orderbook_address']:
+            row = self.row_by_address.get(owner)
+            allowance = 0.0 if row is None else self.allowances[row, t]
+        else:
+            allowance = self.other_allowances.get((owner, spender, t), 0.0)
+        return 2**256 - 1 if allowance >= MAX_UINT256 else int(allowance)
+
+    def get_erc20_info(self, contract_address: str) -> dict:
+        t = self._token(contract_address)
+        return {
+            'total_supply': int(self.total_supply[t]),
+            'decimals': DECIMALS,
+            'symbol': self.token_symbols[t]
+        }
+
+    def get_erc20_transfer_events(self, contract_address: str, from_block: int, to_block) -> list:
+        to_block = self.block_number if to_block == 'latest' else to_block
+        return [
+            event for event in self.transfer_events
+            if event['address'] == contract_address and from_block <= event['blockNumber'] <= to_block
+        ]
+
+    def get_swap_events(self, from_block: int, to_block) -> list:
+        to_block = self.block_number if to_block == 'latest' else to_block
+        return [event for event in self.swap_events if from_block <= event['blockNumber'] <= to_block]
+
+    def get_swap_history(self, sourceToken: str, targetToken: str, from_block: int = 0, to_block='latest') -> list:
+        return [
+            event for event in self.get_swap_events(from_block, to_block)
+            if event['args']['sourceToken'] == sourceToken and event['args']['targetToken'] == targetToken
+        ]
+
+    def _price(self, sell: int, buy: int) -> int:
+        sell_balance = self.reserves[sell, buy]
+        buy_balance = self.reserves[buy, sell]
+        if sell_balance <= 0 or buy_balance <= 0:
+            raise ValueError("Insufficient liquidity")
+        return int(buy_balance * 1e18 // sell_balance)
+
+    def get_pair_info(self, token0: str, token1: str) -> dict:
+        t0, t1 = self._token(token0), self._token(token1)
+        return {
+            'token0_balance': int(self.balances[self.orderbook_row, t0]),
+            'token1_balance': int(self.balances[self.orderbook_row, t1]),
+            'token0_price_in_token1': self._price(t0, t1),
+            'token1_price_in_token0': self._price(t1, t0)
+        }
+
+    def send_eth(self, to: str, amount: int, private_key: str) -> str:
+        from_row = self._row(self._sender(private_key))
+        if self.eth_balances[from_row] < amount:
+            raise ValueError("Insufficient funds for transfer")
+        self.eth_balances[from_row] -= amount
+        self.eth_balances[self._row(to)] += amount
+        return self._next_tx(f"eth:{to}:{amount}")
+
+    def send_erc20(self, to: str, amount: int, contract_address: str, private_key: str) -> str:
+        sender = self._sender(private_key)
+        t = self._token(contract_address)
+        self._transfer(self._row(sender), self._row(to), t, amount)
+        tx_hash = self._next_tx(f"transfer:{sender}:{to}:{amount}")
+        self._log(self.transfer_events, tx_hash, {'from': sender, 'to': to, 'value': int(amount)}, contract_address)
+        return tx_hash
+
+    def mint_erc20(self, to: str, amount: int, contract_address: str, minter_private_key: str) -> str:
+        if self._sender(minter_private_key) != self.minter_address:
+            raise ValueError("Only owner can mint")
+        self._mint(self._row(to), self._token(contract_address), amount)
+        tx_hash = self._next_tx(f"mint:{to}:{amount}")
+        self._log(self.transfer_events, tx_hash, {'from': '0x' + '0' * 40, 'to': to, 'value': int(amount)}, contract_address)
+        return tx_hash
+
+    def approve_erc20(self, spender: str, amount: int, contract_address: str, private_key: str) -> str:
+        owner = self._sender(private_key)
+        t = self._token(contract_address)
+        if spender == self.testnet_data['orderbook_address']:
+            self.allowances[self._row(owner), t] = amount
+        else:
+            self.other_allowances[(owner, spender, t)] = float(amount)
+        return self._next_tx(f"approve:{owner}:{spender}:{amount}")
+
+    def _swap(self, row: int, source: int, amount: float, target: int) -> float:
+        if amount <= 0:
+            raise ValueError("Amount must be greater than 0")
+        if source == target:
+            raise ValueError("Cannot swap same token")
+        source_reserve = self.reserves[source, target]
+        target_reserve = self.reserves[target, source]
+        if source_reserve <= 0 or target_reserve <= 0:
+            raise ValueError("Insufficient liquidity")
+
+        amount_in_with_fee = amount * (1000 - self.fee)
+        target_amount = math.floor(amount_in_with_fee * target_reserve / (source_reserve * 1000 + amount_in_with_fee))
+        if target_amount <= 0:
+            raise ValueError("Insufficient output amount")
+
+        allowance = self.allowances[row, source]
+        if allowance < amount:
+            raise ValueError("ERC20: insufficient allowance")
+        if self.balances[row, source] < amount:
+            raise ValueError("ERC20: transfer amount exceeds balance")
+        if allowance < MAX_UINT256:
+            self.allowances[row, source] = allowance - amount
+        self._transfer(row, self.orderbook_row, source, amount)
+        self._transfer(self.orderbook_row, row, target, target_amount)
+        self.reserves[source, target] += amount
+        self.reserves[target, source] -= target_amount
+        return target_amount
+
+    def swap(self, source_token_address: str, source_token_amount: int, target_token_address: str, private_key: str) -> str:
+        user = self._sender(private_key)
+        source, target = self._token(source_token_address), self._token(target_token_address)
+        target_amount = self._swap(self._row(user), source, source_token_amount, target)
+
+        tx_hash = self._next_tx(f"swap:{user}:{source_token_amount}")
+        orderbook_address = self.testnet_data['orderbook_address']
+        self._log(self.swap_events, tx_hash, {
+            'user': user,
+            'sourceToken': source_token_address,
+            'targetToken': target_token_address,
+            'sourceAmount': int(source_token_amount),
+            'targetAmount': int(target_amount)
+        }, orderbook_address)
+        self._log(self.transfer_events, tx_hash, {'from': user, 'to': orderbook_address, 'value': int(source_token_amount)}, source_token_address)
+        self._log(self.transfer_events, tx_hash, {'from': orderbook_address, 'to': user, 'value': int(target_amount)}, target_token_address)
+        return tx_hash
+
+    def get_token_address(self, symbol: str) -> str:
+        """Get token address by symbol"""
+        try:
+            return self.token_address_by_symbol[symbol]
+        except KeyError:
+            available_tokens = list(self.token_address_by_symbol.keys())
+            raise ValueError(f"Token symbol '{symbol}' not found. Available tokens: {available_tokens}")
+
+    def get_token_symbol(self, address: str) -> str:
+        """Get token symbol by address"""
+        try:
+            return self.token_symbol_by_address[address]
+        except KeyError:
+            raise ValueError(f"Token address '{address}' not found.")
+
+    # -- vectorized helpers -------------------------------------------------
+
+    def get_erc20_balances(self, addresses: Sequence[str]) -> np.ndarray:
+        """Balances of every token for many addresses at once, shape (len(addresses), n_tokens) in base units."""
+        rows = np.fromiter((self.row_by_address.get(address, -1) for address in addresses), dtype=np.int64, count=len(addresses))
+        # Unknown addresses hold nothing; reading them must not allocate ledger rows
+        balances = self.balances[rows]
+        balances[rows < 0] = 0
+        return balances
+
+    def get_prices(self, quote_symbol: str = 'USDC') -> Dict[str, float]:
+        """Spot price of every pooled token in `quote_symbol` units, computed from the reserve matrix in one step."""
+        q = self.token_index[self.token_address_by_symbol[quote_symbol]]
+        token_reserves = self.reserves[:, q]
+        quote_reserves = self.reserves[q, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            prices = np.where(token_reserves > 0, quote_reserves / token_reserves, 0.0)
+        return {symbol: float(prices[i]) for i, symbol in enumerate(self.token_symbols) if i != q and prices[i] > 0}
+
+    def mint_erc20_batch(self, addresses: Sequence[str], amounts: Dict[str, int], minter_private_key: str) -> str:
+        """
+        Mint `amounts[symbol]` of every listed token to each address in one
+        transaction: a single array update per token, with the same `Transfer`
+        events as calling `mint_erc20` for each of them.
+        """
+        if self._sender(minter_private_key) != self.minter_address:
+            raise ValueError("Only owner can mint")
+        rows = np.fromiter((self._row(address) for address in addresses), dtype=np.int64, count=len(addresses))
+        tx_hash = self._next_tx(f"mint_batch:{len(rows)}")
+        for symbol, amount in amounts.items():
+            contract_address = self.get_token_address(symbol)
+            t = self.token_index[contract_address]
+            self.balances[rows, t] += amount
+            for address in addresses:
+                # Accumulated per mint so the float64 supply matches the per-call path
+                self.total_supply[t] += amount
+                self._log(self.transfer_events, tx_hash, {'from': '0x' + '0' * 40, 'to': address, 'value': int(amount)}, contract_address)
+        return tx_hash
@@ -6,6 +6,9 @@ from pathlib import Path
 import solcx
 import os
 import subprocess
+import argparse
+import time
+from contextlib import contextmanager
 
 is_compiled = False
 
@@ -230,6 +233,169 @@ class OrderBookTestDeployer:
         """Get current fee setting"""
         return contract.functions.fee().call()
     
+class NoncePipeline:
+    """
+    Submits transactions from a single sender without waiting for each receipt.
+
+    Nonces are tracked locally so up to `batch_size` transactions (any number
+    if it is None) can be in flight; `flush()` then waits for all outstanding
+    receipts at once. Accounts unlocked on the node are sent with
+    `send_transaction`, any other account is signed locally with its private
+    key. `on_mined(tx_hash)` is called for each successful receipt, so callers
+    can record progress as it lands.
+    """
+    def __init__(self, w3, address, private_key=None, batch_size=100, on_mined=None):
+        self.w3 = w3
+        self.address = address
+        self.private_key = private_key
+        self.batch_size = batch_size
+        self.on_mined = on_mined
+        self.nonce = w3.eth.get_transaction_count(address, 'pending')
+        self.gas_price = w3.eth.gas_price
+        self.pending = []
+
+    def _send(self, tx):
+        tx['nonce'] = self.nonce
+        tx['gasPrice'] = self.gas_price
+        if self.private_key:
+            signed = Account.sign_transaction(tx, self.private_key)
+            tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+        else:
+            tx_hash = self.w3.eth.send_transaction(tx)
+        self.nonce += 1
+        self.pending.append(tx_hash)
+        if self.batch_size is not None and len(self.pending) >= self.batch_size:
+            self.flush()
+        return tx_hash
+
+    def call(self, contract_function, gas):
+        """Queue a contract function call"""
+        tx = contract_function.build_transaction({
+            'from': self.address,
+            'nonce': self.nonce,
+            'gas': gas,
+            'gasPrice': self.gas_price
+        })
+        return self._send(tx)
+
+    def transfer(self, to, value):
+        """Queue a plain ETH transfer"""
+        return self._send({
+            'from': self.address,
+            'to': to,
+            'value': value,
+            'gas': 21000,
+            'chainId': self.w3.eth.chain_id
+        })
+
+    def flush(self):
+        """Wait for every outstanding transaction, in submission order, and raise at the first that reverted"""
+        pending, self.pending = self.pending, []
+        for tx_hash in pending:
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            if receipt.status != 1:
+                raise Exception(f"Transaction {tx_hash.hex()} reverted")
+            if self.on_mined is not None:
+                self.on_mined(tx_hash)
+
+
+def derive_accounts(mnemonic, num_accounts):
+    """Derive the first `num_accounts` accounts from the mnemonic"""
+    Account.enable_unaudited_hdwallet_features()
+    accounts = []
+    for i in range(num_accounts):
+        account = Account.from_mnemonic(mnemonic, account_path=f"m/44'/60'/0'/0/{i}")
+        accounts.append({
+            'address': account.address,
+            'private_key': account.key.hex()
+        })
+    return accounts
+
+
+def save_checkpoint(data, path='testnet_data.json'):
+    """Atomically write deployment data so an interrupted run can resume from it"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def timed_stage(name, timings):
+    print(f"\n[{name}] starting...")
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    timings[name] = timings.get(name, 0.0) + elapsed
+    print(f"[{name}] done in {elapsed:.2f}s")
+
+
+def fund_accounts(w3, data, accounts, erc20_abi, orderbook_address, token_amounts, eth_amount, batch_size, timings):
+    """
+    Fund derived accounts with ETH and tokens and approve the orderbook for them.
+
+    Work is split into chunks of `batch_size` accounts. Each chunk is
+    submitted with pipelined nonces, flushed, and then recorded in
+    `data['deployment_progress']` so a failed run restarts at the first
+    unfinished chunk of the first unfinished stage. Part of that chunk may
+    already have landed, so it skips accounts whose balance already meets
+    the target instead of funding them twice.
+    """
+    progress = data.setdefault('deployment_progress', {})
+    funder = w3.eth.accounts[0]
+    token_contracts = {
+        symbol: w3.eth.contract(address=data['token_addresses'][symbol], abi=erc20_abi)
+        for symbol in token_amounts
+    }
+
+    def run_stage(stage, submit_chunk):
+        done = progress.get(stage, 0)
+        if done >= len(accounts):
+            print(f"\n[{stage}] already complete, skipping")
+            return
+        with timed_stage(stage, timings):
+            for start in range(done, len(accounts), batch_size):
+                chunk = accounts[start:start + batch_size]
+                # Only the first chunk of a run can have been partly submitted before
+                submit_chunk(chunk, start == done)
+                progress[stage] = start + len(chunk)
+                save_checkpoint(data)
+                print(f"  {progress[stage]}/{len(accounts)} accounts")
+
+    def send_eth(chunk, check_balances):
+        pipeline = NoncePipeline(w3, funder, batch_size=batch_size)
+        for account in chunk:
+            if check_balances and w3.eth.get_balance(account['address']) >= eth_amount:
+                continue
+            pipeline.transfer(account['address'], eth_amount)
+        pipeline.flush()
+
+    def mint(chunk, check_balances):
+        pipeline = NoncePipeline(w3, funder, batch_size=batch_size * len(token_contracts))
+        for account in chunk:
+            for symbol, contract in token_contracts.items():
+                if check_balances and contract.functions.balanceOf(account['address']).call() >= token_amounts[symbol]:
+                    continue
+                pipeline.call(contract.functions.mint(account['address'], token_amounts[symbol]), gas=200000)
+        pipeline.flush()
+
+    def approve(chunk, check_balances):
+        # Approvals set the allowance rather than add to it, so a retried chunk needs no balance check.
+        # Every account has its own nonce sequence, so submit all of them before waiting on any
+        pipelines = []
+        for account in chunk:
+            pipeline = NoncePipeline(w3, account['address'], account['private_key'], batch_size=len(token_contracts) + 1)
+            for contract in token_contracts.values():
+                pipeline.call(contract.functions.approve(orderbook_address, 2**256 - 1), gas=100000)
+            pipelines.append(pipeline)
+        for pipeline in pipelines:
+            pipeline.flush()
+
+    run_stage('fund_eth', send_eth)
+    run_stage('mint', mint)
+    run_stage('approve', approve)
+
+
 def test_swaps_and_price_changes(erc20_deployer, orderbook_deployer, orderbook_address, tokens, token_addresses, token_symbols):
     """
     Test token swaps and verify price changes in the OrderBook
@@ -348,133 +514,205 @@ def test_swaps_and_price_changes(erc20_deployer, orderbook_deployer, orderbook_a
     print("\nSwap tests completed!")
 
 
-def main():
-    # Initialize deployers
-    print("Initializing deployers...")
-    erc20_deployer = ERC20TestDeployer()
-    orderbook_deployer = OrderBookTestDeployer()
-    
-    try:
-        # Load token configurations
-        with open('testnet.json', 'r') as file:
-            config = json.load(file)
-        
-        # Deploy OrderBook contract
-        print("\nDeploying OrderBook contract...")
-        orderbook_interface = orderbook_deployer.compile_contract("contracts/OrderBook.sol")
-        orderbook_address = orderbook_deployer.deploy_contract(orderbook_interface)
-        orderbook = orderbook_deployer.get_contract(orderbook_address, orderbook_interface)
-        print(f"OrderBook deployed at: {orderbook_address}")
+def load_or_deploy_contracts(erc20_deployer, orderbook_deployer, config, data, timings):
+    """Deploy the orderbook and tokens, reusing addresses already checkpointed in `data`"""
+    w3 = erc20_deployer.w3
+    progress = data.setdefault('deployment_progress', {})
 
-        # Deploy tokens from configuration
-        print("\nDeploying tokens from configuration...")
-        tokens = []
-        tokens_data = [] 
+    orderbook_interface = orderbook_deployer.compile_contract("contracts/OrderBook.sol")
+    erc20_interface = erc20_deployer.compile_contract("contracts/MinimalERC20.sol")
+
+    orderbook_address = data.get('orderbook_address')
+    if progress.get('contracts') and orderbook_address and w3.eth.get_code(orderbook_address):
+        print(f"\nReusing OrderBook at: {orderbook_address}")
+    else:
+        with timed_stage('deploy_orderbook', timings):
+            orderbook_address = orderbook_deployer.deploy_contract(orderbook_interface)
+        print(f"OrderBook deployed at: {orderbook_address}")
+        data.clear()
+        data['deployment_progress'] = progress = {}
+        data['orderbook_address'] = orderbook_address
+        data['token_addresses'] = {}
 
-        # Compile ERC20 contract once
-        erc20_interface = erc20_deployer.compile_contract("contracts/MinimalERC20.sol")
+    data['orderbook_abi'] = orderbook_interface['abi']
+    data['token_abi'] = erc20_interface['abi']
+    orderbook = orderbook_deployer.get_contract(orderbook_address, orderbook_interface)
 
-        # Deploy each token
+    tokens_data = []
+    with timed_stage('deploy_tokens', timings):
         for token_config in config['tokens']:
             symbol = token_config['symbol']
             name = token_config['name']
             initial_supply = token_config['initial_supply'] * 10**18
-            initial_price_usd = token_config['initial_price_usd']
 
-            # Deploy token
-            address = erc20_deployer.deploy_contract(erc20_interface, name, symbol)
-            contract = erc20_deployer.get_contract(address, erc20_interface)
-            tokens.append(contract)
+            address = data['token_addresses'].get(symbol)
+            if address and w3.eth.get_code(address):
+                print(f"Reusing {symbol} at: {address}")
+                contract = erc20_deployer.get_contract(address, erc20_interface)
+            else:
+                # Deploy token and mint initial supply to account[0]
+                address = erc20_deployer.deploy_contract(erc20_interface, name, symbol)
+                contract = erc20_deployer.get_contract(address, erc20_interface)
+                erc20_deployer.mint_tokens(contract, erc20_deployer.account_address, initial_supply)
+                print(f"Deployed {symbol} at: {address}, minted {initial_supply // 10**18} to {erc20_deployer.account_address}")
+                data['token_addresses'][symbol] = address
+                save_checkpoint(data)
+
             tokens_data.append({
                 'symbol': symbol,
                 'address': address,
                 'name': name,
                 'initial_supply': initial_supply,
-                'initial_price_usd': initial_price_usd,
+                'initial_price_usd': token_config['initial_price_usd'],
                 'contract': contract
             })
-            print(f"Deployed {symbol} at: {address}")
-
-            # Mint initial supply to account[0]
-            erc20_deployer.mint_tokens(contract, erc20_deployer.account_address, initial_supply)
-            print(f"Minted {initial_supply // 10**18} {symbol} to {erc20_deployer.account_address}")
-
-        # Output deployed tokens for verification
-        print("\nDeployed tokens:")
-        for token in tokens_data:
-            print(f"Symbol: {token['symbol']}, Address: {token['address']}")
-
-        # Create pools with initial prices
-        print("\nCreating liquidity pools...")
-        # Find USDC in tokens_data
-        usdc_token = next((token for token in tokens_data if token['symbol'] == 'USDC'), None)
-        if usdc_token is None:
-            raise Exception("USDC token not found in deployment data.")
-
-        usdc_contract = usdc_token['contract']
-        usdc_address = usdc_token['address']
-
-        for token in tokens_data:
-            if token['symbol'] != 'USDC': 
-                # Calculate pool amounts based on initial price
-                base_amount = 10000
-                initial_price_usd = token['initial_price_usd']
-                token_pool_amount = base_amount * 10**18
-                usdc_pool_amount = int(base_amount * initial_price_usd * 10**18)
-
-                print(f"\nCreating pool for {token['symbol']}-USDC")
-                print(f"Initial price: ${initial_price_usd}")
-
-                # Approve tokens from account[0]
-                orderbook_deployer.approve_token(token['contract'], orderbook_address, token_pool_amount)
-                orderbook_deployer.approve_token(usdc_contract, orderbook_address, usdc_pool_amount)
-
-                try:
-                    # Deposit tokens to create pool using the updated deposit function
-                    orderbook_deployer.deposit(
-                        orderbook,
-                        token['address'],
-                        usdc_address,
-                        token_pool_amount,
-                        usdc_pool_amount
-                    )
-
-                    # Verify pool creation
-                    price = orderbook_deployer.get_price(orderbook, token['address'], usdc_address)
-                    print(f"Pool created! Current price {token['symbol']}/USDC: {price / 10**18}")
-
-                except Exception as e:
-                    print(f"Error creating pool {token['symbol']}-USDC: {str(e)}")
-                    continue
 
+    data['token_symbols'] = [token['symbol'] for token in tokens_data]
+    data['initial_prices'] = {token['symbol']: token['initial_price_usd'] for token in tokens_data}
+    progress['contracts'] = True
+    save_checkpoint(data)
+    return orderbook, orderbook_address, tokens_data
 
-        # Save deployment data
-        data = {
-            "orderbook_address": orderbook_address,
-            "orderbook_abi": orderbook_interface['abi'],
-            "token_addresses": {
-                token['symbol']: token['address']
-                for token in tokens_data
-            },
-            "token_symbols": [token['symbol'] for token in tokens_data],
-            "token_abi": erc20_interface['abi'],
-            "initial_prices": {
-                token['symbol']: token['initial_price_usd']
-                for token in tokens_data
-            }
-        }
-
-        with open('testnet_data.json', 'w') as file:
-            json.dump(data, file, indent=2)
 
+def create_pools(orderbook_deployer, orderbook, orderbook_address, tokens_data, data, timings):
+    """
+    Approve and deposit liquidity for every TOKEN-USDC pool in one pipelined batch.
+
+    Each pool is checkpointed as soon as its deposit is mined, and pools that
+    already hold liquidity are skipped, so a resumed run never deposits into
+    the same pool twice.
+    """
+    progress = data.setdefault('deployment_progress', {})
+    done_pools = set(progress.get('pools', []))
+
+    usdc_token = next((token for token in tokens_data if token['symbol'] == 'USDC'), None)
+    if usdc_token is None:
+        raise Exception("USDC token not found in deployment data.")
+    usdc_contract = usdc_token['contract']
+    usdc_address = usdc_token['address']
+
+    pending_pools = []
+    for token in tokens_data:
+        if token['symbol'] == 'USDC' or token['symbol'] in done_pools:
+            continue
+        if orderbook.functions.total_pool_balance(token['address'], usdc_address).call() > 0:
+            # Deposited by a run that failed before recording it
+            done_pools.add(token['symbol'])
+            continue
+        pending_pools.append(token)
+    if sorted(done_pools) != progress.get('pools', []):
+        progress['pools'] = sorted(done_pools)
+        save_checkpoint(data)
+    if not pending_pools:
+        print("\n[pools] already complete, skipping")
+        return
+
+    def pool_mined(tx_hash):
+        token = deposits.get(tx_hash)
+        if token is None:
+            return
+        price = orderbook_deployer.get_price(orderbook, token['address'], usdc_address)
+        print(f"Pool created! Current price {token['symbol']}/USDC: {price / 10**18}")
+        done_pools.add(token['symbol'])
+        progress['pools'] = sorted(done_pools)
+        save_checkpoint(data)
+
+    with timed_stage('pools', timings):
+        deposits = {}
+        pipeline = NoncePipeline(
+            orderbook_deployer.w3,
+            orderbook_deployer.account_address,
+            batch_size=None,
+            on_mined=pool_mined
+        )
+        for token in pending_pools:
+            # Calculate pool amounts based on initial price
+            base_amount = 10000
+            token_pool_amount = base_amount * 10**18
+            usdc_pool_amount = int(base_amount * token['initial_price_usd'] * 10**18)
+            print(f"Creating pool for {token['symbol']}-USDC at ${token['initial_price_usd']}")
+
+            pipeline.call(token['contract'].functions.approve(orderbook_address, token_pool_amount), gas=100000)
+            pipeline.call(usdc_contract.functions.approve(orderbook_address, usdc_pool_amount), gas=100000)
+            tx_hash = pipeline.call(
+                orderbook.functions.deposit(token['address'], usdc_address, token_pool_amount, usdc_pool_amount),
+                gas=300000
+            )
+            deposits[tx_hash] = token
+        pipeline.flush()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Deploy the orderbook testnet and optionally fund agent accounts")
+    parser.add_argument('--accounts', type=int, default=0,
+                        help="Number of mnemonic accounts to derive and fund (0 skips funding)")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="Accounts per pipelined batch / checkpoint")
+    parser.add_argument('--eth-per-account', type=float, default=1.0,
+                        help="ETH sent to each funded account for gas")
+    parser.add_argument('--tokens-per-account', type=int, default=10000,
+                        help="Amount of every token minted to each funded account")
+    parser.add_argument('--resume', action='store_true',
+                        help="Resume from the progress checkpointed in testnet_data.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Initialize deployers
+    print("Initializing deployers...")
+    erc20_deployer = ERC20TestDeployer()
+    orderbook_deployer = OrderBookTestDeployer()
+    timings = {}
+
+    try:
+        # Load token configurations
+        with open('testnet.json', 'r') as file:
+            config = json.load(file)
+
+        data = {}
+        if args.resume and os.path.exists('testnet_data.json'):
+            with open('testnet_data.json', 'r') as file:
+                data = json.load(file)
+            print(f"Resuming from checkpoint: {data.get('deployment_progress', {})}")
+
+        orderbook, orderbook_address, tokens_data = load_or_deploy_contracts(
+            erc20_deployer, orderbook_deployer, config, data, timings
+        )
+        create_pools(orderbook_deployer, orderbook, orderbook_address, tokens_data, data, timings)
+
+        if args.accounts > 0:
+            with open('../.mnemonic', 'r') as file:
+                mnemonic = file.read().strip()
+            with timed_stage('derive_accounts', timings):
+                accounts = derive_accounts(mnemonic, args.accounts)
+            data['num_accounts'] = args.accounts
+
+            fund_accounts(
+                erc20_deployer.w3,
+                data,
+                accounts,
+                data['token_abi'],
+                orderbook_address,
+                {token['symbol']: args.tokens_per_account * 10**18 for token in tokens_data},
+                Web3.to_wei(args.eth_per_account, 'ether'),
+                args.batch_size,
+                timings
+            )
+
+        data['stage_timings'] = timings
+        save_checkpoint(data)
+
+        print("\nStage timings:")
+        for stage, elapsed in timings.items():
+            print(f"  {stage}: {elapsed:.2f}s")
         print("\nSetup complete! Configuration saved to testnet_data.json")
 
     except Exception as e:
         print(f"Error: {str(e)}")
+        print("Progress has been checkpointed to testnet_data.json, rerun with --resume to continue")
         raise e
 
 if __name__ == '__main__':
     main()
-
-
-
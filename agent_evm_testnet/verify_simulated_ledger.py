@@ -0,0 +1,95 @@
+# verify_simulated_ledger.py
+#
+# Parity check between the on-chain OrderBook on a local hardhat node and the
+# in-process SimulatedEthereumInterface. Run from agent_evm_testnet/ after
+# testnet_deployer.py, with the node still running.
+
+import os
+import random
+import sys
+
+from web3 import Web3
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_evm_interface.agent_evm_interface import EthereumInterface
+from agent_evm_interface.simulated_ledger import SimulatedEthereumInterface
+
+RELATIVE_TOLERANCE = 1e-9
+
+
+def sync_reserves(chain, sim):
+    """Copy the node's pool reserves into the simulated ledger so both start from the same state"""
+    w3 = Web3(Web3.HTTPProvider(chain.rpc_url))
+    orderbook = w3.eth.contract(
+        address=chain.testnet_data['orderbook_address'],
+        abi=chain.testnet_data['orderbook_abi']
+    )
+    sim.fee = orderbook.functions.fee().call()
+    for i, a in enumerate(chain.token_symbols):
+        for j, b in enumerate(chain.token_symbols):
+            if i != j:
+                sim.reserves[i, j] = orderbook.functions.total_pool_balance(
+                    chain.get_token_address(a), chain.get_token_address(b)
+                ).call()
+    for i in range(len(chain.token_symbols)):
+        sim.balances[sim.orderbook_row, i] = sim.reserves[i].sum()
+
+
+def main(num_swaps: int = 50, seed: int = 0):
+    random.seed(seed)
+    chain = EthereumInterface()
+    sim = SimulatedEthereumInterface()
+    sync_reserves(chain, sim)
+
+    symbols = [symbol for symbol in chain.token_symbols if symbol != 'USDC']
+    chain_account = chain.accounts[1]
+    sim_account = sim.accounts[1]
+    minter_key = chain.accounts[0]['private_key']
+    max_diff = 0.0
+    failures = 0
+
+    for n in range(num_swaps):
+        token = random.choice(symbols)
+        source, target = random.choice([('USDC', token), (token, 'USDC')])
+        amount = random.randint(1, 100) * 10**18
+
+        chain_source = chain.get_token_address(source)
+        chain_target = chain.get_token_address(target)
+        sim_source = sim.get_token_address(source)
+        sim_target = sim.get_token_address(target)
+
+        # Fund, approve and swap on the node
+        w3 = Web3(Web3.HTTPProvider(chain.rpc_url))
+        for tx_hash in (
+            chain.mint_erc20(chain_account['address'], amount, chain_source, minter_key),
+            chain.approve_erc20(chain.testnet_data['orderbook_address'], amount, chain_source, chain_account['private_key']),
+        ):
+            w3.eth.wait_for_transaction_receipt(tx_hash)
+        tx_hash = chain.swap(chain_source, amount, chain_target, chain_account['private_key'])
+        block_number = w3.eth.wait_for_transaction_receipt(tx_hash).blockNumber
+        chain_out = chain.get_swap_history(chain_source, chain_target, block_number, block_number)[-1]['args']['targetAmount']
+
+        # Same swap on the simulated ledger
+        sim.mint_erc20(sim_account['address'], amount, sim_source, sim.accounts[0]['private_key'])
+        sim.approve_erc20(sim.testnet_data['orderbook_address'], amount, sim_source, sim_account['private_key'])
+        sim.swap(sim_source, amount, sim_target, sim_account['private_key'])
+        sim_out = sim.swap_events[-1]['args']['targetAmount']
+
+        chain_price = chain.get_pair_info(chain.get_token_address(token), chain.get_token_address('USDC'))['token0_price_in_token1']
+        sim_price = sim.get_pair_info(sim.get_token_address(token), sim.get_token_address('USDC'))['token0_price_in_token1']
+
+        diff = max(abs(chain_out - sim_out) / chain_out, abs(chain_price - sim_price) / chain_price)
+        max_diff = max(max_diff, diff)
+        status = "OK" if diff <= RELATIVE_TOLERANCE else "MISMATCH"
+        if status != "OK":
+            failures += 1
+        print(f"[{status}] swap {n}: {amount / 10**18:.0f} {source} -> {target} | "
+              f"chain out {chain_out / 10**18:.8f}, sim out {sim_out / 10**18:.8f}, rel diff {diff:.2e}")
+
+    print(f"\n{num_swaps - failures}/{num_swaps} swaps within {RELATIVE_TOLERANCE:.0e}, max relative diff {max_diff:.2e}")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -6,11 +6,11 @@ from typing import Any, Callable, Dict, List, Optional, Type, Union
 
 from market_agents.agents.tool_caller.engine import Engine
 from market_agents.agents.tool_caller.utils import function_to_json
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
-from market_agents.inference.parallel_inference import ParallelAIUtilities
-from market_agents.inference.message_models import StructuredTool, LLMConfig, LLMPromptContext, LLMOutput
+from market_agents.inference.parallel_inference import ParallelAIUtilities, get_ai_utilities
+from market_agents.inference.message_models import StructuredTool, LLMConfig, LLMPromptContext, LLMOutput, ContextPolicy
 from market_agents.agents.base_agent.prompter import PromptManager
 from market_agents.agents.base_agent.utils import extract_json_from_response
 from market_agents.agents.base_agent.schemas import *
@@ -30,9 +30,11 @@ class Agent(BaseModel):
         tools (Optional[Dict[str, Any]]): Tools available to the agent.
         output_format (Optional[Union[Dict[str, Any], str]]): Expected output format.
         llm_config (LLMConfig): Configuration for the language model.
+        context_policy (Optional[ContextPolicy]): History window, token budget and summarization for the agent's prompts. With a policy, each prompt continues the agent's conversation (earlier turns and rolling summary); without one, prompts carry no history.
         max_retries (int): Maximum number of retry attempts for AI inference.
         metadata (Optional[Dict[str, Any]]): Additional metadata for the agent.
         interactions (List[Dict[str, Any]]): History of agent interactions.
+        ai_utilities (ParallelAIUtilities): Inference client; the process-wide one from get_ai_utilities() unless one is passed in.
 
     Methods:
         execute(task: Optional[str] = None, output_format: Optional[Union[Dict[str, Any], str]] = None, return_prompt: bool = False) -> Union[str, Dict[str, Any], LLMPromptContext]:
@@ -55,16 +57,28 @@ class Agent(BaseModel):
     tools: Optional[List[Callable]] = None
     output_format: Optional[Union[Dict[str, Any], str]] = None
     llm_config: LLMConfig = Field(default_factory=LLMConfig)
+    context_policy: Optional[ContextPolicy] = None
     max_retries: int = 2
     metadata: Optional[Dict[str, Any]] = None
     interactions: List[Dict[str, Any]] = Field(default_factory=list)
+    _ai_utilities: Optional[ParallelAIUtilities] = PrivateAttr(default=None)
+    _conversation: Optional[LLMPromptContext] = PrivateAttr(default=None)
 
     class Config:
         extra = "allow"
 
-    def __init__(self, **data: Any):
+    def __init__(self, ai_utilities: Optional[ParallelAIUtilities] = None, **data: Any):
         super().__init__(**data)
-        self.ai_utilities = ParallelAIUtilities()
+        self._ai_utilities = ai_utilities
+
+    @property
+    def ai_utilities(self) -> ParallelAIUtilities:
+        # Resolved on first inference, so building agents does no I/O
+        return self._ai_utilities if self._ai_utilities is not None else get_ai_utilities()
+
+    @ai_utilities.setter
+    def ai_utilities(self, ai_utilities: Optional[ParallelAIUtilities]):
+        self._ai_utilities = ai_utilities
 
     async def execute(self, task: Optional[str] = None, output_format: Optional[Union[Dict[str, Any], str, Type[BaseModel]]] = None, json_tool: bool = False, return_prompt: bool = False) -> Union[str, Dict[str, Any], LLMPromptContext]:
         """Execute a task and return the result or the prompt context."""
@@ -131,25 +145,37 @@ class Agent(BaseModel):
             char_limit=1000
         )
 
-        prompt_messages = prompt_manager.generate_prompt_messages()
-        system_message = prompt_messages["messages"][0]["content"]
-        if self.system:
-            system_message += f"\n{self.system}"
-        user_message = prompt_messages["messages"][1]["content"]
+        # Role, persona and objectives, then the output schema: identical for
+        # this agent and phase every round, so providers can reuse the cached
+        # prefix. Round-specific instructions in self.system go after them.
+        system_prefix = [prompt_manager.generate_system_prompt(), prompt_manager.generate_schema_prompt()]
+        user_message = prompt_manager.generate_task_prompt(include_schema=False)
        
         structured_output = None
         if output_format and isinstance(output_format, dict):
             structured_output = StructuredTool(json_schema=output_format, strict_schema=False)
 
-        return LLMPromptContext(
+        prompt_context = LLMPromptContext(
             id=self.id,
-            system_string=system_message,
+            system_prefix=system_prefix,
+            system_string=self.system or None,
             new_message=user_message,
             llm_config=self.llm_config,
             structured_output=structured_output,
             tools=self.tools,
+            context_policy=self.context_policy,
             update_history=True
         )
+        if self.context_policy is not None:
+            # Continue the previous prompt's conversation. The history list is shared,
+            # so turns and summaries added when this prompt runs carry over to the next
+            previous = self._conversation
+            if previous is not None:
+                prompt_context.history = previous.history
+                prompt_context.history_summary = previous.history_summary
+                prompt_context._history_tokens = previous._history_tokens
+            self._conversation = prompt_context
+        return prompt_context
     
     @retry(
         wait=wait_random_exponential(multiplier=1, max=30),
@@ -1,10 +1,11 @@
 from typing import Union, List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from pydantic import BaseModel
-import yaml
 import json
 import os
 
+from market_agents.agents.prompt_registry import PromptTemplates, prompt_registry
+
 class SystemPromptSchema(BaseModel):
     """Schema for system prompts."""
     Role: str
@@ -28,12 +29,20 @@ class PromptTemplateVariables(BaseModel):
     pydantic_schema: Optional[str] = None
     output_format: str
 
+def _prompt_schemas(templates: PromptTemplates) -> Tuple[SystemPromptSchema, TaskPromptSchema]:
+    system_prompt_data = {k: v for k, v in templates.data.items() if k in SystemPromptSchema.model_fields}
+    task_prompt_data = {k: v for k, v in templates.data.items() if k in TaskPromptSchema.model_fields}
+    return SystemPromptSchema(**system_prompt_data), TaskPromptSchema(**task_prompt_data)
+
+
 class PromptManager:
     """
     Manages the creation and formatting of prompts for AI agents.
 
     This class handles loading prompt templates, formatting prompts with variables,
-    and generating system and task prompts for AI agent interactions.
+    and generating system and task prompts for AI agent interactions. Templates
+    come pre-compiled from the shared prompt registry, so creating a manager
+    per request does not touch the prompt files.
     """
 
     def __init__(self, role: str, task: Union[str, List[str]], persona: Optional[str] = None, objectives: Optional[str] = None, 
@@ -59,7 +68,10 @@ class PromptManager:
         self.prompt_vars = self._create_prompt_vars_dict(task, resources, output_schema)
         self.prompt_path = os.path.join(self.script_dir, '..', 'configs', 'prompts', f"{self.role}_prompt.yaml")
         self.default_prompt_path = os.path.join(self.script_dir, '..', 'configs', 'prompts', "default_prompt.yaml")
-        self.system_prompt_schema, self.task_prompt_schema = self._read_yaml_file(self.prompt_path)
+        self.templates = self._load_templates(self.prompt_path)
+        self.system_prompt_schema, self.task_prompt_schema = self.templates.cached('prompt_schemas', _prompt_schemas)
+        # Rendered in a single pass over this map
+        self.format_vars = self.prompt_vars.model_dump()
 
     def format_yaml_prompt(self) -> str:
         """
@@ -69,45 +81,43 @@ class PromptManager:
             str: Formatted YAML prompt.
         """
         formatted_prompt = ""
-        for field, value in self.system_prompt_schema.dict().items():
-            formatted_value = value.format(**self.prompt_vars.dict()) if value else ""
-            formatted_prompt += f"# {field}:\n{formatted_value}\n"
-        for field, value in self.task_prompt_schema.dict().items():
-            formatted_value = value.format(**self.prompt_vars.dict()) if value else ""
-            formatted_prompt += f"# {field}:\n{formatted_value}\n"
+        for schema in (self.system_prompt_schema, self.task_prompt_schema):
+            for field, value in schema.model_dump().items():
+                formatted_value = self.templates[field].render(self.format_vars) if value else ""
+                formatted_prompt += f"# {field}:\n{formatted_value}\n"
         return formatted_prompt
 
-    def _read_yaml_file(self, file_path: Optional[str] = None) -> Tuple[SystemPromptSchema, TaskPromptSchema]:
+    def _load_templates(self, file_path: str) -> PromptTemplates:
         """
-        Read and parse a YAML file.
+        Get the compiled templates of a prompt file, falling back to the default prompt file.
 
         Args:
-            file_path (Optional[str]): Path to the YAML file.
+            file_path (str): Path to the YAML file.
 
         Returns:
-            Tuple[SystemPromptSchema, TaskPromptSchema]: Parsed YAML content as SystemPromptSchema and TaskPromptSchema.
+            PromptTemplates: The file's compiled templates, shared with every other manager.
 
         Raises:
             FileNotFoundError: If neither the specified file nor the default file is found.
             ValueError: If there's an error parsing the YAML file.
         """
         try:
-            with open(file_path, 'r') as file:
-                yaml_content = yaml.safe_load(file)
+            return prompt_registry.load(file_path, default_path=self.default_prompt_path)
         except FileNotFoundError:
-            try:
-                with open(self.default_prompt_path, 'r') as file:
-                    yaml_content = yaml.safe_load(file)
-            except FileNotFoundError:
-                raise FileNotFoundError(f"Neither the role-specific prompt file at {file_path} "
-                                        f"nor the default prompt file at {self.default_prompt_path} were found.")
-        except yaml.YAMLError as e:
-            raise ValueError(f"Error parsing YAML file: {e}")
+            raise FileNotFoundError(f"Neither the role-specific prompt file at {file_path} "
+                                    f"nor the default prompt file at {self.default_prompt_path} were found.")
 
-        system_prompt_data = {k: v for k, v in yaml_content.items() if k in SystemPromptSchema.__fields__}
-        task_prompt_data = {k: v for k, v in yaml_content.items() if k in TaskPromptSchema.__fields__}
+    def _read_yaml_file(self, file_path: Optional[str] = None) -> Tuple[SystemPromptSchema, TaskPromptSchema]:
+        """
+        Read and parse a YAML file.
 
-        return SystemPromptSchema(**system_prompt_data), TaskPromptSchema(**task_prompt_data)
+        Args:
+            file_path (Optional[str]): Path to the YAML file.
+
+        Returns:
+            Tuple[SystemPromptSchema, TaskPromptSchema]: Parsed YAML content as SystemPromptSchema and TaskPromptSchema.
+        """
+        return self._load_templates(file_path or self.prompt_path).cached('prompt_schemas', _prompt_schemas)
 
     def _create_prompt_vars_dict(self, task: Union[str, List[str]], resources: Optional[Any],
                           output_schema: Optional[Union[str, Dict[str, Any]]]) -> PromptTemplateVariables:
@@ -153,32 +163,45 @@ class PromptManager:
         Returns:
             str: Formatted system prompt.
         """
-        system_content = f"Role: {self.system_prompt_schema.Role.format(**self.prompt_vars.dict())}\n"
+        system_content = f"Role: {self.templates['Role'].render(self.format_vars)}\n"
         
         if self.persona and self.system_prompt_schema.Persona:
-            system_content += f"Persona: {self.system_prompt_schema.Persona.format(**self.prompt_vars.dict())}\n"
+            system_content += f"Persona: {self.templates['Persona'].render(self.format_vars)}\n"
         
         if self.objectives and self.system_prompt_schema.Objectives:
-            system_content += f"Objectives: {self.system_prompt_schema.Objectives.format(**self.prompt_vars.dict())}\n"
+            system_content += f"Objectives: {self.templates['Objectives'].render(self.format_vars)}\n"
         
         return system_content
 
-    def generate_task_prompt(self) -> str:
+    def generate_schema_prompt(self) -> str:
+        """
+        Generate the output schema (or output format) section.
+
+        Returns:
+            str: Formatted output schema prompt.
+        """
+        if self.prompt_vars.pydantic_schema and self.task_prompt_schema.Output_schema:
+            return f"Output_schema: {self.templates['Output_schema'].render(self.format_vars)}\n"
+        return f"Output_format: {self.prompt_vars.output_format}\n"
+
+    def generate_task_prompt(self, include_schema: bool = True) -> str:
         """
         Generate the task prompt.
 
+        Args:
+            include_schema (bool): Whether to include the output schema section,
+                which callers may place in the system prompt instead.
+
         Returns:
             str: Formatted task prompt.
         """
-        user_content = f"Tasks: {self.task_prompt_schema.Tasks.format(**self.prompt_vars.dict())}\n"
+        user_content = f"Tasks: {self.templates['Tasks'].render(self.format_vars)}\n"
         
-        if self.prompt_vars.pydantic_schema and self.task_prompt_schema.Output_schema:
-            user_content += f"Output_schema: {self.task_prompt_schema.Output_schema.format(**self.prompt_vars.dict())}\n"
-        else:
-            user_content += f"Output_format: {self.prompt_vars.output_format}\n"
+        if include_schema:
+            user_content += self.generate_schema_prompt()
         
         if self.task_prompt_schema.Assistant:
-            user_content += f"Assistant: {self.task_prompt_schema.Assistant.format(**self.prompt_vars.dict())}"
+            user_content += f"Assistant: {self.templates['Assistant'].render(self.format_vars)}"
         
         return user_content
 
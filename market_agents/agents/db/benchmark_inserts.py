@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extras
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from market_agents.orchestrators.insert_simulation_data import SimulationDataInserter
+
+TABLES = ['agents', 'agent_memories', 'allocations', 'perceptions', 'actions', 'requests']
+
+
+def get_db_params():
+    return {
+        'dbname': os.environ.get('DB_NAME', 'market_simulation_bench'),
+        'user': os.environ.get('DB_USER', 'db_user'),
+        'password': os.environ.get('DB_PASSWORD', 'db_pwd@123'),
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'port': os.environ.get('DB_PORT', '5433')
+    }
+
+
+def make_round(num_agents, round_num):
+    """Synthetic per-round payloads shaped like SimulationDataInserter.insert_round_data builds them."""
+    agent_ids = [str(uuid.uuid4()) for _ in range(num_agents)]
+    now = datetime.now()
+    agents = [{
+        'id': agent_id,
+        'role': 'buyer' if i % 2 == 0 else 'seller',
+        'is_llm': True,
+        'max_iter': 10,
+        'llm_config': {'client': 'openai', 'model': 'gpt-4o-mini', 'temperature': 0.5, 'max_tokens': 512}
+    } for i, agent_id in enumerate(agent_ids)]
+    memories = [{
+        'agent_id': agent_id,
+        'step_id': round_num,
+        'memory_data': {'type': 'reflection', 'content': 'Bid closer to the clearing price.' * 4, 'timestamp': now.isoformat()}
+    } for agent_id in agent_ids]
+    allocations = [{
+        'agent_id': agent_id, 'goods': 5, 'cash': 1000.0, 'locked_goods': 0,
+        'locked_cash': 0.0, 'initial_goods': 5, 'initial_cash': 1000.0
+    } for agent_id in agent_ids]
+    perceptions = [{
+        'memory_id': agent_id, 'environment_name': 'auction',
+        'monologue': 'The spread narrowed this round.', 'strategy': 'Raise the bid slightly.', 'confidence': 0.7
+    } for agent_id in agent_ids]
+    actions = [{
+        'memory_id': agent_id, 'environment_name': 'auction',
+        'action': {'price': 42.5, 'quantity': 1}
+    } for agent_id in agent_ids]
+    requests = [{
+        'prompt_context_id': agent_id, 'start_time': now, 'end_time': now, 'total_time': 0.0,
+        'model': 'gpt-4o-mini', 'max_tokens': 512, 'temperature': 0.5,
+        'messages': [{'role': 'system', 'content': 'You are a market agent.' * 20},
+                     {'role': 'user', 'content': 'Observe the order book and act.' * 20}],
+        'system': 'You are a market agent.' * 20, 'tools': [], 'tool_choice': {},
+        'raw_response': {'choices': [{'message': {'content': '{"price": 42.5, "quantity": 1}'}}]},
+        'completion_tokens': 20, 'prompt_tokens': 400, 'total_tokens': 420
+    } for agent_id in agent_ids]
+    return agents, memories, allocations, perceptions, actions, requests
+
+
+def insert_row_by_row(conn, agents, memories, allocations, perceptions, actions, requests):
+    """The previous write path: one execute per row, one commit per table."""
+    agent_id_map = {}
+    with conn.cursor() as cur:
+        for agent in agents:
+            cur.execute(
+                "INSERT INTO agents (id, role, is_llm, max_iter, llm_config) VALUES (%s, %s, %s, %s, %s) "
+                "ON CONFLICT (id) DO UPDATE SET llm_config = EXCLUDED.llm_config RETURNING id",
+                (agent['id'], agent['role'], agent['is_llm'], agent['max_iter'], psycopg2.extras.Json(agent['llm_config']))
+            )
+            agent_id_map[agent['id']] = cur.fetchone()[0]
+        conn.commit()
+        for memory in memories:
+            cur.execute(
+                "INSERT INTO agent_memories (agent_id, step_id, memory_data) VALUES (%s, %s, %s)",
+                (memory['agent_id'], memory['step_id'], psycopg2.extras.Json(memory['memory_data']))
+            )
+        conn.commit()
+        for allocation in allocations:
+            cur.execute(
+                "INSERT INTO allocations (agent_id, goods, cash, locked_goods, locked_cash, initial_goods, initial_cash) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                (agent_id_map[allocation['agent_id']], allocation['goods'], allocation['cash'], allocation['locked_goods'],
+                 allocation['locked_cash'], allocation['initial_goods'], allocation['initial_cash'])
+            )
+        conn.commit()
+        for perception in perceptions:
+            cur.execute(
+                "INSERT INTO perceptions (memory_id, environment_name, monologue, strategy, confidence) VALUES (%s, %s, %s, %s, %s)",
+                (agent_id_map[perception['memory_id']], perception['environment_name'], perception['monologue'],
+                 perception['strategy'], perception['confidence'])
+            )
+        conn.commit()
+        for action in actions:
+            cur.execute(
+                "INSERT INTO actions (memory_id, environment_name, action) VALUES (%s, %s, %s)",
+                (agent_id_map[action['memory_id']], action['environment_name'], psycopg2.extras.Json(action['action']))
+            )
+        conn.commit()
+        for request in requests:
+            cur.execute(
+                "INSERT INTO requests (prompt_context_id, start_time, end_time, total_time, model, max_tokens, temperature, "
+                "messages, system, tools, tool_choice, raw_response, completion_tokens, prompt_tokens, total_tokens) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                (request['prompt_context_id'], request['start_time'], request['end_time'], request['total_time'],
+                 request['model'], request['max_tokens'], request['temperature'], psycopg2.extras.Json(request['messages']),
+                 request['system'], psycopg2.extras.Json(request['tools']), psycopg2.extras.Json(request['tool_choice']),
+                 psycopg2.extras.Json(request['raw_response']), request['completion_tokens'], request['prompt_tokens'],
+                 request['total_tokens'])
+            )
+        conn.commit()
+
+
+def insert_bulk(inserter, agents, memories, allocations, perceptions, actions, requests):
+    """The bulk write path: execute_values per table, one transaction for the round."""
+    with inserter.transaction():
+        agent_id_map = inserter.insert_agents(agents)
+        inserter.insert_agent_memories(memories)
+        inserter.insert_allocations(allocations, agent_id_map)
+        inserter.insert_perceptions(perceptions, agent_id_map)
+        inserter.insert_actions(actions, agent_id_map)
+        inserter._insert_ai_requests_to_db(requests)
+
+
+def truncate(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"TRUNCATE {', '.join(TABLES)} CASCADE")
+    conn.commit()
+
+
+def main(num_agents: int = 10000, rounds: int = 3):
+    db_params = get_db_params()
+    inserter = SimulationDataInserter(db_params)
+    conn = inserter.conn
+    truncate(conn)
+
+    results = {}
+    for name in ('row_by_row', 'bulk'):
+        elapsed = 0.0
+        total_rows = 0
+        for round_num in range(rounds):
+            payload = make_round(num_agents, round_num)
+            total_rows += sum(len(rows) for rows in payload)
+            start = time.perf_counter()
+            if name == 'row_by_row':
+                insert_row_by_row(conn, *payload)
+            else:
+                insert_bulk(inserter, *payload)
+            elapsed += time.perf_counter() - start
+        results[name] = total_rows / elapsed
+        print(f"{name:>10}: {total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed:,.0f} rows/s, "
+              f"{elapsed / rounds:.2f}s per {num_agents}-agent round)")
+        truncate(conn)
+
+    print(f"speedup: {results['bulk'] / results['row_by_row']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from market_agents.agents.db.setup_database import RUN_SCOPED_TABLES, create_run_partitions
+
+# Synthetic trades history: NUM_RUNS runs of NUM_ROUNDS rounds, NUM_AGENTS agents
+NUM_RUNS = 50
+NUM_ROUNDS = 1000
+NUM_AGENTS = 200
+
+QUERIES = {
+    'run/round/agent lookup': (
+        "SELECT price, quantity FROM trades WHERE run_id = %(run_id)s AND round = %(round)s AND buyer_id = %(agent_id)s"
+    ),
+    'per-round VWAP (one run)': (
+        "SELECT round, SUM(price * quantity) / SUM(quantity) FROM trades "
+        "WHERE run_id = %(run_id)s GROUP BY round ORDER BY round"
+    ),
+    'round range VWAP': (
+        "SELECT SUM(price * quantity) / SUM(quantity) FROM trades "
+        "WHERE run_id = %(run_id)s AND round BETWEEN %(round)s AND %(round)s + 9"
+    ),
+    'per-run trade count': "SELECT COUNT(*) FROM trades WHERE run_id = %(run_id)s",
+}
+
+
+def get_db_params():
+    return {
+        'dbname': os.environ.get('DB_NAME', 'market_simulation_bench'),
+        'user': os.environ.get('DB_USER', 'db_user'),
+        'password': os.environ.get('DB_PASSWORD', 'db_pwd@123'),
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'port': os.environ.get('DB_PORT', '5433')
+    }
+
+
+def create_schemas(cursor):
+    """bench_flat holds one plain trades table, bench_partitioned the run-scoped layout."""
+    columns, key, agent_column = RUN_SCOPED_TABLES['trades']
+    # No foreign keys: the synthetic agents do not exist in the agents table
+    columns = columns.replace(" REFERENCES agents(id)", "")
+    for schema in ('bench_flat', 'bench_partitioned'):
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {schema}")
+
+    cursor.execute("SET search_path TO bench_flat")
+    cursor.execute(f"CREATE TABLE trades ({columns.strip()}, PRIMARY KEY (run_id, round, {key}))")
+    cursor.execute(f"CREATE INDEX ON trades (run_id, round, {agent_column})")
+
+    cursor.execute("SET search_path TO bench_partitioned")
+    cursor.execute(f"""
+    CREATE TABLE trades ({columns.strip()}, PRIMARY KEY (run_id, round, {key}))
+    PARTITION BY LIST (run_id)
+    """)
+    cursor.execute("CREATE TABLE trades_default PARTITION OF trades DEFAULT")
+    cursor.execute(f"CREATE INDEX ON trades (run_id, round, {agent_column})")
+    for run_id in range(1, NUM_RUNS + 1):
+        create_run_partitions(cursor, run_id, NUM_ROUNDS, tables=['trades'])
+
+
+def fill(cursor, rows_per_round):
+    """Generate the rows server-side; shipping 10M rows from Python would dominate the run."""
+    for schema in ('bench_flat', 'bench_partitioned'):
+        cursor.execute(f"SET search_path TO {schema}")
+        start = time.perf_counter()
+        cursor.execute("""
+        INSERT INTO trades (run_id, round, buyer_id, seller_id, quantity, price,
+                            buyer_surplus, seller_surplus, total_surplus)
+        SELECT r, rnd,
+               md5('agent' || ((i * 7 + rnd) %% %(agents)s))::uuid,
+               md5('agent' || ((i * 13 + rnd + 1) %% %(agents)s))::uuid,
+               1 + (i %% 3), 50 + random() * 50, random() * 10, random() * 10, random() * 20
+        FROM generate_series(1, %(runs)s) r,
+             generate_series(1, %(rounds)s) rnd,
+             generate_series(1, %(per_round)s) i
+        """, {'agents': NUM_AGENTS, 'runs': NUM_RUNS, 'rounds': NUM_ROUNDS, 'per_round': rows_per_round})
+        loaded = cursor.rowcount
+        cursor.execute("ANALYZE trades")
+        print(f"{schema}: loaded {loaded} rows in {time.perf_counter() - start:.1f}s")
+
+
+def time_query(cursor, query, params, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        cursor.execute(query, params)
+        cursor.fetchall()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main(total_rows: int = 10_000_000, repeats: int = 20):
+    conn = psycopg2.connect(**get_db_params())
+    conn.autocommit = True
+    cursor = conn.cursor()
+    create_schemas(cursor)
+    fill(cursor, max(1, total_rows // (NUM_RUNS * NUM_ROUNDS)))
+
+    params = {
+        'run_id': NUM_RUNS // 2,
+        'round': NUM_ROUNDS // 2,
+        'agent_id': '00000000-0000-0000-0000-000000000000'
+    }
+    cursor.execute("SET search_path TO bench_flat")
+    cursor.execute("SELECT buyer_id FROM trades WHERE run_id = %(run_id)s AND round = %(round)s LIMIT 1", params)
+    params['agent_id'] = cursor.fetchone()[0]
+
+    print(f"\n{'query':<28}{'flat ms':>12}{'partitioned ms':>18}{'speedup':>10}")
+    for name, query in QUERIES.items():
+        timings = {}
+        for schema in ('bench_flat', 'bench_partitioned'):
+            cursor.execute(f"SET search_path TO {schema}")
+            time_query(cursor, query, params, 1)  # warm the cache
+            timings[schema] = time_query(cursor, query, params, repeats)
+        print(f"{name:<28}{timings['bench_flat']:>12.2f}{timings['bench_partitioned']:>18.2f}"
+              f"{timings['bench_flat'] / timings['bench_partitioned']:>9.1f}x")
+
+    for schema in ('bench_flat', 'bench_partitioned'):
+        cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -11,7 +11,19 @@ from dotenv import load_dotenv
 from datetime import datetime
 import json
 import re
+import sys
 import argparse
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))))
+
+from market_agents.agents.db.db_pool import get_connection_pool
 
 # Load environment variables
 load_dotenv()
@@ -32,13 +44,45 @@ DB_PARAMS = {
     "port": os.getenv("DB_PORT")
 }
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# Seconds table lists, column types and keys are reused before being read again
+METADATA_TTL = float(os.getenv("DASHBOARD_METADATA_TTL", "60"))
+# Row counts up to this are exact; larger tables and result sets use the planner's estimate
+EXACT_COUNT_LIMIT = int(os.getenv("DASHBOARD_EXACT_COUNT_LIMIT", "10000"))
+# Chart series over tables estimated above this many rows are computed from a TABLESAMPLE
+SAMPLE_ABOVE_ROWS = int(os.getenv("DASHBOARD_SAMPLE_ABOVE_ROWS", "1000000"))
+
+NUMERIC_TYPES = {'smallint', 'integer', 'bigint', 'numeric', 'real', 'double precision'}
+TIME_TYPES = {'timestamp with time zone', 'timestamp without time zone', 'date', 'timestamp'}
+
+_metadata_cache = {}
+_metadata_lock = threading.Lock()
+
 def get_db_connection():
     try:
-        return psycopg2.connect(**DB_PARAMS)
+        return get_connection_pool(DB_PARAMS, maxconn=DB_POOL_SIZE).getconn()
     except psycopg2.Error as e:
         print(f"Unable to connect to the database: {e}")
         raise
 
+def release_db_connection(conn):
+    # End any transaction left open by read queries before handing the connection back
+    if not conn.closed:
+        conn.rollback()
+    get_connection_pool(DB_PARAMS, maxconn=DB_POOL_SIZE).putconn(conn, close=bool(conn.closed))
+
+def cached_metadata(key, loader):
+    """Return `loader()`, reusing the previous result for METADATA_TTL seconds."""
+    now = time.monotonic()
+    with _metadata_lock:
+        entry = _metadata_cache.get(key)
+        if entry is not None and now - entry[0] < METADATA_TTL:
+            return entry[1]
+    value = loader()
+    with _metadata_lock:
+        _metadata_cache[key] = (now, value)
+    return value
+
 def get_json_paths(obj, parent_path='', paths=None):
     if paths is None:
         paths = {}
@@ -100,6 +144,10 @@ def build_json_selector(column_path):
     return sql.SQL('->>').join([result, path_parts[-1]])
 
 def get_column_types(cursor, table_name):
+    # Sampling JSON columns for their paths is the expensive part; reuse it across requests
+    return cached_metadata(('columns', table_name), lambda: _load_column_types(cursor, table_name))
+
+def _load_column_types(cursor, table_name):
     query = """
     SELECT column_name, data_type, is_nullable
     FROM information_schema.columns
@@ -154,6 +202,155 @@ def get_column_types(cursor, table_name):
     
     return result
 
+def get_table_info(cursor, table_name):
+    """Relation kind and primary key columns (name, SQL type) in key order; views have no key."""
+    def load():
+        cursor.execute("""
+        SELECT c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = %s
+        """, (table_name,))
+        row = cursor.fetchone()
+        cursor.execute("""
+        SELECT a.attname AS name, format_type(a.atttypid, a.atttypmod) AS type
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = to_regclass(quote_ident(%s)) AND i.indisprimary
+        ORDER BY array_position(i.indkey::int2[], a.attnum)
+        """, (table_name,))
+        return {
+            'kind': row['relkind'] if row else None,
+            'keys': [(key['name'], key['type']) for key in cursor.fetchall()]
+        }
+    return cached_metadata(('table', table_name), load)
+
+def count_rows(cursor, query):
+    """
+    Number of rows `query` returns, for paging. Exact up to EXACT_COUNT_LIMIT,
+    otherwise the planner's estimate (from pg_class statistics), so large
+    tables are never scanned just to be counted. Returns (count, is_estimate).
+    """
+    cursor.execute(sql.SQL("SELECT COUNT(*) AS count FROM ({} LIMIT {}) AS capped").format(
+        query, sql.Literal(EXACT_COUNT_LIMIT + 1)
+    ))
+    count = cursor.fetchone()['count']
+    if count <= EXACT_COUNT_LIMIT:
+        return count, False
+    cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) {}").format(query))
+    plan = cursor.fetchone()['QUERY PLAN']
+    return max(int(plan[0]['Plan']['Plan Rows']), count), True
+
+def fetch_page(cursor, select_list, table_name, where, page, page_size, after=None):
+    """
+    Fetch one page of `SELECT select_list FROM table_name WHERE where`.
+
+    Tables with a primary key are paged by key: `after` is the `next_cursor`
+    of the previous page and the query seeks straight to it through the key
+    index, so late pages cost the same as the first. Views fall back to
+    OFFSET. Returns (rows, has_more, next_cursor).
+    """
+    key_columns = get_table_info(cursor, table_name)['keys']
+    conditions = [where] if where is not None else []
+    offset = (page - 1) * page_size
+    if key_columns and after:
+        conditions.append(sql.SQL("({}) > ({})").format(
+            sql.SQL(', ').join(sql.Identifier(name) for name, _ in key_columns),
+            sql.SQL(', ').join(
+                sql.SQL("CAST({} AS {})").format(sql.Literal(value), sql.SQL(key_type))
+                for value, (_, key_type) in zip(json.loads(after), key_columns)
+            )
+        ))
+        offset = 0
+    # Key values travel along with each row to build the next cursor
+    cursor_columns = [sql.SQL("{} AS {}").format(sql.Identifier(name), sql.Identifier(f"_cursor_{i}"))
+                      for i, (name, _) in enumerate(key_columns)]
+    query = sql.SQL("SELECT {} FROM {} {} {} OFFSET {} LIMIT {}").format(
+        sql.SQL(', ').join(list(select_list) + cursor_columns),
+        sql.Identifier(table_name),
+        sql.SQL("WHERE {}").format(sql.SQL(" AND ").join(conditions)) if conditions else sql.SQL(""),
+        sql.SQL("ORDER BY {}").format(sql.SQL(', ').join(sql.Identifier(name) for name, _ in key_columns)) if key_columns else sql.SQL(""),
+        sql.Literal(offset),
+        sql.Literal(page_size + 1)
+    )
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    for row in rows:
+        key_values = [row.pop(f"_cursor_{i}") for i in range(len(key_columns))]
+        if key_columns:
+            next_cursor = json.dumps([str(value) for value in key_values])
+    return rows, has_more, next_cursor if has_more else None
+
+def series_expression(selector, column_type):
+    """Numeric form of an x axis column to bucket on, or None if it is categorical."""
+    if column_type in NUMERIC_TYPES:
+        return sql.SQL("CAST({} AS double precision)").format(selector)
+    if column_type in TIME_TYPES:
+        return sql.SQL("EXTRACT(EPOCH FROM CAST({} AS timestamptz))").format(selector)
+    return None
+
+def downsample_series(cursor, table_name, x_column, y_column, column_types, max_points):
+    """
+    Reduce an x/y series to at most `max_points` points in the database.
+
+    Numeric and time x axes are cut into equal-width buckets, each returned as
+    its mean x and y plus the y range, so spikes survive. Categorical x axes
+    are grouped by value. Tables estimated above SAMPLE_ABOVE_ROWS are read
+    through TABLESAMPLE so the cost stays bounded however large the table is.
+    Returns (points, sampled percentage or None).
+    """
+    x_select = build_json_selector(x_column)
+    y_value = sql.SQL("CAST({} AS double precision)").format(build_json_selector(y_column))
+    x_type = column_types[x_column]['type']
+    x_series = series_expression(x_select, x_type)
+
+    sample = sql.SQL("")
+    sampled = None
+    if get_table_info(cursor, table_name)['kind'] in ('r', 'p'):
+        cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) SELECT 1 FROM {}").format(sql.Identifier(table_name)))
+        estimated_rows = cursor.fetchone()['QUERY PLAN'][0]['Plan']['Plan Rows']
+        if estimated_rows > SAMPLE_ABOVE_ROWS:
+            sampled = 100.0 * SAMPLE_ABOVE_ROWS / estimated_rows
+            sample = sql.SQL("TABLESAMPLE SYSTEM ({})").format(sql.Literal(sampled))
+
+    if x_series is None:
+        query = sql.SQL("""
+            SELECT {x} AS x_value, AVG({y}) AS y_value, MIN({y}) AS y_min, MAX({y}) AS y_max, COUNT(*) AS points
+            FROM {table} {sample}
+            WHERE {x} IS NOT NULL AND {y} IS NOT NULL
+            GROUP BY 1
+            ORDER BY 1
+            LIMIT {limit}
+        """).format(x=x_select, y=y_value, table=sql.Identifier(table_name), sample=sample, limit=sql.Literal(max_points))
+    else:
+        x_value = sql.SQL("to_timestamp(AVG(x))") if x_type in TIME_TYPES else sql.SQL("AVG(x)")
+        query = sql.SQL("""
+            WITH series AS (
+                SELECT {x} AS x, {y} AS y
+                FROM {table} {sample}
+                WHERE {x_raw} IS NOT NULL AND {y_raw} IS NOT NULL
+            ),
+            bounds AS (SELECT MIN(x) AS lo, MAX(x) AS hi FROM series)
+            SELECT {x_value} AS x_value, AVG(y) AS y_value, MIN(y) AS y_min, MAX(y) AS y_max, COUNT(*) AS points
+            FROM series, bounds
+            GROUP BY CASE WHEN hi > lo THEN LEAST(width_bucket(x, lo, hi, {buckets}), {buckets}) ELSE 0 END
+            ORDER BY 1
+        """).format(
+            x=x_series, y=y_value, x_raw=x_select, y_raw=build_json_selector(y_column),
+            table=sql.Identifier(table_name), sample=sample, x_value=x_value, buckets=sql.Literal(max_points)
+        )
+    cursor.execute(query)
+    points = []
+    for row in cursor.fetchall():
+        points.append({
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row.items()
+        })
+    return points, sampled
+
 def build_json_path_query(column):
     parts = column.split('.')
     if len(parts) == 1:
@@ -186,6 +383,17 @@ parser = argparse.ArgumentParser(description="SQL Dashboard with JSON handling o
 parser.add_argument("--flatten-json", action="store_true", help="Flatten JSON columns into separate columns. If false, format as line-separated JSON.")
 args = parser.parse_args()
 
+def decompress_json_blob(value):
+    """Decode zstd-compressed JSON (e.g. requests_expanded.raw_response_zstd) when zstandard is available."""
+    if zstandard is None:
+        return None
+    return json.loads(zstandard.ZstdDecompressor().decompress(bytes(value)).decode('utf-8'))
+
+def process_binary_data(key, value):
+    if key.endswith('_zstd'):
+        return process_json_data(decompress_json_blob(value), flatten=args.flatten_json)
+    return bytes(value).hex()
+
 def process_json_data(value, flatten=False):
     if value is None:
         return value
@@ -199,33 +407,41 @@ def process_json_data(value, flatten=False):
     except json.JSONDecodeError:
         return value
 
+def list_non_empty_tables(cursor):
+    """Tables and views with at least one row; partitions are browsed through their parent."""
+    query = """
+    SELECT table_name
+    FROM information_schema.tables
+    WHERE table_schema = 'public'
+    AND table_type IN ('BASE TABLE', 'VIEW')
+    AND table_name NOT IN (
+        SELECT c.relname FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relispartition
+    )
+    ORDER BY table_name
+    """
+    cursor.execute(query)
+    all_tables = [row[0] for row in cursor.fetchall()]
+    
+    non_empty_tables = []
+    for table in all_tables:
+        count_query = sql.SQL("SELECT EXISTS(SELECT 1 FROM {} LIMIT 1)").format(sql.Identifier(table))
+        cursor.execute(count_query)
+        has_rows = cursor.fetchone()[0]
+        if has_rows:
+            non_empty_tables.append(table)
+    
+    return non_empty_tables
+
 @app.get("/api/get-tables")
-async def get_tables():
+def get_tables():
     conn = None
     cursor = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        query = """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-        AND table_type = 'BASE TABLE'
-        ORDER BY table_name
-        """
-        cursor.execute(query)
-        all_tables = [row[0] for row in cursor.fetchall()]
-        
-        non_empty_tables = []
-        for table in all_tables:
-            count_query = sql.SQL("SELECT EXISTS(SELECT 1 FROM {} LIMIT 1)").format(sql.Identifier(table))
-            cursor.execute(count_query)
-            has_rows = cursor.fetchone()[0]
-            if has_rows:
-                non_empty_tables.append(table)
-        
-        return non_empty_tables
+        return cached_metadata('tables', lambda: list_non_empty_tables(cursor))
     except Exception as e:
         print(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred while fetching table names.")
@@ -233,10 +449,10 @@ async def get_tables():
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 @app.get("/api/column-names")
-async def get_column_names(table_name: str = Query(..., min_length=1)):
+def get_column_names(table_name: str = Query(..., min_length=1)):
     conn = None
     cursor = None
     try:
@@ -266,16 +482,18 @@ async def get_column_names(table_name: str = Query(..., min_length=1)):
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 @app.get("/api/metrics-data")
-async def get_metrics_data(
+def get_metrics_data(
     table_name: str = Query(..., min_length=1),
     x_column: str = Query(None),
     y_column: str = Query(None),
     full_table: bool = Query(False),
     page: int = Query(1, ge=1),
-    page_size: int = Query(100, ge=1, le=1000)
+    page_size: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None),
+    max_points: Optional[int] = Query(None, ge=2, le=100000)
 ):
     conn = None
     cursor = None
@@ -289,8 +507,22 @@ async def get_metrics_data(
 
         json_columns = [col for col, info in column_types.items() if info['type'] in ('json', 'jsonb')]
 
-        # Calculate offset
-        offset = (page - 1) * page_size
+        if (not full_table and max_points and x_column in column_types and y_column in column_types
+                and column_types[y_column]['type'] in NUMERIC_TYPES):
+            # Whole series, reduced in the database instead of paged to the browser
+            points, sampled = downsample_series(cursor, table_name, x_column, y_column, column_types, max_points)
+            return {
+                "data": points,
+                "total_count": len(points),
+                "count_is_estimate": False,
+                "downsampled": True,
+                "sampled_percent": sampled,
+                "page": 1,
+                "page_size": len(points),
+                "total_pages": 1,
+                "has_more": False,
+                "next_cursor": None
+            }
 
         if full_table:
             select_parts = []
@@ -304,35 +536,17 @@ async def get_metrics_data(
                     )
                 else:
                     select_parts.append(sql.Identifier(col))
-
-            query = sql.SQL("SELECT {} FROM {} OFFSET {} LIMIT {}").format(
-                sql.SQL(', ').join(select_parts),
-                sql.Identifier(table_name),
-                sql.Literal(offset),
-                sql.Literal(page_size)
-            )
         else:
             if not x_column or not y_column:
                 raise HTTPException(status_code=400, detail="X and Y columns must be specified when not fetching full table.")
             
-            x_select = build_json_selector(x_column)
-            y_select = build_json_selector(y_column)
-
-            query = sql.SQL("SELECT {} as x_value, {} as y_value FROM {} OFFSET {} LIMIT {}").format(
-                x_select,
-                y_select,
-                sql.Identifier(table_name),
-                sql.Literal(offset),
-                sql.Literal(page_size)
-            )
-
-        # Get total count
-        count_query = sql.SQL("SELECT COUNT(*) FROM {}").format(sql.Identifier(table_name))
-        cursor.execute(count_query)
-        total_count = cursor.fetchone()['count']
+            select_parts = [
+                sql.SQL("{} as x_value").format(build_json_selector(x_column)),
+                sql.SQL("{} as y_value").format(build_json_selector(y_column))
+            ]
 
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        total_count, count_is_estimate = count_rows(cursor, sql.SQL("SELECT 1 FROM {}").format(sql.Identifier(table_name)))
+        rows, has_more, next_cursor = fetch_page(cursor, select_parts, table_name, None, page, page_size, after)
 
         # Process the rows (keep existing processing logic)
         processed_rows = []
@@ -341,6 +555,8 @@ async def get_metrics_data(
             for key, value in row.items():
                 if key in json_columns and value is not None:
                     processed_row[key] = process_json_data(value, flatten=args.flatten_json)
+                elif isinstance(value, memoryview):
+                    processed_row[key] = process_binary_data(key, value)
                 elif isinstance(value, datetime):
                     processed_row[key] = value.isoformat()
                 else:
@@ -354,9 +570,12 @@ async def get_metrics_data(
         return {
             "data": processed_rows,
             "total_count": total_count,
+            "count_is_estimate": count_is_estimate,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total_count + page_size - 1) // page_size
+            "total_pages": (total_count + page_size - 1) // page_size,
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
 
     except Exception as e:
@@ -368,15 +587,16 @@ async def get_metrics_data(
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 @app.get("/api/search")
-async def search_database(
+def search_database(
     table_name: str = Query(..., min_length=1),
     search_term: str = Query(..., min_length=1),
     columns: Optional[List[str]] = Query(None),
     page: int = Query(1, ge=1),
-    page_size: int = Query(100, ge=1, le=1000)
+    page_size: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None)
 ):
     conn = None
     cursor = None
@@ -414,32 +634,14 @@ async def search_database(
                     )
 
         if not where_clauses:
-            return {"data": [], "total_count": 0, "page": page, "page_size": page_size, "total_pages": 0}
+            return {"data": [], "total_count": 0, "page": page, "page_size": page_size, "total_pages": 0,
+                    "has_more": False, "next_cursor": None}
 
-        # Calculate offset
-        offset = (page - 1) * page_size
-
-        # Construct the query
-        query = sql.SQL("SELECT * FROM {} WHERE {} OFFSET {} LIMIT {}").format(
-            sql.Identifier(table_name),
-            sql.SQL(" OR ").join(where_clauses),
-            sql.Literal(offset),
-            sql.Literal(page_size)
-        )
-
-        # Construct the count query
-        count_query = sql.SQL("SELECT COUNT(*) FROM {} WHERE {}").format(
-            sql.Identifier(table_name),
-            sql.SQL(" OR ").join(where_clauses)
+        where = sql.SQL("({})").format(sql.SQL(" OR ").join(where_clauses))
+        total_count, count_is_estimate = count_rows(
+            cursor, sql.SQL("SELECT 1 FROM {} WHERE {}").format(sql.Identifier(table_name), where)
         )
-
-        # Execute the count query
-        cursor.execute(count_query)
-        total_count = cursor.fetchone()['count']
-
-        # Execute the main query
-        cursor.execute(query)
-        results = cursor.fetchall()
+        results, has_more, next_cursor = fetch_page(cursor, [sql.SQL("*")], table_name, where, page, page_size, after)
 
         # Process the results
         processed_results = []
@@ -448,6 +650,8 @@ async def search_database(
             for key, value in row.items():
                 if column_types[key]['type'] in ('json', 'jsonb') and value is not None:
                     processed_row[key] = process_json_data(value, flatten=args.flatten_json)
+                elif isinstance(value, memoryview):
+                    processed_row[key] = process_binary_data(key, value)
                 elif isinstance(value, datetime):
                     processed_row[key] = value.isoformat()
                 else:
@@ -461,9 +665,12 @@ async def search_database(
         return {
             "data": processed_results,
             "total_count": total_count,
+            "count_is_estimate": count_is_estimate,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total_count + page_size - 1) // page_size
+            "total_pages": (total_count + page_size - 1) // page_size,
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
 
     except Exception as e:
@@ -473,7 +680,7 @@ async def search_database(
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 @app.get("/")
 async def read_root():
@@ -0,0 +1,96 @@
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+try:
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:
+    AsyncConnectionPool = None
+
+_pools = {}
+_async_pools = {}
+_lock = threading.Lock()
+
+
+def _pool_key(db_params):
+    return tuple(sorted((key, str(value)) for key, value in db_params.items()))
+
+
+def get_connection_pool(db_params, minconn: int = 1, maxconn: int = 10) -> ThreadedConnectionPool:
+    """
+    Return the process-wide psycopg2 pool for `db_params`, creating it on first use.
+
+    Pools are shared by everything in the process that connects with the same
+    parameters (the simulation data inserter, the dashboard), so connections
+    are opened once and reused across threads.
+    """
+    key = _pool_key(db_params)
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = ThreadedConnectionPool(minconn, maxconn, **db_params)
+            _pools[key] = pool
+        return pool
+
+
+@contextmanager
+def pooled_connection(db_params, **pool_kwargs):
+    """Borrow a connection from the shared pool; it is rolled back on error and returned on exit."""
+    pool = get_connection_pool(db_params, **pool_kwargs)
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        # Broken connections are discarded instead of handed to the next caller
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def close_pools():
+    with _lock:
+        for pool in _pools.values():
+            if not pool.closed:
+                pool.closeall()
+        _pools.clear()
+
+
+def _async_conninfo(db_params) -> str:
+    return psycopg2.extensions.make_dsn(**{key: value for key, value in db_params.items() if value is not None})
+
+
+async def get_async_connection_pool(db_params, min_size: int = 1, max_size: int = 10) -> "AsyncConnectionPool":
+    """
+    Return the process-wide psycopg 3 async pool for `db_params`.
+
+    For asyncio callers that should not hand queries to a thread. Needs the
+    optional `psycopg[pool]` package.
+    """
+    if AsyncConnectionPool is None:
+        raise ImportError("The async connection pool requires psycopg 3: pip install 'psycopg[binary,pool]'")
+    key = _pool_key(db_params)
+    pool = _async_pools.get(key)
+    if pool is None or pool.closed:
+        pool = AsyncConnectionPool(_async_conninfo(db_params), min_size=min_size, max_size=max_size, open=False)
+        _async_pools[key] = pool
+        await pool.open()
+    return pool
+
+
+@asynccontextmanager
+async def async_pooled_connection(db_params, **pool_kwargs):
+    """Async counterpart of `pooled_connection`; commits on success and rolls back on error."""
+    pool = await get_async_connection_pool(db_params, **pool_kwargs)
+    async with pool.connection() as conn:
+        yield conn
+
+
+async def close_async_pools():
+    for pool in _async_pools.values():
+        if not pool.closed:
+            await pool.close()
+    _async_pools.clear()
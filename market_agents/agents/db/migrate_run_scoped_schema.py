@@ -0,0 +1,112 @@
+# migrate_run_scoped_schema.py
+#
+# Moves a database created before run-scoped tables existed onto the
+# partitioned layout: each legacy table is renamed to <table>_legacy, the
+# partitioned tables are created, and the old rows are copied in as run 0
+# (the default partition). Pass --drop-legacy to remove the renamed tables
+# once the copy is done.
+
+import argparse
+import os
+import sys
+
+import psycopg2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from market_agents.agents.db.setup_database import create_tables, legacy_tables
+
+
+def get_db_params():
+    return {
+        'dbname': os.environ.get('DB_NAME', 'market_simulation'),
+        'user': os.environ.get('DB_USER', 'db_user'),
+        'password': os.environ.get('DB_PASSWORD', 'db_pwd@123'),
+        'host': os.environ.get('DB_HOST', 'localhost'),
+        'port': os.environ.get('DB_PORT', '5433')
+    }
+
+
+def table_columns(cursor, table):
+    cursor.execute("""
+    SELECT column_name FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name = %s
+    ORDER BY ordinal_position
+    """, (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def rename_legacy_table(cursor, table):
+    """Rename a table along with its indexes and id sequence, freeing their names for the new table."""
+    sequence = None
+    if 'id' in table_columns(cursor, table):
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+        sequence = cursor.fetchone()[0]
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    cursor.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s", (f"{table}_legacy",))
+    for (index,) in cursor.fetchall():
+        cursor.execute(f'ALTER INDEX "{index}" RENAME TO "{index}_legacy"')
+    if sequence:
+        cursor.execute(f"ALTER SEQUENCE {sequence} RENAME TO {table}_legacy_id_seq")
+
+
+def copy_legacy_rows(cursor, table):
+    legacy = f"{table}_legacy"
+    legacy_columns = table_columns(cursor, legacy)
+    new_columns = set(table_columns(cursor, table))
+    columns = [column for column in legacy_columns if column in new_columns and column not in ('run_id', 'round')]
+    if 'round' in legacy_columns:
+        round_expr = "COALESCE(round, 0)"
+    elif 'step_id' in legacy_columns:
+        round_expr = "COALESCE(step_id, 0)"
+    else:
+        round_expr = "0"
+    column_list = ', '.join(columns)
+    cursor.execute(
+        f"INSERT INTO {table} (run_id, round, {column_list}) "
+        f"SELECT 0, {round_expr}, {column_list} FROM {legacy}"
+    )
+    copied = cursor.rowcount
+    if 'id' in new_columns:
+        # New rows must not collide with the copied ids
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+    return copied
+
+
+def migrate(db_params, drop_legacy=False):
+    conn = psycopg2.connect(**db_params)
+    cursor = conn.cursor()
+    tables = legacy_tables(cursor)
+    if not tables:
+        print("All run-scoped tables are already partitioned; nothing to migrate.")
+        cursor.close()
+        conn.close()
+        return
+
+    # The view is bound to the old request_records and is recreated by create_tables
+    cursor.execute("DROP VIEW IF EXISTS requests_expanded")
+    for table in tables:
+        rename_legacy_table(cursor, table)
+    conn.commit()
+
+    create_tables(db_params)
+
+    for table in tables:
+        copied = copy_legacy_rows(cursor, table)
+        print(f"Copied {copied} rows from {table}_legacy into {table}")
+    if drop_legacy:
+        for table in tables:
+            cursor.execute(f"DROP TABLE {table}_legacy CASCADE")
+        print(f"Dropped {len(tables)} legacy tables")
+    conn.commit()
+    print(f"Migrated {', '.join(tables)} to the run-scoped schema.")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate simulation tables to the run-scoped, partitioned schema")
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop the renamed <table>_legacy tables after copying")
+    args = parser.parse_args()
+    migrate(get_db_params(), drop_legacy=args.drop_legacy)
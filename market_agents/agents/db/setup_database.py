@@ -2,6 +2,224 @@ import psycopg2
 import psycopg2.extras
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
+# High-volume per-round tables. Each is partitioned by LIST (run_id), and each
+# run's partition by RANGE (round), so queries scoped to a run and a round
+# range only touch the matching partitions. Rows written outside a run
+# (run_id 0, e.g. migrated legacy data) land in the <table>_default partition.
+# Values are (column definitions, unique key within a round, agent column used
+# by the (run_id, round, agent) index).
+RUN_SCOPED_TABLES = {
+    'agent_memories': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        agent_id UUID REFERENCES agents(id),
+        step_id INTEGER NOT NULL,
+        memory_data JSONB,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'agent_id'),
+    'allocations': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        agent_id UUID REFERENCES agents(id),
+        goods INTEGER NOT NULL,
+        cash DECIMAL(15, 2) NOT NULL,
+        locked_goods INTEGER NOT NULL,
+        locked_cash DECIMAL(15, 2) NOT NULL,
+        initial_goods INTEGER NOT NULL,
+        initial_cash DECIMAL(15, 2) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'agent_id'),
+    'orders': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        agent_id UUID REFERENCES agents(id),
+        is_buy BOOLEAN NOT NULL,
+        quantity INTEGER NOT NULL,
+        price DECIMAL(15, 2) NOT NULL,
+        base_value DECIMAL(15, 2),
+        base_cost DECIMAL(15, 2),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'agent_id'),
+    'trades': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL,
+        buyer_id UUID REFERENCES agents(id),
+        seller_id UUID REFERENCES agents(id),
+        quantity INTEGER NOT NULL,
+        price DECIMAL(15, 2) NOT NULL,
+        buyer_surplus DECIMAL(15, 2) NOT NULL,
+        seller_surplus DECIMAL(15, 2) NOT NULL,
+        total_surplus DECIMAL(15, 2) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'buyer_id'),
+    'interactions': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL,
+        agent_id UUID REFERENCES agents(id),
+        task TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'agent_id'),
+    'perceptions': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        memory_id UUID REFERENCES agents(id),
+        environment_name TEXT NOT NULL,
+        monologue TEXT,
+        strategy TEXT,
+        confidence FLOAT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'memory_id'),
+    'actions': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        memory_id UUID REFERENCES agents(id),
+        environment_name TEXT NOT NULL,
+        action JSONB,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'memory_id'),
+    'reflections': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        memory_id UUID REFERENCES agents(id),
+        environment_name TEXT NOT NULL,
+        reflection TEXT,
+        self_reward FLOAT,
+        environment_reward FLOAT,
+        total_reward FLOAT,
+        strategy_update TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'memory_id'),
+    'observations': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        memory_id UUID REFERENCES agents(id),
+        environment_name TEXT NOT NULL,
+        observation JSONB,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'memory_id'),
+    'groupchat': ("""
+        message_id UUID NOT NULL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL,
+        agent_id UUID REFERENCES agents(id),
+        sub_round INTEGER,
+        cohort_id TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        topic TEXT
+    """, 'message_id', 'agent_id'),
+    'requests': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        prompt_context_id TEXT,
+        start_time TIMESTAMP WITH TIME ZONE,
+        end_time TIMESTAMP WITH TIME ZONE,
+        total_time FLOAT,
+        model TEXT,
+        max_tokens INTEGER,
+        temperature FLOAT,
+        messages JSONB,
+        system TEXT,
+        tools JSONB,
+        tool_choice JSONB,
+        raw_response JSONB,
+        completion_tokens INTEGER,
+        prompt_tokens INTEGER,
+        total_tokens INTEGER,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'prompt_context_id'),
+    'request_records': ("""
+        id BIGSERIAL,
+        run_id INTEGER NOT NULL DEFAULT 0,
+        round INTEGER NOT NULL DEFAULT 0,
+        prompt_context_id TEXT,
+        start_time TIMESTAMP WITH TIME ZONE,
+        end_time TIMESTAMP WITH TIME ZONE,
+        total_time FLOAT,
+        model TEXT,
+        max_tokens INTEGER,
+        temperature FLOAT,
+        message_blob_ids BIGINT[] NOT NULL,
+        system_blob_id BIGINT REFERENCES prompt_blobs(id),
+        tools_blob_id BIGINT REFERENCES prompt_blobs(id),
+        tool_choice JSONB,
+        raw_response_blob_id BIGINT REFERENCES prompt_blobs(id),
+        completion_tokens INTEGER,
+        prompt_tokens INTEGER,
+        total_tokens INTEGER,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    """, 'id', 'prompt_context_id'),
+}
+
+def create_run_scoped_table(cursor, table):
+    columns, key, agent_column = RUN_SCOPED_TABLES[table]
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        {columns.strip()},
+        PRIMARY KEY (run_id, round, {key})
+    ) PARTITION BY LIST (run_id)
+    """)
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_run_round_{agent_column} ON {table} (run_id, round, {agent_column})")
+
+def create_run_partitions(cursor, run_id, max_rounds, rounds_per_partition=100, tables=None):
+    """Create the partitions of run `run_id`: one per table, split into round ranges of `rounds_per_partition`."""
+    for table in tables or RUN_SCOPED_TABLES:
+        run_partition = f"{table}_run{int(run_id)}"
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {run_partition} PARTITION OF {table} "
+            f"FOR VALUES IN ({int(run_id)}) PARTITION BY RANGE (round)"
+        )
+        for start in range(0, max_rounds + 1, rounds_per_partition):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {run_partition}_r{start} PARTITION OF {run_partition} "
+                f"FOR VALUES FROM ({start}) TO ({start + rounds_per_partition})"
+            )
+        # Rounds past max_rounds (e.g. an extended run) still have somewhere to go
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {run_partition}_rdefault PARTITION OF {run_partition} DEFAULT")
+
+def create_run(cursor, name, config, max_rounds, rounds_per_partition=100):
+    """Register a simulation run and create its partitions. Returns the run id."""
+    cursor.execute(
+        "INSERT INTO runs (name, config, max_rounds) VALUES (%s, %s, %s) RETURNING id",
+        (name, psycopg2.extras.Json(config), max_rounds)
+    )
+    run_id = cursor.fetchone()[0]
+    create_run_partitions(cursor, run_id, max_rounds, rounds_per_partition)
+    return run_id
+
+def finish_run(cursor, run_id):
+    cursor.execute("UPDATE runs SET finished_at = CURRENT_TIMESTAMP WHERE id = %s", (run_id,))
+
+def drop_run(cursor, run_id):
+    """Delete a run's data by dropping its partitions, without scanning the other runs."""
+    for table in RUN_SCOPED_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_run{int(run_id)}")
+    cursor.execute("DELETE FROM round_metrics WHERE run_id = %s", (run_id,))
+    cursor.execute("DELETE FROM run_equilibria WHERE run_id = %s", (run_id,))
+    cursor.execute("DELETE FROM runs WHERE id = %s", (run_id,))
+
+def legacy_tables(cursor):
+    """Run-scoped tables that still exist in the old, unpartitioned layout."""
+    cursor.execute("""
+    SELECT c.relname
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND c.relkind = 'r' AND c.relname = ANY(%s)
+    """, (list(RUN_SCOPED_TABLES),))
+    return [row[0] for row in cursor.fetchall()]
+
 def create_database(db_params):
     # Connect to PostgreSQL server
     conn = psycopg2.connect(
@@ -52,13 +270,15 @@ def create_tables(db_params):
     )
     """)
 
+
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS agent_memories (
+    CREATE TABLE IF NOT EXISTS runs (
         id SERIAL PRIMARY KEY,
-        agent_id UUID REFERENCES agents(id),
-        step_id INTEGER NOT NULL,
-        memory_data JSONB,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        name TEXT,
+        config JSONB,
+        max_rounds INTEGER,
+        started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP WITH TIME ZONE
     )
     """)
 
@@ -75,58 +295,9 @@ def create_tables(db_params):
     )
     """)
 
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS allocations (
-        id SERIAL PRIMARY KEY,
-        agent_id UUID REFERENCES agents(id),
-        goods INTEGER NOT NULL,
-        cash DECIMAL(15, 2) NOT NULL,
-        locked_goods INTEGER NOT NULL,
-        locked_cash DECIMAL(15, 2) NOT NULL,
-        initial_goods INTEGER NOT NULL,
-        initial_cash DECIMAL(15, 2) NOT NULL,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
 
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS orders (
-        id SERIAL PRIMARY KEY,
-        agent_id UUID REFERENCES agents(id),
-        is_buy BOOLEAN NOT NULL,
-        quantity INTEGER NOT NULL,
-        price DECIMAL(15, 2) NOT NULL,
-        base_value DECIMAL(15, 2),
-        base_cost DECIMAL(15, 2),
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
 
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS trades (
-        id SERIAL PRIMARY KEY,
-        buyer_id UUID REFERENCES agents(id),
-        seller_id UUID REFERENCES agents(id),
-        quantity INTEGER NOT NULL,
-        price DECIMAL(15, 2) NOT NULL,
-        buyer_surplus DECIMAL(15, 2) NOT NULL,
-        seller_surplus DECIMAL(15, 2) NOT NULL,
-        total_surplus DECIMAL(15, 2) NOT NULL,
-        round INTEGER NOT NULL,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
 
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS interactions (
-        id SERIAL PRIMARY KEY,
-        agent_id UUID REFERENCES agents(id),
-        round INTEGER NOT NULL,
-        task TEXT NOT NULL,
-        response TEXT NOT NULL,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
 
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS auctions (
@@ -157,110 +328,151 @@ def create_tables(db_params):
     )
     """)
 
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS perceptions (
-        id SERIAL PRIMARY KEY,
-        memory_id UUID REFERENCES agents(id),
-        environment_name TEXT NOT NULL,
-        monologue TEXT,
-        strategy TEXT,
-        confidence FLOAT,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
 
+
+
+
+    # Create a new table for vector embeddings
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS actions (
+    CREATE TABLE IF NOT EXISTS memory_embeddings (
         id SERIAL PRIMARY KEY,
-        memory_id UUID REFERENCES agents(id),
-        environment_name TEXT NOT NULL,
-        action JSONB,
+        agent_id UUID REFERENCES agents(id),
+        embedding vector(1536),
+        memory_data JSONB,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
     )
     """)
 
+
+    # Content-addressed prompt segments shared by many requests: system prompts,
+    # individual messages, tool schemas and raw responses. content_zstd holds
+    # the zstd-compressed text instead of content when compression is enabled.
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS reflections (
-        id SERIAL PRIMARY KEY,
-        memory_id UUID REFERENCES agents(id),
-        environment_name TEXT NOT NULL,
-        reflection TEXT,
-        self_reward FLOAT,
-        environment_reward FLOAT,
-        total_reward FLOAT,
-        strategy_update TEXT,
+    CREATE TABLE IF NOT EXISTS prompt_blobs (
+        id BIGSERIAL PRIMARY KEY,
+        hash BYTEA NOT NULL UNIQUE,
+        content TEXT,
+        content_zstd BYTEA,
+        size INTEGER NOT NULL,
         created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
     )
     """)
 
+
+    legacy = legacy_tables(cursor)
+    if legacy:
+        cursor.close()
+        conn.close()
+        raise RuntimeError(
+            f"Tables {', '.join(legacy)} use the pre-run schema; migrate them with "
+            f"`python -m market_agents.agents.db.migrate_run_scoped_schema`"
+        )
+    for table in RUN_SCOPED_TABLES:
+        create_run_scoped_table(cursor, table)
+
+    # Per-round market aggregates, kept up to date as trades are written so
+    # analysis reads one row per round instead of every trade
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS observations (
-        id SERIAL PRIMARY KEY,
-        memory_id UUID REFERENCES agents(id),
-        environment_name TEXT NOT NULL,
-        observation JSONB,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    CREATE TABLE IF NOT EXISTS round_metrics (
+        run_id INTEGER NOT NULL,
+        round INTEGER NOT NULL,
+        trade_count INTEGER NOT NULL DEFAULT 0,
+        traded_quantity INTEGER NOT NULL DEFAULT 0,
+        traded_value DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        vwap DECIMAL(15, 4),
+        min_price DECIMAL(15, 2),
+        max_price DECIMAL(15, 2),
+        buyer_surplus DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        seller_surplus DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        total_surplus DECIMAL(20, 2) NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, round)
     )
     """)
 
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS groupchat (
-        message_id UUID PRIMARY KEY,
-        agent_id UUID REFERENCES agents(id),
-        round INTEGER NOT NULL,
-        sub_round INTEGER,
-        cohort_id TEXT NOT NULL,
-        content TEXT NOT NULL,
-        timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-        topic TEXT
+    CREATE TABLE IF NOT EXISTS run_equilibria (
+        run_id INTEGER NOT NULL,
+        good_name TEXT NOT NULL,
+        price DECIMAL(15, 2),
+        quantity INTEGER,
+        buyer_surplus DECIMAL(20, 2),
+        seller_surplus DECIMAL(20, 2),
+        total_surplus DECIMAL(20, 2),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, good_name)
     )
     """)
-    # Create a new table for vector embeddings
+
+    # Running totals and efficiency against the theoretical equilibrium, per round
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS memory_embeddings (
-        id SERIAL PRIMARY KEY,
-        agent_id UUID REFERENCES agents(id),
-        embedding vector(1536),
-        memory_data JSONB,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
+    CREATE OR REPLACE VIEW round_market_metrics AS
+    SELECT
+        m.run_id,
+        m.round,
+        m.trade_count,
+        m.traded_quantity,
+        m.vwap,
+        m.min_price,
+        m.max_price,
+        m.buyer_surplus,
+        m.seller_surplus,
+        m.total_surplus,
+        SUM(m.traded_quantity) OVER w AS cumulative_quantity,
+        SUM(m.total_surplus) OVER w AS cumulative_surplus,
+        e.price AS equilibrium_price,
+        e.quantity AS equilibrium_quantity,
+        e.total_surplus AS theoretical_surplus,
+        CASE WHEN e.total_surplus > 0 THEN 100 * SUM(m.total_surplus) OVER w / e.total_surplus END AS efficiency
+    FROM round_metrics m
+    LEFT JOIN (
+        SELECT run_id, AVG(price) AS price, SUM(quantity) AS quantity, SUM(total_surplus) AS total_surplus
+        FROM run_equilibria
+        GROUP BY run_id
+    ) e ON e.run_id = m.run_id
+    WINDOW w AS (PARTITION BY m.run_id ORDER BY m.round)
     """)
 
+    # Rebuilds the columns of `requests` from request_records and prompt_blobs.
+    # Compressed raw responses come back in raw_response_zstd for the client to decompress.
     cursor.execute("""
-    CREATE TABLE IF NOT EXISTS requests (
-        id SERIAL PRIMARY KEY,
-        prompt_context_id TEXT,
-        start_time TIMESTAMP WITH TIME ZONE,
-        end_time TIMESTAMP WITH TIME ZONE,
-        total_time FLOAT,
-        model TEXT,
-        max_tokens INTEGER,
-        temperature FLOAT,
-        messages JSONB,
-        system TEXT,
-        tools JSONB,
-        tool_choice JSONB,
-        raw_response JSONB,
-        completion_tokens INTEGER,
-        prompt_tokens INTEGER,
-        total_tokens INTEGER,
-        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-    )
+    CREATE OR REPLACE VIEW requests_expanded AS
+    SELECT
+        r.id,
+        r.prompt_context_id,
+        r.start_time,
+        r.end_time,
+        r.total_time,
+        r.model,
+        r.max_tokens,
+        r.temperature,
+        (
+            SELECT jsonb_agg(b.content::jsonb ORDER BY m.ord)
+            FROM unnest(r.message_blob_ids) WITH ORDINALITY AS m(blob_id, ord)
+            JOIN prompt_blobs b ON b.id = m.blob_id
+        ) AS messages,
+        s.content AS system,
+        t.content::jsonb AS tools,
+        r.tool_choice,
+        rr.content::jsonb AS raw_response,
+        rr.content_zstd AS raw_response_zstd,
+        r.completion_tokens,
+        r.prompt_tokens,
+        r.total_tokens,
+        r.created_at,
+        r.run_id,
+        r.round
+    FROM request_records r
+    LEFT JOIN prompt_blobs s ON s.id = r.system_blob_id
+    LEFT JOIN prompt_blobs t ON t.id = r.tools_blob_id
+    LEFT JOIN prompt_blobs rr ON rr.id = r.raw_response_blob_id
     """)
 
     # Create indexes
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_requests_prompt_context_id ON requests(prompt_context_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_request_records_prompt_context_id ON request_records(prompt_context_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_memory_embeddings_embedding ON memory_embeddings USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_auction_id ON trades(id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_agent_id ON orders(agent_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_allocations_agent_id ON allocations(agent_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_interactions_agent_id ON interactions(agent_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_memories_agent_id ON agent_memories(agent_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_memories_step_id ON agent_memories(step_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_perceptions_memory_id ON perceptions(memory_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_actions_memory_id ON actions(memory_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reflections_memory_id ON reflections(memory_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_observations_memory_id ON observations(memory_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_run_round_seller_id ON trades (run_id, round, seller_id)")
 
     conn.commit()
     print("Tables, indexes, and pgvector extension created successfully.")
@@ -1,10 +1,11 @@
 from typing import Dict, Any, List, Optional, Type, Union
 from datetime import datetime
 from market_agents.agents.market_schemas import PerceptionSchema, ReflectionSchema
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from market_agents.agents.base_agent.agent import Agent as LLMAgent
 from market_agents.inference.message_models import LLMConfig, LLMPromptContext
 from market_agents.economics.econ_agent import EconomicAgent
+from market_agents.economics.agent_state import AgentStateStore, AgentStateView
 from market_agents.environments.environment import MultiAgentEnvironment, LocalObservation
 from market_agents.agents.protocols.protocol import Protocol
 from market_agents.agents.market_agent_prompter import MarketAgentPromptManager, AgentPromptVariables
@@ -13,6 +14,8 @@ from market_agents.agents.personas.persona import Persona
 
 class MarketAgent(LLMAgent):
     memory: List[Dict[str, Any]] = Field(default_factory=list)
+    memory_window: Optional[int] = Field(default=None, description="Most recent memory entries kept; all of them if None")
+    latest_strategy: Optional[Union[str, List[str]]] = Field(default=None, description="strategy_update of the latest memory entry that has one")
     last_perception: Optional[Dict[str, Any]] = None
     last_action: Optional[Dict[str, Any]] = None
     last_observation: Optional[LocalObservation] = Field(default_factory=dict)
@@ -21,6 +24,7 @@ class MarketAgent(LLMAgent):
     address: str = Field(default="", description="Agent's address")
     prompt_manager: MarketAgentPromptManager = Field(default_factory=lambda: MarketAgentPromptManager())
     economic_agent: Optional[EconomicAgent] = None
+    _state: Optional[AgentStateView] = PrivateAttr(default=None)
 
     @classmethod
     def create(
@@ -49,6 +53,25 @@ class MarketAgent(LLMAgent):
 
         return agent
 
+    @property
+    def state(self) -> Optional[AgentStateView]:
+        """This agent's row in the population's AgentStateStore, if it was bound to one."""
+        return self._state
+
+    def bind_state(self, store: AgentStateStore) -> AgentStateView:
+        """Mirror the economic agent's cash, holdings and pending orders into `store`."""
+        store.sync(self.economic_agent)
+        self._state = store.view(self.economic_agent.id)
+        return self._state
+
+    def remember(self, entry: Dict[str, Any]):
+        """Append a memory entry, keeping latest_strategy current and the memory within memory_window."""
+        self.memory.append(entry)
+        if 'strategy_update' in entry:
+            self.latest_strategy = entry['strategy_update']
+        if self.memory_window is not None and len(self.memory) > self.memory_window:
+            del self.memory[:len(self.memory) - self.memory_window]
+
     async def perceive(
             self,
             environment_name: str,
@@ -58,7 +81,8 @@ class MarketAgent(LLMAgent):
         if environment_name not in self.environments:
             raise ValueError(f"Environment {environment_name} not found")
 
-        environment_info = self.environments[environment_name].get_global_state()
+        # Rendered once per environment version and shared by all agents
+        environment_info = self.environments[environment_name].get_state_snapshot().markdown
         recent_memories = [self.memory[-1]] if self.memory else [{"content": "No previous memories"}]
         
         variables = AgentPromptVariables(
@@ -84,7 +108,7 @@ class MarketAgent(LLMAgent):
         environment = self.environments[environment_name]
         if perception is None and not return_prompt:
             perception = await self.perceive(environment_name)
-        environment_info = environment.get_global_state()
+        environment_info = environment.get_state_snapshot().markdown
         action_space = environment.action_space
         serialized_action_space = {
             "allowed_actions": [action_type.__name__ for action_type in action_space.allowed_actions]
@@ -148,14 +172,8 @@ class MarketAgent(LLMAgent):
             observation = {}
             reward = 0.0
 
-        environment_info = environment.get_global_state()
-        previous_strategy = None
-        if self.memory:
-            for memory_item in reversed(self.memory):
-                if 'strategy_update' in memory_item:
-                    previous_strategy = memory_item['strategy_update']
-                    break
-        
+        environment_info = environment.get_state_snapshot().markdown
+        previous_strategy = self.latest_strategy
         if previous_strategy is None:
             previous_strategy = "No previous strategy available"
         elif isinstance(previous_strategy, list):
@@ -191,7 +209,7 @@ class MarketAgent(LLMAgent):
                 self_reward * self_reward_weight
             )
             
-            self.memory.append({
+            self.remember({
                 "type": "reflection",
                 "content": response.get("reflection", ""),
                 "strategy_update": response.get("strategy_update", ""),
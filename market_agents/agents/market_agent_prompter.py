@@ -1,9 +1,10 @@
 import json
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Dict, Any, List, Optional, Union
-import yaml
 import os
 
+from market_agents.agents.prompt_registry import PromptTemplates, prompt_registry
+
 def json_to_markdown(data: Union[Dict, List, Any], indent: int = 0) -> str:
     """Convert JSON/dict data to a markdown formatted string."""
     if data is None:
@@ -56,26 +57,34 @@ class AgentPromptVariables(BaseModel):
 class MarketAgentPromptManager(BaseModel):
     prompts: Dict[str, str] = Field(default_factory=dict)
     prompt_file: str = Field(default="market_agents/agents/configs/prompts/market_agent_prompt.yaml")
+    _full_path: str = PrivateAttr(default="")
 
     def __init__(self, **data: Any):
         super().__init__(**data)
         script_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(os.path.dirname(script_dir))
-        full_path = os.path.join(project_root, self.prompt_file)
-        
+        self._full_path = os.path.join(project_root, self.prompt_file)
+        # Shared with every other agent; parsed once per process
+        self.prompts = self._templates().data
+
+    def _templates(self) -> PromptTemplates:
         try:
-            with open(full_path, 'r') as file:
-                self.prompts = yaml.safe_load(file)
+            return prompt_registry.load(self._full_path)
         except FileNotFoundError:
-            raise FileNotFoundError(f"Prompt file not found: {full_path}")
+            raise FileNotFoundError(f"Prompt file not found: {self._full_path}")
         
     def format_prompt(self, prompt_type: str, variables: Dict[str, Any]) -> str:
-        if prompt_type not in self.prompts:
+        template = self._templates().get(prompt_type)
+        if template is None:
             raise ValueError(f"Unknown prompt type: {prompt_type}")
         
-        # Convert empty values to N/A and format JSON/dict values as markdown
+        # Convert empty values to N/A and format JSON/dict values as markdown,
+        # only for the variables this template uses
         formatted_vars = {}
-        for key, value in variables.items():
+        for key in template.fields:
+            if key not in variables:
+                raise KeyError(f"Missing required variable in prompt: '{key}'")
+            value = variables[key]
             if value is None or (isinstance(value, (list, dict)) and not value):
                 formatted_vars[key] = "N/A"
             elif isinstance(value, (dict, list)):
@@ -85,9 +94,7 @@ class MarketAgentPromptManager(BaseModel):
                 formatted_vars[key] = str(value) if value else "N/A"
         
         try:
-            return self.prompts[prompt_type].format(**formatted_vars)
-        except KeyError as e:
-            raise KeyError(f"Missing required variable in prompt: {e}")
+            return template.render(formatted_vars)
         except Exception as e:
             raise ValueError(f"Error formatting prompt: {e}")
 
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+
+class CompiledTemplate:
+    """
+    A `str.format` template parsed once into literal text and field names.
+
+    Templates whose fields are plain names are rendered by joining the parts
+    directly; anything fancier (attribute or index lookups, format specs,
+    conversions) falls back to `str.format_map` on the source.
+    """
+
+    __slots__ = ('source', 'fields', '_parts')
+
+    def __init__(self, source: str):
+        self.source = source
+        parts: List[Tuple[str, Optional[str]]] = []
+        simple = True
+        for literal, field_name, format_spec, conversion in Formatter().parse(source):
+            if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+                simple = False
+            parts.append((literal, field_name))
+        self.fields = frozenset(
+            field_name.split('.')[0].split('[')[0] for _, field_name in parts if field_name
+        )
+        self._parts = parts if simple else None
+
+    def render(self, variables: Mapping[str, Any]) -> str:
+        if self._parts is None:
+            return self.source.format_map(variables)
+        rendered = []
+        for literal, field_name in self._parts:
+            rendered.append(literal)
+            if field_name is not None:
+                rendered.append(str(variables[field_name]))
+        return ''.join(rendered)
+
+
+class PromptTemplates:
+    """One version of a prompt YAML file: the raw values and their compiled templates."""
+
+    def __init__(self, path: str, data: Dict[str, Any], mtime_ns: int):
+        self.path = path
+        self.data = data
+        self.mtime_ns = mtime_ns
+        self.templates = {
+            key: CompiledTemplate(value) for key, value in data.items() if isinstance(value, str)
+        }
+        self._derived: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> CompiledTemplate:
+        return self.templates[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.templates
+
+    def get(self, key: str) -> Optional[CompiledTemplate]:
+        return self.templates.get(key)
+
+    def cached(self, key: str, factory: Callable[['PromptTemplates'], Any]) -> Any:
+        """Build something from this version of the file once, e.g. the schema models of a prompter."""
+        if key not in self._derived:
+            self._derived[key] = factory(self)
+        return self._derived[key]
+
+
+class PromptTemplateRegistry:
+    """
+    Process-wide cache of parsed and compiled prompt files.
+
+    A file is read and compiled the first time it is requested and re-read
+    only when its mtime changes. The mtime itself is checked at most every
+    `check_interval` seconds, so building prompts for thousands of agents in
+    a round does no file I/O at all.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._entries: Dict[str, Tuple[PromptTemplates, float]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str, default_path: Optional[str] = None) -> PromptTemplates:
+        """
+        Return the compiled templates of the YAML file at `path`, or of
+        `default_path` while `path` does not exist.
+
+        Raises:
+            FileNotFoundError: If neither file exists.
+            ValueError: If the file is not valid YAML or not a mapping.
+        """
+        path = os.path.abspath(path)
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and now - entry[1] < self.check_interval:
+            return entry[0]
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            if default_path is None:
+                raise
+            mtime_ns = None
+        if mtime_ns is None:
+            templates = self.load(default_path)
+        else:
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None and entry[0].path == path and entry[0].mtime_ns == mtime_ns:
+                    templates = entry[0]
+                else:
+                    templates = self._read(path, mtime_ns)
+        self._entries[path] = (templates, now)
+        return templates
+
+    @staticmethod
+    def _read(path: str, mtime_ns: int) -> PromptTemplates:
+        with open(path, 'r') as file:
+            try:
+                data = yaml.safe_load(file)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Error parsing YAML file {path}: {e}")
+        if not isinstance(data, dict):
+            raise ValueError(f"Prompt file {path} must contain a mapping of prompt names to templates")
+        return PromptTemplates(path, data, mtime_ns)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prompt_registry = PromptTemplateRegistry()
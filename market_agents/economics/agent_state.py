@@ -0,0 +1,282 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from market_agents.economics.econ_models import Bid, MarketAction, Trade
+
+
+class AgentStateStore:
+    """
+    Struct-of-arrays store for the numeric state of a population of agents.
+
+    Each agent is a row; cash, holdings, pending order quantities, roles and
+    accumulated rewards are NumPy columns (holdings and pending quantities have
+    one column per good). A 100k-agent population is a handful of arrays
+    instead of several hundred thousand pydantic objects, and whole-population
+    reads and updates are vectorized.
+
+    For LLM agents the EconomicAgent models stay authoritative and the store is
+    a mirror kept current by the auction orchestrator (`apply_trade`,
+    `add_order`, `reset_pending`) or refreshed with `sync`. Populations without
+    per-agent models, like the zero-intelligence engine, use it as their only
+    state.
+    """
+
+    def __init__(self, goods: List[str], capacity: int = 0):
+        self.goods = list(goods)
+        self._good_index = {good: i for i, good in enumerate(self.goods)}
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._capacity = 0
+        self._allocate(max(capacity, 16))
+
+    def _allocate(self, capacity: int):
+        num_goods = len(self.goods)
+        columns = {
+            '_is_buyer': np.zeros(capacity, dtype=bool),
+            '_cash': np.zeros(capacity, dtype=np.float64),
+            '_initial_cash': np.zeros(capacity, dtype=np.float64),
+            '_pending_cash': np.zeros(capacity, dtype=np.float64),
+            '_reward': np.zeros(capacity, dtype=np.float64),
+            '_holdings': np.zeros((capacity, num_goods), dtype=np.int64),
+            '_initial_holdings': np.zeros((capacity, num_goods), dtype=np.int64),
+            '_pending_bids': np.zeros((capacity, num_goods), dtype=np.int32),
+            '_pending_asks': np.zeros((capacity, num_goods), dtype=np.int32),
+        }
+        for name, column in columns.items():
+            if self._capacity:
+                column[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, column)
+        self._capacity = capacity
+
+    # Columns, trimmed to the agents in the store
+
+    @property
+    def is_buyer(self) -> np.ndarray:
+        return self._is_buyer[:self._size]
+
+    @property
+    def cash(self) -> np.ndarray:
+        return self._cash[:self._size]
+
+    @property
+    def initial_cash(self) -> np.ndarray:
+        return self._initial_cash[:self._size]
+
+    @property
+    def pending_cash(self) -> np.ndarray:
+        return self._pending_cash[:self._size]
+
+    @property
+    def reward(self) -> np.ndarray:
+        return self._reward[:self._size]
+
+    @property
+    def holdings(self) -> np.ndarray:
+        return self._holdings[:self._size]
+
+    @property
+    def initial_holdings(self) -> np.ndarray:
+        return self._initial_holdings[:self._size]
+
+    @property
+    def pending_bids(self) -> np.ndarray:
+        return self._pending_bids[:self._size]
+
+    @property
+    def pending_asks(self) -> np.ndarray:
+        return self._pending_asks[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns, including unused capacity."""
+        return sum(
+            getattr(self, name).nbytes for name in (
+                '_is_buyer', '_cash', '_initial_cash', '_pending_cash', '_reward',
+                '_holdings', '_initial_holdings', '_pending_bids', '_pending_asks'
+            )
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._rows
+
+    # Rows
+
+    def good_index(self, good_name: str) -> int:
+        try:
+            return self._good_index[good_name]
+        except KeyError:
+            raise KeyError(f"Good {good_name} is not tracked by this store (goods: {self.goods})")
+
+    def row(self, agent_id: str) -> int:
+        return self._rows[agent_id]
+
+    def add(self, agent_id: str, is_buyer: bool, cash: float, holdings: Optional[Dict[str, float]] = None) -> int:
+        """Add an agent with its initial cash and holdings and return its row."""
+        if agent_id in self._rows:
+            raise ValueError(f"Agent {agent_id} is already in the store")
+        if self._size == self._capacity:
+            self._allocate(2 * self._capacity)
+        row = self._size
+        self._size += 1
+        self.ids.append(agent_id)
+        self._rows[agent_id] = row
+        self._is_buyer[row] = is_buyer
+        self._cash[row] = self._initial_cash[row] = cash
+        for good_name, quantity in (holdings or {}).items():
+            self._holdings[row, self.good_index(good_name)] = quantity
+        self._initial_holdings[row] = self._holdings[row]
+        return row
+
+    def add_many(self, agent_ids: List[str], is_buyer: np.ndarray, cash: np.ndarray, holdings: Optional[np.ndarray] = None) -> np.ndarray:
+        """Add a whole population at once; `holdings` has one column per good. Returns the rows."""
+        count = len(agent_ids)
+        if any(agent_id in self._rows for agent_id in agent_ids):
+            raise ValueError("Some agents are already in the store")
+        capacity = self._capacity
+        while self._size + count > capacity:
+            capacity *= 2
+        if capacity != self._capacity:
+            self._allocate(capacity)
+        rows = np.arange(self._size, self._size + count)
+        self._is_buyer[rows] = is_buyer
+        self._cash[rows] = self._initial_cash[rows] = cash
+        if holdings is not None:
+            self._holdings[rows] = self._initial_holdings[rows] = holdings
+        self.ids.extend(agent_ids)
+        self._rows.update(zip(agent_ids, range(self._size, self._size + count)))
+        self._size += count
+        return rows
+
+    def view(self, agent_id: str) -> 'AgentStateView':
+        return AgentStateView(self, self._rows[agent_id])
+
+    # Updates
+
+    def sync(self, economic_agent) -> int:
+        """Refresh an agent's row from its EconomicAgent, adding the agent if it is new."""
+        basket = economic_agent.endowment.current_basket
+        goods = basket.goods_dict
+        if economic_agent.id not in self._rows:
+            initial = economic_agent.endowment.initial_basket
+            is_buyer = any(economic_agent.is_buyer(good) for good in self.goods)
+            self.add(economic_agent.id, is_buyer, initial.cash, {good: initial.goods_dict.get(good, 0) for good in self.goods})
+        row = self._rows[economic_agent.id]
+        self._cash[row] = basket.cash
+        for good_name, column in self._good_index.items():
+            self._holdings[row, column] = goods.get(good_name, 0)
+            self._pending_bids[row, column] = economic_agent.get_pending_bid_quantity(good_name)
+            self._pending_asks[row, column] = economic_agent.get_pending_ask_quantity(good_name)
+        self._pending_cash[row] = economic_agent.pending_cash
+        return row
+
+    def apply_trade(self, trade: Trade):
+        """
+        Move cash and goods between the buyer and the seller of a trade and
+        release their pending quantities. A side whose agent is not in the
+        store (e.g. an LLM agent trading with a ZI population) is skipped.
+        """
+        column = self.good_index(trade.good_name)
+        buyer, seller = self._rows.get(trade.buyer_id), self._rows.get(trade.seller_id)
+        value = trade.price * trade.quantity
+        if buyer is not None:
+            self._cash[buyer] -= value
+            self._holdings[buyer, column] += trade.quantity
+            self._pending_bids[buyer, column] = max(0, self._pending_bids[buyer, column] - trade.quantity)
+            self._pending_cash[buyer] = max(0.0, self._pending_cash[buyer] - trade.bid_price * trade.quantity)
+        if seller is not None:
+            self._cash[seller] += value
+            self._holdings[seller, column] -= trade.quantity
+            self._pending_asks[seller, column] = max(0, self._pending_asks[seller, column] - trade.quantity)
+
+    def add_order(self, agent_id: str, good_name: str, order: MarketAction):
+        row, column = self._rows[agent_id], self.good_index(good_name)
+        if isinstance(order, Bid):
+            self._pending_bids[row, column] += order.quantity
+            self._pending_cash[row] += order.price * order.quantity
+        else:
+            self._pending_asks[row, column] += order.quantity
+
+    def reset_pending(self):
+        self.pending_bids[:] = 0
+        self.pending_asks[:] = 0
+        self.pending_cash[:] = 0.0
+
+    def add_rewards(self, rewards: Dict[str, float]):
+        for agent_id, reward in rewards.items():
+            row = self._rows.get(agent_id)
+            if row is not None:
+                self._reward[row] += reward
+
+    def rows(self, agent_ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self._rows[agent_id] for agent_id in agent_ids), dtype=np.int64)
+
+
+class AgentStateView:
+    """One agent's row in an AgentStateStore, read and written through attributes."""
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store: AgentStateStore, row: int):
+        self.store = store
+        self.row = row
+
+    @property
+    def agent_id(self) -> str:
+        return self.store.ids[self.row]
+
+    @property
+    def is_buyer(self) -> bool:
+        return bool(self.store._is_buyer[self.row])
+
+    @property
+    def role(self) -> str:
+        return "buyer" if self.is_buyer else "seller"
+
+    @property
+    def cash(self) -> float:
+        return float(self.store._cash[self.row])
+
+    @cash.setter
+    def cash(self, value: float):
+        self.store._cash[self.row] = value
+
+    @property
+    def available_cash(self) -> float:
+        return float(self.store._cash[self.row] - self.store._pending_cash[self.row])
+
+    @property
+    def reward(self) -> float:
+        return float(self.store._reward[self.row])
+
+    @property
+    def goods(self) -> Dict[str, int]:
+        holdings = self.store._holdings[self.row]
+        return {good: int(holdings[i]) for i, good in enumerate(self.store.goods)}
+
+    def holding(self, good_name: str) -> int:
+        return int(self.store._holdings[self.row, self.store.good_index(good_name)])
+
+    def pending_bid_quantity(self, good_name: str) -> int:
+        return int(self.store._pending_bids[self.row, self.store.good_index(good_name)])
+
+    def pending_ask_quantity(self, good_name: str) -> int:
+        return int(self.store._pending_asks[self.row, self.store.good_index(good_name)])
+
+    def add_order(self, good_name: str, order: MarketAction):
+        self.store.add_order(self.agent_id, good_name, order)
+
+    def add_reward(self, reward: float):
+        self.store._reward[self.row] += reward
+
+    def reset_pending(self):
+        self.store._pending_bids[self.row] = 0
+        self.store._pending_asks[self.row] = 0
+        self.store._pending_cash[self.row] = 0.0
+
+    def __repr__(self) -> str:
+        return f"AgentStateView(agent_id={self.agent_id!r}, cash={self.cash:.2f}, goods={self.goods}, reward={self.reward:.2f})"
@@ -0,0 +1,84 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from market_agents.economics.agent_state import AgentStateStore
+from market_agents.economics.econ_agent import EconomicAgent, ZiParams
+
+GOOD = "apple"
+POPULATIONS = (1_000, 10_000, 100_000)
+
+
+def zi_params(i: int) -> ZiParams:
+    is_buyer = i % 2 == 0
+    return ZiParams(
+        id=f"agent_{i}",
+        initial_cash=1000.0 if is_buyer else 0.0,
+        initial_goods={GOOD: 0 if is_buyer else 10},
+        base_values={GOOD: 120.0 if is_buyer else 80.0},
+        num_units=10,
+        noise_factor=0.05,
+        max_relative_spread=0.2,
+        is_buyer=is_buyer
+    )
+
+
+def build_models(num_agents: int):
+    return [EconomicAgent.from_zi_params(zi_params(i)) for i in range(num_agents)]
+
+
+def build_store(num_agents: int):
+    store = AgentStateStore([GOOD], capacity=num_agents)
+    is_buyer = np.arange(num_agents) % 2 == 0
+    store.add_many(
+        [f"agent_{i}" for i in range(num_agents)],
+        is_buyer,
+        np.where(is_buyer, 1000.0, 0.0),
+        np.where(is_buyer, 0, 10).reshape(-1, 1)
+    )
+    return store
+
+
+def measure(build, num_agents: int):
+    """Build a population and return it with its retained bytes, build time and a full GC pass time."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    population = build(num_agents)
+    build_seconds = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    gc.collect()
+    gc_seconds = time.perf_counter() - start
+    return population, retained, build_seconds, gc_seconds
+
+
+def main(populations=POPULATIONS):
+    print(f"{'agents':>8}  {'layout':<16}{'MB':>10}{'bytes/agent':>13}{'build s':>10}{'gc s':>9}{'total cash s':>14}")
+    for num_agents in populations:
+        models, retained, build_seconds, gc_seconds = measure(build_models, num_agents)
+        start = time.perf_counter()
+        sum(agent.endowment.current_basket.cash for agent in models)
+        read_seconds = time.perf_counter() - start
+        print(f"{num_agents:>8}  {'EconomicAgent':<16}{retained / 1e6:>10.1f}{retained / num_agents:>13.0f}"
+              f"{build_seconds:>10.2f}{gc_seconds:>9.3f}{read_seconds:>14.4f}")
+        del models
+
+        store, retained, build_seconds, gc_seconds = measure(build_store, num_agents)
+        start = time.perf_counter()
+        store.cash.sum()
+        read_seconds = time.perf_counter() - start
+        print(f"{num_agents:>8}  {'AgentStateStore':<16}{retained / 1e6:>10.1f}{retained / num_agents:>13.0f}"
+              f"{build_seconds:>10.2f}{gc_seconds:>9.3f}{read_seconds:>14.4f}")
+        del store
+
+
+if __name__ == "__main__":
+    main(tuple(int(arg) for arg in sys.argv[1:]) or POPULATIONS)
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from market_agents.economics.econ_agent import ZiFactory, ZiParams
+from market_agents.economics.zi_engine import ZiPopulation
+from market_agents.environments.mechanisms.auction import AuctionAction, DoubleAuction, GlobalAuctionAction
+
+GOOD = "apple"
+NUM_ROUNDS = 5
+OBJECT_POPULATIONS = (1_000, 10_000)
+ENGINE_POPULATIONS = (1_000, 10_000, 100_000, 1_000_000)
+
+BUYER_PARAMS = ZiParams(
+    id="buyer_template",
+    initial_cash=1000.0,
+    initial_goods={GOOD: 0},
+    base_values={GOOD: 120.0},
+    num_units=10,
+    noise_factor=0.05,
+    max_relative_spread=0.2,
+    is_buyer=True
+)
+SELLER_PARAMS = ZiParams(
+    id="seller_template",
+    initial_cash=0.0,
+    initial_goods={GOOD: 10},
+    base_values={GOOD: 80.0},
+    num_units=10,
+    noise_factor=0.05,
+    max_relative_spread=0.2,
+    is_buyer=False
+)
+
+
+def run_objects(num_agents: int):
+    """The per-object path: one EconomicAgent per trader, quotes as AuctionActions, DoubleAuction matching."""
+    factory = ZiFactory(
+        id="bench",
+        goods=[GOOD],
+        num_buyers=num_agents // 2,
+        num_sellers=num_agents - num_agents // 2,
+        buyer_params=BUYER_PARAMS,
+        seller_params=SELLER_PARAMS
+    )
+    agents = {agent.id: agent for agent in factory.agents}
+    mechanism = DoubleAuction(max_rounds=NUM_ROUNDS, good_name=GOOD)
+    trades = 0
+    start = time.perf_counter()
+    for _ in range(NUM_ROUNDS):
+        actions = {}
+        for agent in agents.values():
+            agent.reset_all_pending_orders()
+            order = agent.generate_bid(GOOD) if agent.is_buyer(GOOD) else agent.generate_ask(GOOD)
+            if order is not None:
+                actions[agent.id] = AuctionAction(agent_id=agent.id, action=order)
+        step = mechanism.step(GlobalAuctionAction(actions=actions))
+        # Quotes live for one round, as in the engine
+        mechanism.order_book.clear()
+        for trade in step.global_observation.all_trades:
+            agents[trade.buyer_id].process_trade(trade)
+            agents[trade.seller_id].process_trade(trade)
+        trades += len(step.global_observation.all_trades)
+    return (time.perf_counter() - start) / NUM_ROUNDS, trades
+
+
+def run_engine(num_agents: int):
+    population = ZiPopulation.from_params(
+        [GOOD], BUYER_PARAMS, SELLER_PARAMS, num_agents // 2, num_agents - num_agents // 2, seed=0
+    )
+    trades = 0
+    start = time.perf_counter()
+    for _ in range(NUM_ROUNDS):
+        trades += population.run_round()[GOOD].num_trades
+    return (time.perf_counter() - start) / NUM_ROUNDS, trades
+
+
+def main():
+    print(f"{'agents':>9}  {'path':<16}{'s/round':>10}{'trades':>10}")
+    for num_agents in ENGINE_POPULATIONS:
+        if num_agents in OBJECT_POPULATIONS:
+            seconds, trades = run_objects(num_agents)
+            print(f"{num_agents:>9}  {'EconomicAgent':<16}{seconds:>10.3f}{trades:>10}")
+        seconds, trades = run_engine(num_agents)
+        print(f"{num_agents:>9}  {'ZiPopulation':<16}{seconds:>10.3f}{trades:>10}")
+
+
+if __name__ == "__main__":
+    main()
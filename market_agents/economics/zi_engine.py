@@ -0,0 +1,262 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from market_agents.economics.agent_state import AgentStateStore
+from market_agents.economics.econ_agent import EconomicAgent, ZiParams
+from market_agents.economics.econ_models import Trade
+
+
+def clear_call_market(bid_prices: np.ndarray, ask_prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Match quotes the way DoubleAuction._match_orders does: the highest bid
+    against the lowest ask, then the next pair, for as long as they cross.
+    Equal prices keep submission order.
+
+    Returns the indices of the matched bids and asks, pairwise; each pair
+    trades at the midpoint of its two prices.
+    """
+    bid_order = np.argsort(-bid_prices, kind='stable')
+    ask_order = np.argsort(ask_prices, kind='stable')
+    depth = min(len(bid_order), len(ask_order))
+    # Sorted bids fall and sorted asks rise, so the crossing pairs are a prefix
+    matched = np.count_nonzero(bid_prices[bid_order[:depth]] >= ask_prices[ask_order[:depth]])
+    return bid_order[:matched], ask_order[:matched]
+
+
+@dataclass
+class ZiQuotes:
+    """The bids and asks a ZI population quoted for one good in one round, by store row."""
+    good: str
+    bid_rows: np.ndarray
+    bid_prices: np.ndarray
+    ask_rows: np.ndarray
+    ask_prices: np.ndarray
+
+
+@dataclass
+class ZiRoundResult:
+    """The trades of one good cleared in one round, as parallel arrays."""
+    good: str
+    buyer_rows: np.ndarray
+    seller_rows: np.ndarray
+    prices: np.ndarray
+    bid_prices: np.ndarray
+    ask_prices: np.ndarray
+    buyer_surplus: np.ndarray
+    seller_surplus: np.ndarray
+    num_bids: int
+    num_asks: int
+
+    @property
+    def num_trades(self) -> int:
+        return len(self.prices)
+
+    @property
+    def total_surplus(self) -> float:
+        return float(self.buyer_surplus.sum() + self.seller_surplus.sum())
+
+    def to_trades(self, ids: List[str], first_trade_id: int = 0) -> List[Trade]:
+        """Materialize the trades as Trade models, e.g. to store or compare them with an LLM run."""
+        return [
+            Trade(
+                trade_id=first_trade_id + i,
+                buyer_id=ids[buyer],
+                seller_id=ids[seller],
+                price=float(price),
+                bid_price=float(bid_price),
+                ask_price=float(ask_price),
+                quantity=1,
+                good_name=self.good
+            )
+            for i, (buyer, seller, price, bid_price, ask_price) in enumerate(zip(
+                self.buyer_rows, self.seller_rows, self.prices, self.bid_prices, self.ask_prices
+            ))
+        ]
+
+
+class ZiPopulation:
+    """
+    Zero-intelligence traders held as arrays instead of EconomicAgent models.
+
+    Cash, holdings and pending quantities live in an AgentStateStore; value
+    (buyers) and cost (sellers) schedules are one `[agents, goods, units]`
+    matrix. `draw_quotes` prices the next unit of every eligible agent in one
+    vectorized step, following the same rules as EconomicAgent.generate_bid
+    and generate_ask, and `clear` matches them like the double auction. A
+    round for a million traders is a few array operations.
+    """
+
+    def __init__(
+        self,
+        store: AgentStateStore,
+        schedules: np.ndarray,
+        num_units: np.ndarray,
+        max_relative_spread: np.ndarray,
+        seed: Optional[int] = None
+    ):
+        if schedules.shape[:2] != (len(store), len(store.goods)):
+            raise ValueError(f"Schedules of shape {schedules.shape} do not match {len(store)} agents and {len(store.goods)} goods")
+        self.store = store
+        self.schedules = schedules
+        self.num_units = num_units
+        self.max_relative_spread = max_relative_spread
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_params(
+        cls,
+        goods: List[str],
+        buyer_params: ZiParams,
+        seller_params: ZiParams,
+        num_buyers: int,
+        num_sellers: int,
+        seed: Optional[int] = None
+    ) -> 'ZiPopulation':
+        """A population like ZiFactory's, with every schedule drawn with its own noise."""
+        rng = np.random.default_rng(seed)
+        num_agents = num_buyers + num_sellers
+        max_units = max(buyer_params.num_units, seller_params.num_units)
+        schedules = np.zeros((num_agents, len(goods), max_units))
+        num_units = np.zeros((num_agents, len(goods)), dtype=np.int64)
+        holdings = np.zeros((num_agents, len(goods)), dtype=np.int64)
+        blocks = ((slice(0, num_buyers), buyer_params, True), (slice(num_buyers, num_agents), seller_params, False))
+        for rows, params, is_buyer in blocks:
+            count = rows.stop - rows.start
+            for column, good in enumerate(goods):
+                holdings[rows, column] = params.initial_goods.get(good, 0)
+                if good not in params.base_values:
+                    continue
+                # Each unit is 2% to noise_factor below (buyers) or above (sellers) the previous one
+                steps = rng.uniform(0.02, params.noise_factor, size=(count, params.num_units))
+                factors = 1 - steps if is_buyer else 1 + steps
+                schedules[rows, column, :params.num_units] = params.base_values[good] * np.cumprod(factors, axis=1)
+                num_units[rows, column] = params.num_units
+
+        store = AgentStateStore(goods, capacity=num_agents)
+        store.add_many(
+            [f"buyer_{i}" for i in range(num_buyers)] + [f"seller_{i}" for i in range(num_sellers)],
+            np.arange(num_agents) < num_buyers,
+            np.where(np.arange(num_agents) < num_buyers, buyer_params.initial_cash, seller_params.initial_cash),
+            holdings
+        )
+        spread = np.where(np.arange(num_agents) < num_buyers, buyer_params.max_relative_spread, seller_params.max_relative_spread)
+        return cls(store, schedules, num_units, spread, seed=None if seed is None else seed + 1)
+
+    @classmethod
+    def from_agents(cls, agents: List[EconomicAgent], goods: List[str], seed: Optional[int] = None) -> 'ZiPopulation':
+        """Copy the schedules and current state of existing EconomicAgents, e.g. the non-LLM agents of a run."""
+        max_units = max(
+            [schedule.num_units for agent in agents for schedule in (*agent.value_schedules.values(), *agent.cost_schedules.values())],
+            default=0
+        )
+        schedules = np.zeros((len(agents), len(goods), max_units))
+        num_units = np.zeros((len(agents), len(goods)), dtype=np.int64)
+        store = AgentStateStore(goods, capacity=len(agents))
+        for row, agent in enumerate(agents):
+            store.sync(agent)
+            for column, good in enumerate(goods):
+                schedule = agent.value_schedules.get(good) or agent.cost_schedules.get(good)
+                if schedule is None:
+                    continue
+                schedules[row, column, :schedule.num_units] = [schedule.get_value(unit) for unit in range(1, schedule.num_units + 1)]
+                num_units[row, column] = schedule.num_units
+        spread = np.array([agent.max_relative_spread for agent in agents], dtype=np.float64)
+        return cls(store, schedules, num_units, spread, seed=seed)
+
+    @property
+    def ids(self) -> List[str]:
+        return self.store.ids
+
+    def _unit_values(self, rows: np.ndarray, column: int, units: np.ndarray) -> np.ndarray:
+        """Schedule entries of the given 0-based units, 0 past an agent's last unit."""
+        in_range = units < self.num_units[rows, column]
+        values = np.zeros(len(rows))
+        values[in_range] = self.schedules[rows[in_range], column, units[in_range]]
+        return values
+
+    def draw_quotes(self, good: str) -> ZiQuotes:
+        """
+        Quote the next unit of `good` for every agent that can trade it and
+        record the quotes as pending, like EconomicAgent.generate_bid/ask:
+        bids are drawn below min(cash, 0.99 * marginal value) and asks above
+        1.01 * marginal cost, within each agent's max_relative_spread.
+        """
+        store = self.store
+        column = store.good_index(good)
+        units = self.num_units[:, column]
+        cash = store.cash
+        holdings = store.holdings[:, column]
+        pending_bids = store.pending_bids[:, column]
+        pending_asks = store.pending_asks[:, column]
+
+        bidding = store.is_buyer & (units > 0) & (cash - store.pending_cash > 0) & (holdings + pending_bids < units)
+        bid_rows = np.flatnonzero(bidding)
+        values = self._unit_values(bid_rows, column, holdings[bid_rows] + pending_bids[bid_rows])
+        bid_rows, values = bid_rows[values > 0], values[values > 0]
+        max_bids = np.minimum(cash[bid_rows], values * 0.99)
+        bid_prices = max_bids * (1 - self.max_relative_spread[bid_rows] * self.rng.random(len(bid_rows)))
+
+        sold = store.initial_holdings[:, column] - holdings + pending_asks
+        asking = ~store.is_buyer & (units > 0) & (holdings - pending_asks > 0) & (sold >= 0)
+        ask_rows = np.flatnonzero(asking)
+        costs = self._unit_values(ask_rows, column, sold[ask_rows])
+        ask_rows, costs = ask_rows[costs > 0], costs[costs > 0]
+        min_asks = costs * 1.01
+        ask_prices = min_asks * (1 + self.max_relative_spread[ask_rows] * self.rng.random(len(ask_rows)))
+
+        np.add.at(pending_bids, bid_rows, 1)
+        np.add.at(store.pending_cash, bid_rows, bid_prices)
+        np.add.at(pending_asks, ask_rows, 1)
+        return ZiQuotes(good, bid_rows, bid_prices, ask_rows, ask_prices)
+
+    def clear(self, quotes: ZiQuotes) -> ZiRoundResult:
+        """
+        Match the quotes, apply the trades to cash, holdings and rewards, and
+        expire the unmatched quotes: like the auction orchestrator's pending
+        orders, quotes live for one round.
+        """
+        store = self.store
+        column = store.good_index(quotes.good)
+        bid_index, ask_index = clear_call_market(quotes.bid_prices, quotes.ask_prices)
+        buyer_rows, seller_rows = quotes.bid_rows[bid_index], quotes.ask_rows[ask_index]
+        bid_prices, ask_prices = quotes.bid_prices[bid_index], quotes.ask_prices[ask_index]
+        prices = (bid_prices + ask_prices) / 2
+
+        holdings = store.holdings[:, column]
+        values = self._unit_values(buyer_rows, column, holdings[buyer_rows])
+        costs = self._unit_values(seller_rows, column, store.initial_holdings[seller_rows, column] - holdings[seller_rows])
+        buyer_surplus = values - prices
+        seller_surplus = prices - costs
+
+        np.subtract.at(store.cash, buyer_rows, prices)
+        np.add.at(store.cash, seller_rows, prices)
+        np.add.at(holdings, buyer_rows, 1)
+        np.subtract.at(holdings, seller_rows, 1)
+        np.add.at(store.reward, buyer_rows, buyer_surplus)
+        np.add.at(store.reward, seller_rows, seller_surplus)
+
+        np.subtract.at(store.pending_bids[:, column], quotes.bid_rows, 1)
+        np.subtract.at(store.pending_asks[:, column], quotes.ask_rows, 1)
+        np.subtract.at(store.pending_cash, quotes.bid_rows, quotes.bid_prices)
+
+        return ZiRoundResult(
+            good=quotes.good,
+            buyer_rows=buyer_rows,
+            seller_rows=seller_rows,
+            prices=prices,
+            bid_prices=bid_prices,
+            ask_prices=ask_prices,
+            buyer_surplus=buyer_surplus,
+            seller_surplus=seller_surplus,
+            num_bids=len(quotes.bid_rows),
+            num_asks=len(quotes.ask_rows)
+        )
+
+    def run_round(self, goods: Optional[List[str]] = None) -> Dict[str, ZiRoundResult]:
+        """Quote and clear one round for each good."""
+        return {good: self.clear(self.draw_quotes(good)) for good in (goods or self.store.goods)}
+
+    def simulate(self, num_rounds: int, goods: Optional[List[str]] = None) -> List[Dict[str, ZiRoundResult]]:
+        return [self.run_round(goods) for _ in range(num_rounds)]
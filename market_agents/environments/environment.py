@@ -1,5 +1,5 @@
 from typing import Dict, Any, List, Optional, Type, Union, Tuple
-from pydantic import BaseModel, Field, computed_field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field
 from datetime import datetime
 import random
 import string
@@ -7,6 +7,8 @@ from statistics import mean
 from abc import ABC, abstractmethod
 import json
 
+from market_agents.agents.market_agent_prompter import json_to_markdown
+
 class LocalAction(BaseModel, ABC):
     """Represents an action for a single agent."""
     agent_id: str
@@ -167,6 +169,8 @@ class ObservationSpace(BaseModel):
 
 class Mechanism(BaseModel, ABC):
     sequential: bool = Field(default=False, description="Whether the mechanism is sequential")
+    _state_version: int = PrivateAttr(default=0)
+
     @abstractmethod
     def step(self, action: Union[LocalAction, GlobalAction]) -> Union[LocalEnvironmentStep, EnvironmentStep]:
         """Execute a step in the mechanism."""
@@ -178,6 +182,18 @@ class Mechanism(BaseModel, ABC):
         """Get the global state of the mechanism."""
         pass
 
+    def get_windowed_state(self, last_rounds: int) -> Any:
+        """Get the global state limited to the last `last_rounds` rounds of history, for mechanisms that keep one."""
+        return self.get_global_state()
+
+    def mark_state_changed(self):
+        """Invalidate environment snapshots after changing state outside of `step`."""
+        self._state_version += 1
+
+    @property
+    def state_version(self) -> int:
+        return self._state_version
+
 class Notebook(Mechanism):
     text: str = Field(default="", description="The notebook's text content")
     
@@ -214,6 +230,29 @@ class NotebookObservationSpace(ObservationSpace):
     def sample(self, agent_id: str) -> LocalObservation:
         return StrObservation.sample(agent_id)
 
+class EnvironmentSnapshot:
+    """
+    The global state of an environment at one version, shared by every agent
+    that builds a prompt before the environment changes again. The markdown
+    rendering is computed on first use and then reused.
+    """
+
+    def __init__(self, version: Tuple[int, int, Optional[int]], round: int, state: Any):
+        self.version = version
+        self.round = round
+        self.state = state
+        self._markdown: Optional[str] = None
+
+    @property
+    def markdown(self) -> str:
+        if self._markdown is None:
+            if self.state is None or (isinstance(self.state, (list, dict)) and not self.state):
+                self._markdown = "N/A"
+            else:
+                self._markdown = json_to_markdown(self.state).strip()
+        return self._markdown
+
+
 class MultiAgentEnvironment(BaseModel):
     """
     Base class for multi-agent environments. With batched or sequential actions.
@@ -226,6 +265,9 @@ class MultiAgentEnvironment(BaseModel):
     observation_space: ObservationSpace = Field(default_factory=NotebookObservationSpace, description="Observation space of the environment")
     history: EnvironmentHistory = Field(default_factory=EnvironmentHistory, description="History of environment steps")
     mechanism: Mechanism = Field(default_factory=Notebook, description="Mechanism of the environment that determines the rules of the game P(s, a, s')")
+    prompt_window_rounds: Optional[int] = Field(default=None, description="Rounds of history included in agent prompts; all of it if None")
+    _state_version: int = PrivateAttr(default=0)
+    _snapshot: Optional[EnvironmentSnapshot] = PrivateAttr(default=None)
 
     def step(self, actions: GlobalAction) -> EnvironmentStep:
         """
@@ -249,6 +291,7 @@ class MultiAgentEnvironment(BaseModel):
             global_step = self.mechanism.step(actions)
             assert isinstance(global_step, EnvironmentStep)
         self.current_step += 1
+        self._state_version += 1
         self.update_history(actions, global_step)
         return global_step
 
@@ -260,6 +303,7 @@ class MultiAgentEnvironment(BaseModel):
             GlobalObservation: Initial global observation of the environment.
         """
         self.current_step = 0
+        self._state_version += 1
         self.global_state = {}
         self.history = EnvironmentHistory()
         if isinstance(self.mechanism, Notebook):
@@ -287,6 +331,24 @@ class MultiAgentEnvironment(BaseModel):
         """
         return self.mechanism.get_global_state()
 
+    def get_state_snapshot(self) -> EnvironmentSnapshot:
+        """
+        Return the global state for agent prompts, windowed to
+        `prompt_window_rounds`.
+
+        The snapshot is computed once per environment version (every step,
+        reset or out-of-band mechanism change starts a new one), so all agents
+        prompted in between share the same state and markdown rendering.
+        """
+        version = (self._state_version, self.mechanism.state_version, self.prompt_window_rounds)
+        if self._snapshot is None or self._snapshot.version != version:
+            if self.prompt_window_rounds is None:
+                state = self.mechanism.get_global_state()
+            else:
+                state = self.mechanism.get_windowed_state(self.prompt_window_rounds)
+            self._snapshot = EnvironmentSnapshot(version, self.current_step, state)
+        return self._snapshot
+
     def get_current_step(self) -> int:
         """
         Return the current step/round of the simulation.
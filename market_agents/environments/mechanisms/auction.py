@@ -1,13 +1,15 @@
 # double_auction.py
 
 import logging
+from collections import defaultdict
 from typing import Any, List, Dict, Union, Type, Optional, Tuple
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, field_validator
 from market_agents.environments.environment import (
     Mechanism, LocalAction, GlobalAction, LocalObservation, GlobalObservation,
     EnvironmentStep, ActionSpace, ObservationSpace, MultiAgentEnvironment
 )
 from market_agents.economics.econ_models import Bid, Ask, MarketAction, Trade
+from market_agents.environments.mechanisms.order_book import OrderBook
 import random
 logger = logging.getLogger(__name__)
 
@@ -71,16 +73,34 @@ class DoubleAuction(Mechanism):
     max_rounds: int = Field(default=10, description="Maximum number of auction rounds")
     current_round: int = Field(default=0, description="Current round number")
     trades: List[Trade] = Field(default_factory=list, description="List of executed trades")
-    waiting_bids: List[AuctionAction] = Field(default_factory=list, description="List of waiting bids")
-    waiting_asks: List[AuctionAction] = Field(default_factory=list, description="List of waiting asks")
     good_name: str = Field(default="apple", description="Name of the good being traded")
 
     sequential: bool = Field(default=False, description="Whether the mechanism is sequential")
+    # Index into trades of the first trade of each round
+    _round_trade_starts: List[int] = PrivateAttr(default_factory=list)
+    _book: OrderBook = PrivateAttr(default_factory=OrderBook)
+
+    @property
+    def order_book(self) -> OrderBook:
+        return self._book
+
+    @computed_field
+    @property
+    def waiting_bids(self) -> List[AuctionAction]:
+        """Resting bids, best price first, then earliest."""
+        return self._book.bids()
+
+    @computed_field
+    @property
+    def waiting_asks(self) -> List[AuctionAction]:
+        """Resting asks, best price first, then earliest."""
+        return self._book.asks()
 
     def step(self, action: GlobalAuctionAction) -> EnvironmentStep:
         self.current_round += 1
         self._update_waiting_orders(action.actions)
         new_trades = self._match_orders()
+        self._round_trade_starts.append(len(self.trades))
         self.trades.extend(new_trades)
 
         market_summary = self._create_market_summary(new_trades)
@@ -102,24 +122,23 @@ class DoubleAuction(Mechanism):
             action = auction_action.action
             if isinstance(action, Bid):
                 # print(f"Bid from agent {agent_id}: {action}")
-                self.waiting_bids.append(auction_action)
+                self._book.add(auction_action, is_bid=True)
             elif isinstance(action, Ask):
                 # print(f"Ask from agent {agent_id}: {action}")
-                self.waiting_asks.append(auction_action)
+                self._book.add(auction_action, is_bid=False)
             else:
                 logger.error(f"Invalid action type from agent {agent_id}: {type(action)}")
 
     def _match_orders(self) -> List[Trade]:
         trades = []
         trade_id = len(self.trades)
+        book = self._book
 
-        # Sort bids and asks
-        self.waiting_bids.sort(key=lambda x: x.action.price, reverse=True)
-        self.waiting_asks.sort(key=lambda x: x.action.price)
-
-        while self.waiting_bids and self.waiting_asks:
-            bid = self.waiting_bids[0]
-            ask = self.waiting_asks[0]
+        while True:
+            bid = book.best_bid()
+            ask = book.best_ask()
+            if bid is None or ask is None:
+                break
 
             if bid.action.price >= ask.action.price:
                 trade_price = (bid.action.price + ask.action.price) / 2
@@ -138,8 +157,8 @@ class DoubleAuction(Mechanism):
                 trade_id += 1
 
                 # Remove matched bid and ask
-                self.waiting_bids.pop(0)
-                self.waiting_asks.pop(0)
+                book.pop_best_bid()
+                book.pop_best_ask()
             else:
                 # No more matches possible
                 break
@@ -149,19 +168,21 @@ class DoubleAuction(Mechanism):
     def _create_observations(self, new_trades: List[Trade], market_summary: MarketSummary) -> Dict[str, AuctionLocalObservation]:
         observations = {}
 
-        # Agents with trades in this round
-        participant_ids = set([trade.buyer_id for trade in new_trades] + [trade.seller_id for trade in new_trades])
-
-        # Agents with waiting orders
-        waiting_order_agents = set([bid.agent_id for bid in self.waiting_bids] + [ask.agent_id for ask in self.waiting_asks])
+        # Trades of this round by participant, in one pass
+        trades_by_agent: Dict[str, List[Trade]] = defaultdict(list)
+        for trade in new_trades:
+            trades_by_agent[trade.buyer_id].append(trade)
+            if trade.seller_id != trade.buyer_id:
+                trades_by_agent[trade.seller_id].append(trade)
 
-        all_agent_ids = participant_ids.union(waiting_order_agents)
+        # Agents with trades in this round or waiting orders
+        book = self._book
+        all_agent_ids = set(trades_by_agent).union(book.agent_ids())
 
         for agent_id in all_agent_ids:
-            agent_trades = [trade for trade in new_trades if trade.buyer_id == agent_id or trade.seller_id == agent_id]
-            agent_waiting_bids = [bid.action for bid in self.waiting_bids if bid.agent_id == agent_id]
-            agent_waiting_asks = [ask.action for ask in self.waiting_asks if ask.agent_id == agent_id]
-            agent_waiting_orders = agent_waiting_bids + agent_waiting_asks
+            agent_trades = trades_by_agent.get(agent_id, [])
+            agent_waiting_bids, agent_waiting_asks = book.orders_of(agent_id)
+            agent_waiting_orders = [order.action for order in agent_waiting_bids + agent_waiting_asks]
 
             observation = AuctionObservation(
                 trades=agent_trades,
@@ -177,9 +198,20 @@ class DoubleAuction(Mechanism):
         return observations
 
     def get_global_state(self) -> Dict[str, Any]:
+        return self._state(self.trades)
+
+    def get_windowed_state(self, last_rounds: int) -> Dict[str, Any]:
+        """The global state with only the trades of the last `last_rounds` rounds."""
+        if last_rounds <= 0:
+            return self._state([])
+        if last_rounds >= len(self._round_trade_starts):
+            return self._state(self.trades)
+        return self._state(self.trades[self._round_trade_starts[-last_rounds]:])
+
+    def _state(self, trades: List[Trade]) -> Dict[str, Any]:
         return {
             "current_round": self.current_round,
-            "trades": [trade.model_dump() for trade in self.trades],
+            "trades": [trade.model_dump() for trade in trades],
             "waiting_bids": [{ "agent_id": bid.agent_id, **bid.action.model_dump() } for bid in self.waiting_bids],
             "waiting_asks": [{ "agent_id": ask.agent_id, **ask.action.model_dump() } for ask in self.waiting_asks]
         }
@@ -187,8 +219,9 @@ class DoubleAuction(Mechanism):
     def reset(self) -> None:
         self.current_round = 0
         self.trades = []
-        self.waiting_bids = []
-        self.waiting_asks = []
+        self._round_trade_starts = []
+        self._book.clear()
+        self.mark_state_changed()
 
     def _create_market_summary(self, trades: List[Trade]) -> MarketSummary:
         if not trades:
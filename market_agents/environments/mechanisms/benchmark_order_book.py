@@ -0,0 +1,108 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from market_agents.economics.econ_models import Ask, Bid, Trade
+from market_agents.environments.mechanisms.auction import AuctionAction, DoubleAuction, GlobalAuctionAction
+
+# Resting book of RESTING_ORDERS non-crossing orders from ORDERS_PER_AGENT-order agents,
+# then rounds of NEW_ORDERS incoming orders that partly cross it
+RESTING_ORDERS = 100_000
+ORDERS_PER_AGENT = 2
+NEW_ORDERS = 1_000
+NUM_ROUNDS = 5
+LEGACY_MAX_ORDERS = 10_000
+
+
+def resting_orders(num_orders: int, rng: random.Random):
+    orders = []
+    for i in range(num_orders):
+        agent_id = f"agent_{i // ORDERS_PER_AGENT}"
+        if i % 2 == 0:
+            orders.append(AuctionAction(agent_id=agent_id, action=Bid(price=rng.uniform(40, 60), quantity=1)))
+        else:
+            orders.append(AuctionAction(agent_id=agent_id, action=Ask(price=rng.uniform(61, 80), quantity=1)))
+    return orders
+
+
+def incoming_orders(round_num: int, rng: random.Random):
+    return {
+        f"trader_{round_num}_{i}": AuctionAction(
+            agent_id=f"trader_{round_num}_{i}",
+            action=Bid(price=rng.uniform(55, 75), quantity=1) if i % 2 == 0 else Ask(price=rng.uniform(45, 65), quantity=1)
+        )
+        for i in range(NEW_ORDERS)
+    }
+
+
+class LegacyBook:
+    """The previous DoubleAuction algorithm: sorted lists, pop(0), and a scan of the book per observed agent."""
+
+    def __init__(self, orders):
+        self.bids = [order for order in orders if isinstance(order.action, Bid)]
+        self.asks = [order for order in orders if isinstance(order.action, Ask)]
+        self.num_trades = 0
+
+    def step(self, actions):
+        for order in actions.values():
+            (self.bids if isinstance(order.action, Bid) else self.asks).append(order)
+        self.bids.sort(key=lambda x: x.action.price, reverse=True)
+        self.asks.sort(key=lambda x: x.action.price)
+        trades = []
+        while self.bids and self.asks and self.bids[0].action.price >= self.asks[0].action.price:
+            bid, ask = self.bids.pop(0), self.asks.pop(0)
+            trades.append(Trade(
+                trade_id=self.num_trades, buyer_id=bid.agent_id, seller_id=ask.agent_id,
+                price=(bid.action.price + ask.action.price) / 2, quantity=1,
+                bid_price=bid.action.price, ask_price=ask.action.price
+            ))
+            self.num_trades += 1
+        agent_ids = {t.buyer_id for t in trades} | {t.seller_id for t in trades} | {o.agent_id for o in self.bids + self.asks}
+        for agent_id in agent_ids:
+            [t for t in trades if t.buyer_id == agent_id or t.seller_id == agent_id]
+            [o.action for o in self.bids if o.agent_id == agent_id] + [o.action for o in self.asks if o.agent_id == agent_id]
+        return trades
+
+
+def run(num_orders: int, legacy: bool):
+    rng = random.Random(0)
+    orders = resting_orders(num_orders, rng)
+    rounds = [incoming_orders(round_num, rng) for round_num in range(NUM_ROUNDS)]
+
+    mechanism = DoubleAuction(max_rounds=NUM_ROUNDS)
+    mechanism.step(GlobalAuctionAction(actions={}))
+    book = mechanism.order_book
+    for order in orders:
+        book.add(order, is_bid=isinstance(order.action, Bid))
+    start = time.perf_counter()
+    book_trades = [mechanism.step(GlobalAuctionAction(actions=actions)).global_observation.all_trades for actions in rounds]
+    book_seconds = (time.perf_counter() - start) / NUM_ROUNDS
+
+    legacy_seconds = None
+    if legacy:
+        book = LegacyBook(orders)
+        start = time.perf_counter()
+        legacy_trades = [book.step(actions) for actions in rounds]
+        legacy_seconds = (time.perf_counter() - start) / NUM_ROUNDS
+        same = all(
+            [(t.buyer_id, t.seller_id, t.price) for t in new] == [(t.buyer_id, t.seller_id, t.price) for t in old]
+            for new, old in zip(book_trades, legacy_trades)
+        )
+        if not same:
+            raise AssertionError("Order book and legacy matching produced different trades")
+    return book_seconds, legacy_seconds, sum(len(trades) for trades in book_trades)
+
+
+def main(num_orders: int = RESTING_ORDERS):
+    print(f"{'resting':>9}{'trades/round':>14}{'order book s':>14}{'sorted lists s':>16}")
+    for size in sorted({min(LEGACY_MAX_ORDERS, num_orders), num_orders}):
+        book_seconds, legacy_seconds, trades = run(size, legacy=size <= LEGACY_MAX_ORDERS)
+        legacy = f"{legacy_seconds:>16.3f}" if legacy_seconds is not None else f"{'(skipped)':>16}"
+        print(f"{size:>9}{trades / NUM_ROUNDS:>14.0f}{book_seconds:>14.3f}{legacy}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -13,6 +13,7 @@ from market_agents.environments.environment import (
 from market_agents.memecoin_orchestrators.crypto_models import OrderType, MarketAction, Trade
 from market_agents.memecoin_orchestrators.crypto_agent import CryptoEconomicAgent
 from agent_evm_interface.agent_evm_interface import EthereumInterface
+from agent_evm_interface.event_indexer import EventIndexer
 logger = logging.getLogger(__name__)
 
 
@@ -143,6 +144,8 @@ class CryptoMarketMechanism(Mechanism):
     )
     orderbook_address: str = Field(default="", description="Orderbook contract address")
     minter_private_key: str = Field(default="", description="Private key of the minter account")
+    use_event_indexer: bool = Field(default=True, description="Derive price histories from indexed on-chain swaps")
+    event_indexer: Optional[EventIndexer] = Field(default=None, description="Incremental Swap/Transfer log index")
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -159,6 +162,14 @@ class CryptoMarketMechanism(Mechanism):
         self.token_addresses = self.ethereum_interface.testnet_data['token_addresses']
         self.orderbook_address = self.ethereum_interface.testnet_data['orderbook_address']
         self.minter_private_key = self.ethereum_interface.accounts[0]['private_key']
+
+        if self.use_event_indexer and self.event_indexer is None:
+            try:
+                self.event_indexer = EventIndexer(self.ethereum_interface)
+                self.event_indexer.sync()
+            except Exception as e:
+                logger.warning(f"Event indexer unavailable, falling back to trade prices: {str(e)}")
+                self.event_indexer = None
         
         # Initialize prices for all supported tokens
         quote_address = self.ethereum_interface.get_token_address('USDC')
@@ -193,11 +204,14 @@ class CryptoMarketMechanism(Mechanism):
         """Execute one step in the mechanism"""
         self.current_round += 1
 
+        round_start_block = self.event_indexer.last_block + 1 if self.event_indexer else None
+
         # Process actions and collect new trades
         new_trades = self._process_actions(action.actions)
         
-        # Update prices based on new trades
-        self._update_price(new_trades)
+        # Update prices from this round's on-chain swaps, or from the trades themselves
+        if not self._update_price_from_events(round_start_block):
+            self._update_price(new_trades)
         
         # Create market summary and observations
         market_summary = self._create_market_summary(new_trades)
@@ -361,6 +375,30 @@ class CryptoMarketMechanism(Mechanism):
 
         return observations
 
+    def _update_price_from_events(self, from_block: Optional[int]) -> bool:
+        """Update prices from swaps indexed since `from_block`. Returns False if no indexer is available."""
+        if self.event_indexer is None or from_block is None:
+            return False
+
+        try:
+            self.event_indexer.sync()
+        except Exception as e:
+            logger.warning(f"Failed to sync event indexer: {str(e)}")
+            return False
+
+        quote_address = self.ethereum_interface.get_token_address('USDC')
+        for token in self.tokens:
+            vwap = self.event_indexer.get_vwap(
+                self.ethereum_interface.get_token_address(token),
+                quote_address,
+                from_block=from_block
+            )
+            if vwap is None:
+                continue
+            self.current_prices[token] = vwap
+            self.price_histories.setdefault(token, []).append(vwap)
+        return True
+
     def _update_price(self, trades: List[Trade]) -> None:
         """Update prices for all tokens based on recent trades"""
         if not trades:
@@ -173,6 +173,7 @@ class GroupChat(Mechanism):
     def _update_topic(self, new_topic: str, round_num: int):
         self.topics[round_num] = new_topic
         self.current_topic = new_topic
+        self.mark_state_changed()
         logger.debug(f"Updated topic for round {round_num} to: {new_topic}")
 
     def _create_observations(self, new_messages: List[GroupChatMessage]) -> Dict[str, GroupChatLocalObservation]:
@@ -200,4 +201,5 @@ class GroupChat(Mechanism):
         self.current_round = 0
         self.messages = []
         self.current_topic = ""
+        self.mark_state_changed()
         logger.info("GroupChat mechanism has been reset.")
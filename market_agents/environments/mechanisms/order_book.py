@@ -0,0 +1,130 @@
+# order_book.py
+
+import heapq
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class OrderBook:
+    """
+    Limit order book with price-time priority.
+
+    Bids and asks are binary heaps keyed by (price, arrival), so the best
+    order is found and removed in O(log n) instead of re-sorting the book.
+    Orders are also indexed by agent, which makes per-agent lookups and
+    cancellations independent of the size of the book; cancelled orders stay
+    in the heaps and are skipped when they reach the top.
+
+    Orders are any objects with an `agent_id` and an `action.price`, such as
+    AuctionAction.
+    """
+
+    def __init__(self):
+        self._bids: List[Tuple[float, int, Any]] = []
+        self._asks: List[Tuple[float, int, Any]] = []
+        # agent_id -> {sequence: (is_bid, priority, order)}, in arrival order
+        self._by_agent: Dict[str, Dict[int, Tuple[bool, float, Any]]] = {}
+        self._live: Dict[int, str] = {}
+        self._sequence = count()
+        self._num_bids = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    @property
+    def num_bids(self) -> int:
+        return self._num_bids
+
+    @property
+    def num_asks(self) -> int:
+        return len(self._live) - self._num_bids
+
+    def add(self, order: Any, is_bid: bool) -> int:
+        """Rest an order in the book and return its sequence number."""
+        sequence = next(self._sequence)
+        # Lower sorts first on both sides
+        priority = -order.action.price if is_bid else order.action.price
+        heapq.heappush(self._bids if is_bid else self._asks, (priority, sequence, order))
+        self._by_agent.setdefault(order.agent_id, {})[sequence] = (is_bid, priority, order)
+        self._live[sequence] = order.agent_id
+        self._num_bids += is_bid
+        return sequence
+
+    def cancel(self, sequence: int) -> bool:
+        agent_id = self._live.pop(sequence, None)
+        if agent_id is None:
+            return False
+        is_bid, _, _ = self._by_agent[agent_id].pop(sequence)
+        if not self._by_agent[agent_id]:
+            del self._by_agent[agent_id]
+        self._num_bids -= is_bid
+        return True
+
+    def cancel_agent(self, agent_id: str) -> int:
+        """Cancel all resting orders of an agent and return how many there were."""
+        orders = self._by_agent.pop(agent_id, {})
+        for sequence, (is_bid, _, _) in orders.items():
+            del self._live[sequence]
+            self._num_bids -= is_bid
+        return len(orders)
+
+    def _top(self, heap: List[Tuple[float, int, Any]]) -> Optional[Tuple[float, int, Any]]:
+        while heap and heap[0][1] not in self._live:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def best_bid(self) -> Optional[Any]:
+        top = self._top(self._bids)
+        return top[2] if top else None
+
+    def best_ask(self) -> Optional[Any]:
+        top = self._top(self._asks)
+        return top[2] if top else None
+
+    def pop_best_bid(self) -> Optional[Any]:
+        top = self._top(self._bids)
+        if top is None:
+            return None
+        self.cancel(top[1])
+        return top[2]
+
+    def pop_best_ask(self) -> Optional[Any]:
+        top = self._top(self._asks)
+        if top is None:
+            return None
+        self.cancel(top[1])
+        return top[2]
+
+    def _in_priority(self, heap: List[Tuple[float, int, Any]]) -> List[Any]:
+        return [order for _, sequence, order in sorted(heap) if sequence in self._live]
+
+    def bids(self) -> List[Any]:
+        """Resting bids, best first."""
+        return self._in_priority(self._bids)
+
+    def asks(self) -> List[Any]:
+        """Resting asks, best first."""
+        return self._in_priority(self._asks)
+
+    def agent_ids(self) -> Iterator[str]:
+        """Agents with resting orders."""
+        return iter(self._by_agent)
+
+    def orders_of(self, agent_id: str) -> Tuple[List[Any], List[Any]]:
+        """An agent's resting bids and asks, each best first."""
+        entries = self._by_agent.get(agent_id)
+        if not entries:
+            return [], []
+        bids, asks = [], []
+        for sequence, (is_bid, priority, order) in entries.items():
+            (bids if is_bid else asks).append((priority, sequence, order))
+        bids.sort()
+        asks.sort()
+        return [order for _, _, order in bids], [order for _, _, order in asks]
+
+    def clear(self):
+        self._bids.clear()
+        self._asks.clear()
+        self._by_agent.clear()
+        self._live.clear()
+        self._num_bids = 0
@@ -1,5 +1,5 @@
 from market_agents.agents.tool_caller.utils import function_to_json
-from pydantic import BaseModel, Field, computed_field, ValidationError, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, ValidationError, model_validator
 from typing import Callable, Literal, Optional, Union, Dict, Any, List, Iterable, Tuple
 import json
 import time
@@ -41,7 +41,7 @@ from anthropic.types.beta.prompt_caching import (
 from anthropic.types.beta.prompt_caching.prompt_caching_beta_cache_control_ephemeral_param import PromptCachingBetaCacheControlEphemeralParam
 from anthropic.types.model_param import ModelParam
 
-from market_agents.inference.utils import msg_dict_to_oai, msg_dict_to_anthropic, parse_json_string
+from market_agents.inference.utils import msg_dict_to_oai, msg_dict_to_anthropic, anthropic_cached_system, count_tokens, parse_json_string
 
 
 
@@ -115,8 +115,16 @@ class LLMConfig(BaseModel):
 
   
 
+class ContextPolicy(BaseModel):
+    """How much chat history a reused LLMPromptContext sends and keeps."""
+    max_history_tokens: Optional[int] = Field(default=None, description="Token budget for the history sent with each prompt")
+    history_window: Optional[int] = Field(default=None, description="Most recent chat turns (user and assistant message pairs) sent with each prompt")
+    summarize_every: Optional[int] = Field(default=None, description="Fold turns that left the window into a rolling summary once this many have accumulated; without it they are dropped")
+    summary_max_words: int = Field(default=200, description="Length limit given to the summarizer")
+
 class LLMPromptContext(BaseModel):
     id: str
+    system_prefix: List[str] = Field(default_factory=list, description="Stable system prompt segments (role, persona, output schema), most stable first. They precede system_string and are kept byte-identical across rounds so providers can cache them")
     system_string: Optional[str] = None
     history: Optional[List[Dict[str, str]]] = None
     new_message: str
@@ -127,10 +135,70 @@ class LLMPromptContext(BaseModel):
     tools: Optional[List[Callable]] = None
     llm_config: LLMConfig
     use_history: bool = Field(default=True, description="Whether to use the history")
+    context_policy: Optional[ContextPolicy] = Field(default=None, description="Window, token budget and summarization of the history; unbounded if None")
+    history_summary: Optional[str] = Field(default=None, description="Rolling summary of turns that no longer fit the history window")
+    _history_tokens: List[int] = PrivateAttr(default_factory=list)
+    _render_cache: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _render_key: Optional[Tuple[Any, ...]] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in self.__class__.model_fields:
+            self._invalidate_render()
+
+    def _rendered(self, name: str, render: Callable[[], Any]) -> Any:
+        """
+        Return the derived field `name`, rendering it at most once per state of the prompt.
+
+        The cache is dropped when a field is assigned, when the history grows or
+        shrinks, or when the (possibly shared) llm_config changes client, response
+        format or caching. Rendered messages are shared between accesses and must
+        not be mutated by callers.
+        """
+        config = self.llm_config
+        key = (len(self.history) if self.history else 0, config.client, config.response_format, config.use_cache)
+        if self._render_key != key:
+            self._render_cache = {}
+            self._render_key = key
+        if name not in self._render_cache:
+            self._render_cache[name] = render()
+        return self._render_cache[name]
+
+    def _invalidate_render(self):
+        self._render_key = None
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> Self:
+        copied = super().model_copy(update=update, deep=deep)
+        # The private cache dict is shared by a shallow copy and `update` bypasses __setattr__
+        copied._render_cache = {}
+        copied._render_key = None
+        return copied
+
+    def _dump_exclude(self, exclude: Any, include_derived: bool) -> Any:
+        """Add the computed fields to `exclude` unless they were asked for; they are re-derivable."""
+        if include_derived:
+            return exclude
+        derived = self.__class__.model_computed_fields.keys()
+        if exclude is None:
+            return set(derived)
+        if isinstance(exclude, dict):
+            return {**{name: True for name in derived}, **exclude}
+        return set(exclude) | set(derived)
+
+    def model_dump(self, *, include_derived: bool = False, **kwargs) -> Dict[str, Any]:
+        kwargs['exclude'] = self._dump_exclude(kwargs.get('exclude'), include_derived)
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, *, include_derived: bool = False, **kwargs) -> str:
+        kwargs['exclude'] = self._dump_exclude(kwargs.get('exclude'), include_derived)
+        return super().model_dump_json(**kwargs)
     
     @computed_field
     @property
     def oai_response_format(self) -> Optional[ResponseFormat]:
+        return self._rendered("oai_response_format", self._render_oai_response_format)
+
+    def _render_oai_response_format(self) -> Optional[ResponseFormat]:
         if self.llm_config.response_format == "text":
             return ResponseFormatText(type="text")
         elif self.llm_config.response_format == "json_object":
@@ -163,17 +231,39 @@ class LLMPromptContext(BaseModel):
     @computed_field
     @property
     def system_message(self) -> Optional[Dict[str, str]]:
-        content= self.system_string if self.system_string  else ""
-        if self.use_schema_instruction and self.structured_output:
-            content = "\n".join([content,self.structured_output.schema_instruction])
+        return self._rendered("system_message", self._render_system_message)
+
+    def _render_system_message(self) -> Optional[Dict[str, str]]:
+        segments = self.stable_system_segments()
+        volatile = self.volatile_system_string()
+        if volatile:
+            segments.append(volatile)
+        content = "\n".join(segments)
         return {"role":"system","content":content} if len(content)>0 else None
+
+    def volatile_system_string(self) -> Optional[str]:
+        """The part of the system prompt after the stable segments: system_string and the history summary."""
+        segments = [self.system_string] if self.system_string else []
+        if self.use_history and self.history_summary:
+            segments.append(f"Summary of the earlier conversation:\n{self.history_summary}")
+        return "\n".join(segments) if segments else None
+
+    def stable_system_segments(self) -> List[str]:
+        """The cacheable leading part of the system prompt: system_prefix, then the schema instruction."""
+        segments = [segment for segment in self.system_prefix if segment]
+        if self.use_schema_instruction and self.structured_output:
+            segments.append(self.structured_output.schema_instruction)
+        return segments
     
     @computed_field
     @property
     def messages(self)-> List[Dict[str, Any]]:
+        return self._rendered("messages", self._render_messages)
+
+    def _render_messages(self) -> List[Dict[str, Any]]:
         messages = [self.system_message] if self.system_message is not None else []
         if  self.use_history and self.history:
-            messages+=self.history
+            messages+=self.windowed_history()
         messages.append({"role":"user","content":self.new_message})
         if self.use_prefill:
             prefill_message = {"role":"assistant","content":self.prefill}
@@ -185,17 +275,30 @@ class LLMPromptContext(BaseModel):
     @computed_field
     @property
     def oai_messages(self)-> List[ChatCompletionMessageParam]:
-        return msg_dict_to_oai(self.messages)
+        return self._rendered("oai_messages", lambda: msg_dict_to_oai(self.messages))
     
     @computed_field
     @property
     def anthropic_messages(self) -> Tuple[List[PromptCachingBetaTextBlockParam],List[MessageParam]]:
-        return msg_dict_to_anthropic(self.messages, use_cache=self.llm_config.use_cache)
+        return self._rendered("anthropic_messages", self._render_anthropic_messages)
+
+    def _render_anthropic_messages(self) -> Tuple[List[PromptCachingBetaTextBlockParam],List[MessageParam]]:
+        system, messages = msg_dict_to_anthropic(self.messages, use_cache=self.llm_config.use_cache)
+        if self.llm_config.use_cache and self.system_prefix:
+            # Cache the stable segments only; the round-specific tail changes every call.
+            # A forced tool carries its own breakpoint, which leaves one for the system prompt
+            system = anthropic_cached_system(
+                self.stable_system_segments(),
+                self.volatile_system_string(),
+                leading_breakpoint=not (self.llm_config.response_format == "tool" and self.structured_output)
+            )
+        return system, messages
     
     @computed_field
     @property
     def vllm_messages(self) -> List[ChatCompletionMessageParam]:
-        return msg_dict_to_oai(self.messages)
+        # Same rendering as OpenAI
+        return self.oai_messages
         
     def update_llm_config(self,llm_config:LLMConfig) -> 'LLMPromptContext':
         
@@ -211,7 +314,78 @@ class LLMPromptContext(BaseModel):
         if self.history is None:
             self.history = []
         self.history.append({"role": "user", "content": self.new_message})
-        self.history.append({"role": "assistant", "content": llm_output.str_content or json.dumps(llm_output.json_object.object) if llm_output.json_object else "{}"})
+        self.history.append({"role": "assistant", "content": llm_output.str_content or (json.dumps(llm_output.json_object.object) if llm_output.json_object else "{}")})
+        self._invalidate_render()
+        if self.context_policy is not None and self.context_policy.summarize_every is None:
+            # Nothing will summarize the turns that left the window, so stop keeping them
+            self._drop_turns(self._evicted_turns())
+
+    def _turn_tokens(self) -> List[int]:
+        """Token count of each history turn, counted once per turn and kept in step with the history."""
+        history = self.history or []
+        turns = len(history) // 2
+        if len(self._history_tokens) > turns:
+            self._history_tokens = []
+        for turn in range(len(self._history_tokens), turns):
+            self._history_tokens.append(sum(count_tokens(str(message["content"])) for message in history[2 * turn:2 * turn + 2]))
+        return self._history_tokens
+
+    def windowed_history(self) -> List[Dict[str, str]]:
+        """The most recent turns of the history that fit the context policy's window and token budget."""
+        history = self.history or []
+        policy = self.context_policy
+        if policy is None or (policy.history_window is None and policy.max_history_tokens is None):
+            return history
+        kept = used = 0
+        for tokens in reversed(self._turn_tokens()):
+            if policy.history_window is not None and kept >= policy.history_window:
+                break
+            if policy.max_history_tokens is not None and used + tokens > policy.max_history_tokens:
+                break
+            kept += 1
+            used += tokens
+        return history[len(history) - 2 * kept:] if kept else []
+
+    def _evicted_turns(self) -> int:
+        return len(self.history or []) // 2 - len(self.windowed_history()) // 2
+
+    def _drop_turns(self, turns: int):
+        if turns > 0:
+            self._turn_tokens()
+            del self.history[:2 * turns]
+            del self._history_tokens[:turns]
+            self._invalidate_render()
+
+    def turns_to_summarize(self) -> int:
+        """Number of turns that left the window and are due to be folded into the summary, or 0."""
+        policy = self.context_policy
+        if policy is None or policy.summarize_every is None:
+            return 0
+        evicted = self._evicted_turns()
+        return evicted if evicted >= policy.summarize_every else 0
+
+    def summary_prompt(self, turns: int) -> 'LLMPromptContext':
+        """A text prompt asking the same model to fold the oldest `turns` turns into the rolling summary."""
+        transcript = "\n".join(
+            f"{message['role']}: {message['content']}" for message in (self.history or [])[:2 * turns]
+        )
+        return LLMPromptContext(
+            id=self.id,
+            system_string="You maintain a concise running summary of a conversation between a user and an assistant.",
+            new_message=(
+                f"Current summary:\n{self.history_summary or 'None'}\n\n"
+                f"New conversation turns:\n{transcript}\n\n"
+                f"Rewrite the summary so it also covers the new turns. Keep facts, decisions, prices and strategies. "
+                f"Use at most {self.context_policy.summary_max_words} words and reply with the summary only."
+            ),
+            llm_config=self.llm_config.model_copy(update={"response_format": "text"}),
+            use_history=False
+        )
+
+    def apply_summary(self, summary: str, turns: int):
+        """Replace the oldest `turns` turns with the updated rolling summary."""
+        self.history_summary = summary
+        self._drop_turns(turns)
     
     def get_tool(self) -> Union[ChatCompletionToolParam, PromptCachingBetaToolParam, None]:
         if not self.structured_output:
@@ -347,10 +521,13 @@ class LLMOutput(BaseModel):
                 content = None  # Set content to None when we have a parsed JSON object
                 #print(f"parsed_json: {parsed_json} with name")
         if chat_completion.usage:
+            # OpenAI and vLLM report automatic prefix cache hits here
+            prompt_tokens_details = getattr(chat_completion.usage, 'prompt_tokens_details', None)
             usage = Usage(
                 prompt_tokens=chat_completion.usage.prompt_tokens,
                 completion_tokens=chat_completion.usage.completion_tokens,
-                total_tokens=chat_completion.usage.total_tokens
+                total_tokens=chat_completion.usage.total_tokens,
+                cache_read_input_tokens=getattr(prompt_tokens_details, 'cached_tokens', None)
             )
 
         return content, json_object, usage, None, tool_calls
@@ -41,10 +41,49 @@ from dataclasses import (
     dataclass,
     field,
 )  # for storing API inputs, outputs, and metadata
-from typing import List  # for type hints in functions
-from pydantic import BaseModel, Field
+from typing import List, Optional  # for type hints in functions
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RateBudget:
+    """
+    Request and token capacity per minute, refilled continuously.
+
+    One budget can be handed to several concurrent `process_api_requests_from_file`
+    calls (e.g. environments running side by side) so that together they stay
+    under a single provider limit instead of each getting the full limit.
+    """
+
+    def __init__(self, max_requests_per_minute: float, max_tokens_per_minute: float):
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.available_request_capacity = max_requests_per_minute
+        self.available_token_capacity = max_tokens_per_minute
+        self.last_update_time = time.time()
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take capacity for one request of `tokens` tokens if it is available now."""
+        current_time = time.time()
+        seconds_since_update = current_time - self.last_update_time
+        self.available_request_capacity = min(
+            self.available_request_capacity + self.max_requests_per_minute * seconds_since_update / 60.0,
+            self.max_requests_per_minute,
+        )
+        self.available_token_capacity = min(
+            self.available_token_capacity + self.max_tokens_per_minute * seconds_since_update / 60.0,
+            self.max_tokens_per_minute,
+        )
+        self.last_update_time = current_time
+        if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+            self.available_request_capacity -= 1
+            self.available_token_capacity -= tokens
+            return True
+        return False
+
 
 class OAIApiFromFileConfig(BaseModel):
+ model_config = ConfigDict(arbitrary_types_allowed=True)
+
  requests_filepath: str
  save_filepath: str
  api_key: str
@@ -54,6 +93,7 @@ class OAIApiFromFileConfig(BaseModel):
  max_attempts:int = Field(5,description="The maximum number of attempts to make for each request")
  logging_level:int = Field(20,description="The logging level to use for the request")
  token_encoding_name: str = Field("cl100k_base",description="The token encoding scheme to use for calculating request sizes")
+ budget: Optional[RateBudget] = Field(None,description="Shared capacity to draw from instead of the per-call limits above")
 
 async def process_api_requests_from_file(
         api_cfg: OAIApiFromFileConfig
@@ -126,10 +166,8 @@ async def process_api_requests_from_file(
     )  # single instance to track a collection of variables
     next_request = None  # variable to hold the next request to call
 
-    # initialize available capacity counts
-    available_request_capacity = max_requests_per_minute
-    available_token_capacity = max_tokens_per_minute
-    last_update_time = time.time()
+    # initialize available capacity counts, shared with other calls when a budget is given
+    budget = api_cfg.budget or RateBudget(max_requests_per_minute, max_tokens_per_minute)
 
     # initialize flags
     file_not_finished = True  # after file is empty, we'll skip reading it
@@ -173,31 +211,9 @@ async def process_api_requests_from_file(
                             logging.debug("Read file exhausted")
                             file_not_finished = False
 
-                # update available capacity
-                current_time = time.time()
-                seconds_since_update = current_time - last_update_time
-                available_request_capacity = min(
-                    available_request_capacity
-                    + max_requests_per_minute * seconds_since_update / 60.0,
-                    max_requests_per_minute,
-                )
-                available_token_capacity = min(
-                    available_token_capacity
-                    + max_tokens_per_minute * seconds_since_update / 60.0,
-                    max_tokens_per_minute,
-                )
-                last_update_time = current_time
-
                 # if enough capacity available, call API
                 if next_request:
-                    next_request_tokens = next_request.token_consumption
-                    if (
-                        available_request_capacity >= 1
-                        and available_token_capacity >= next_request_tokens
-                    ):
-                        # update counters
-                        available_request_capacity -= 1
-                        available_token_capacity -= next_request_tokens
+                    if budget.try_acquire(next_request.token_consumption):
                         next_request.attempts_left -= 1
 
                         # call API
@@ -4,10 +4,12 @@ from typing import List, Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field, ValidationError
 from .message_models import LLMPromptContext, LLMOutput
 from .clients_models import AnthropicRequest, OpenAIRequest, VLLMRequest
-from .oai_parallel import process_api_requests_from_file, OAIApiFromFileConfig
+from .oai_parallel import process_api_requests_from_file, OAIApiFromFileConfig, RateBudget
 import os
 from dotenv import load_dotenv
+import threading
 import time
+import uuid
 from openai.types.chat import ChatCompletionToolParam
 from anthropic.types.beta.prompt_caching import PromptCachingBetaToolParam
 from anthropic.types.message_create_params import ToolChoiceToolChoiceTool
@@ -27,7 +29,8 @@ class ParallelAIUtilities:
                  vllm_request_limits: Optional[RequestLimits] = None,
                  litellm_request_limits: Optional[RequestLimits] = None,
                  local_cache: bool = True,
-                 cache_folder: Optional[str] = None):
+                 cache_folder: Optional[str] = None,
+                 full_validation: bool = False):
         load_dotenv()
         self.openai_key = os.getenv("OPENAI_KEY")
         self.anthropic_key = os.getenv("ANTHROPIC_API_KEY")
@@ -39,7 +42,21 @@ class ParallelAIUtilities:
         self.anthropic_request_limits = anthropic_request_limits if anthropic_request_limits else RequestLimits(max_requests_per_minute=50,max_tokens_per_minute=40000,provider="anthropic")
         self.vllm_request_limits = vllm_request_limits if vllm_request_limits else RequestLimits(max_requests_per_minute=500,max_tokens_per_minute=200000,provider="vllm")
         self.litellm_request_limits = litellm_request_limits if litellm_request_limits else RequestLimits(max_requests_per_minute=500,max_tokens_per_minute=200000,provider="litellm")
+        # One budget per provider, shared by every batch in flight, so environments
+        # running concurrently split the provider limits instead of each using them in full
+        self.rate_budgets = {
+            client: RateBudget(limits.max_requests_per_minute, limits.max_tokens_per_minute)
+            for client, limits in (
+                ("openai", self.oai_request_limits),
+                ("anthropic", self.anthropic_request_limits),
+                ("vllm", self.vllm_request_limits),
+                ("litellm", self.litellm_request_limits),
+            )
+        }
         self.local_cache = local_cache
+        # Debug switch: validate every request against the full pydantic request models
+        self.full_validation = full_validation
+        self._validated_shapes = set()
         self.cache_folder = self._setup_cache_folder(cache_folder)
         self.all_requests = []
 
@@ -60,7 +77,9 @@ class ParallelAIUtilities:
     def _update_prompt_history(self, prompts: List[LLMPromptContext], llm_outputs: List[LLMOutput]):
         prompt_hashmap = self._create_prompt_hashmap(prompts)
         for output in llm_outputs:
-            prompt_hashmap[output.source_id].add_chat_turn_history(output)
+            # Failed requests come back with source_id "error" and have no turn to record
+            if output.source_id in prompt_hashmap:
+                prompt_hashmap[output.source_id].add_chat_turn_history(output)
         return list(prompt_hashmap.values())
 
     async def run_parallel_ai_completion(self, prompts: List[LLMPromptContext], update_history:bool=True) -> List[LLMOutput]:
@@ -86,8 +105,25 @@ class ParallelAIUtilities:
         
         if update_history:
             prompts = self._update_prompt_history(prompts, flattened_results)
+            await self._summarize_histories(prompts)
         
         return flattened_results
+
+    async def _summarize_histories(self, prompts: List[LLMPromptContext]):
+        """Fold history turns that left each prompt's window into its rolling summary, all in one parallel batch."""
+        due = [(prompt, prompt.turns_to_summarize()) for prompt in prompts]
+        due = [(prompt, turns) for prompt, turns in due if turns]
+        if not due:
+            return
+        summaries = await self.run_parallel_ai_completion(
+            [prompt.summary_prompt(turns) for prompt, turns in due],
+            update_history=False
+        )
+        summaries_by_id = {summary.source_id: summary for summary in summaries}
+        for prompt, turns in due:
+            summary = summaries_by_id.get(prompt.id)
+            if summary is not None and summary.str_content:
+                prompt.apply_summary(summary.str_content.strip(), turns)
     
     def get_all_requests(self):
         requests = self.all_requests
@@ -95,7 +131,8 @@ class ParallelAIUtilities:
         return requests
 
     async def _run_openai_completion(self, prompts: List[LLMPromptContext]) -> List[LLMOutput]:
-        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+        # Concurrent batches can start within the same second
+        timestamp = f"{time.strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:8]}"
         requests_file = os.path.join(self.cache_folder, f'openai_requests_{timestamp}.jsonl')
         results_file = os.path.join(self.cache_folder, f'openai_results_{timestamp}.jsonl')
         self._prepare_requests_file(prompts, "openai", requests_file)
@@ -110,7 +147,8 @@ class ParallelAIUtilities:
         return []
 
     async def _run_anthropic_completion(self, prompts: List[LLMPromptContext]) -> List[LLMOutput]:
-        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+        # Concurrent batches can start within the same second
+        timestamp = f"{time.strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:8]}"
         requests_file = os.path.join(self.cache_folder, f'anthropic_requests_{timestamp}.jsonl')
         results_file = os.path.join(self.cache_folder, f'anthropic_results_{timestamp}.jsonl')
         self._prepare_requests_file(prompts, "anthropic", requests_file)
@@ -125,7 +163,8 @@ class ParallelAIUtilities:
         return []
     
     async def _run_vllm_completion(self, prompts: List[LLMPromptContext]) -> List[LLMOutput]:
-        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+        # Concurrent batches can start within the same second
+        timestamp = f"{time.strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:8]}"
         requests_file = os.path.join(self.cache_folder, f'vllm_requests_{timestamp}.jsonl')
         results_file = os.path.join(self.cache_folder, f'vllm_results_{timestamp}.jsonl')
         self._prepare_requests_file(prompts, "vllm", requests_file)
@@ -140,7 +179,8 @@ class ParallelAIUtilities:
         return []
     
     async def _run_litellm_completion(self, prompts: List[LLMPromptContext]) -> List[LLMOutput]:
-        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+        # Concurrent batches can start within the same second
+        timestamp = f"{time.strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:8]}"
         requests_file = os.path.join(self.cache_folder, f'litellm_requests_{timestamp}.jsonl')
         results_file = os.path.join(self.cache_folder, f'litellm_results_{timestamp}.jsonl')
         self._prepare_requests_file(prompts, "litellm", requests_file)
@@ -195,7 +235,67 @@ class ParallelAIUtilities:
         except Exception as e:
             # Instead of raising ValidationError, we'll return False
             raise ValidationError(f"Error validating VLLM request: {e} with request: {request}")
-        
+
+    _FULL_VALIDATORS = {
+        "openai": "_validate_openai_request",
+        "anthropic": "_validate_anthropic_request",
+        "vllm": "_validate_vllm_request",
+    }
+    _PAYLOAD_KEYS = ("messages", "system")
+    _MESSAGE_ROLES = {
+        "openai": {"system", "user", "assistant", "tool", "function"},
+        "anthropic": {"user", "assistant"},
+        "vllm": {"system", "user", "assistant", "tool", "function"},
+    }
+
+    def _validate_request(self, client: str, request: Dict[str, Any]) -> bool:
+        """
+        Validate a request against the full pydantic model once per request shape,
+        i.e. per (model, tools, response format and other settings), and only
+        structurally check the messages (and Anthropic system blocks) of later
+        requests with the same shape.
+
+        Building the pydantic request model for every prompt costs more than
+        sending it on large batches; set `full_validation` to do it anyway.
+        """
+        validate_full = getattr(self, self._FULL_VALIDATORS[client])
+        if self.full_validation:
+            return validate_full(request)
+        shape = (client,) + tuple(
+            (key, value if isinstance(value, (str, int, float, bool, type(None))) else json.dumps(value, sort_keys=True, default=str))
+            for key, value in sorted(request.items()) if key not in self._PAYLOAD_KEYS
+        )
+        if shape not in self._validated_shapes:
+            validate_full(request)
+            self._validated_shapes.add(shape)
+            return True
+        self._check_messages(client, request)
+        return True
+
+    def _check_messages(self, client: str, request: Dict[str, Any]):
+        """Cheap structural check of the message payload of a request whose shape was already validated."""
+        system = request.get("system")
+        if system is not None and not isinstance(system, str) and not self._is_block_list(system):
+            raise ValueError(f"Invalid {client} system prompt {system!r}, expected a string or a list of typed blocks")
+        messages = request.get("messages")
+        if not isinstance(messages, list) or not messages:
+            raise ValueError(f"{client} request must have a non-empty list of messages: {request}")
+        roles = self._MESSAGE_ROLES[client]
+        for message in messages:
+            if not isinstance(message, dict) or message.get("role") not in roles:
+                raise ValueError(f"Invalid {client} message {message!r}, expected a dict with a role in {sorted(roles)}")
+            content = message.get("content")
+            if content is None and message["role"] == "assistant" and client != "anthropic":
+                continue
+            if isinstance(content, str):
+                continue
+            if not self._is_block_list(content):
+                raise ValueError(f"Invalid content in {client} message {message!r}, expected a string or a list of typed blocks")
+
+    @staticmethod
+    def _is_block_list(content: Any) -> bool:
+        return isinstance(content, list) and all(isinstance(block, dict) and "type" in block for block in content)
+
 
     
     def _get_openai_request(self, prompt: LLMPromptContext) -> Optional[Dict[str, Any]]:
@@ -220,7 +320,7 @@ class ParallelAIUtilities:
                 request["tools"] = tools
                 request["tool_choice"] = "auto"
 
-        if self._validate_openai_request(request):
+        if self._validate_request("openai", request):
             return request
         else:
             return None
@@ -240,7 +340,7 @@ class ParallelAIUtilities:
                 request["tools"] = [tool]
                 request["tool_choice"] = ToolChoiceToolChoiceTool(name=prompt.structured_output.schema_name, type="tool")
 
-        if self._validate_anthropic_request(request):
+        if self._validate_request("anthropic", request):
             return request
         else:
             return None
@@ -267,7 +367,7 @@ class ParallelAIUtilities:
             if tools:
                 request["tools"] = tools
                 request["tool_choice"] = "auto"
-        if self._validate_vllm_request(request):
+        if self._validate_request("vllm", request):
             return request
         else:
             return None
@@ -302,6 +402,7 @@ class ParallelAIUtilities:
                 token_encoding_name="cl100k_base",
                 max_attempts=5,
                 logging_level=20,
+                budget=self.rate_budgets["openai"],
             )
         return None
 
@@ -317,6 +418,7 @@ class ParallelAIUtilities:
                 token_encoding_name="cl100k_base",
                 max_attempts=5,
                 logging_level=20,
+                budget=self.rate_budgets["anthropic"],
             )
         return None
     
@@ -332,6 +434,7 @@ class ParallelAIUtilities:
                 token_encoding_name="cl100k_base",
                 max_attempts=5,
                 logging_level=20,
+                budget=self.rate_budgets["vllm"],
             )
         return None
     
@@ -347,6 +450,7 @@ class ParallelAIUtilities:
                 token_encoding_name="cl100k_base",
                 max_attempts=5,
                 logging_level=20,
+                budget=self.rate_budgets["litellm"],
             )
         return None
     
@@ -384,4 +488,31 @@ class ParallelAIUtilities:
             try:
                 os.remove(file)
             except OSError as e:
-                print(f"Error deleting file {file}: {e}")
\ No newline at end of file
+                print(f"Error deleting file {file}: {e}")
+
+
+_shared_ai_utilities: Optional[ParallelAIUtilities] = None
+_shared_ai_utilities_lock = threading.Lock()
+
+
+def get_ai_utilities() -> ParallelAIUtilities:
+    """
+    The process-wide ParallelAIUtilities, created with default limits on first
+    use unless one was installed with `set_ai_utilities`.
+
+    Everything that runs inference through it shares one rate budget per client.
+    """
+    global _shared_ai_utilities
+    if _shared_ai_utilities is None:
+        with _shared_ai_utilities_lock:
+            if _shared_ai_utilities is None:
+                _shared_ai_utilities = ParallelAIUtilities()
+    return _shared_ai_utilities
+
+
+def set_ai_utilities(ai_utilities: Optional[ParallelAIUtilities]) -> Optional[ParallelAIUtilities]:
+    """Install `ai_utilities` as the process-wide instance (None resets it) and return it."""
+    global _shared_ai_utilities
+    with _shared_ai_utilities_lock:
+        _shared_ai_utilities = ai_utilities
+    return ai_utilities
@@ -16,6 +16,7 @@ from openai.types.chat import (
 
 
 from typing import Union, Optional, List, Tuple, Literal, Dict, Any
+from functools import lru_cache
 import json
 import re
 import tiktoken
@@ -49,6 +50,14 @@ def parse_json_string(content: str) -> Optional[Dict[str, Any]]:
     # If all parsing attempts fail, return None
     return None
 
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str):
+    return tiktoken.get_encoding(encoding_name)
+
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """Approximate token count of `text`; close enough for budgeting across providers."""
+    return len(_get_encoding(encoding_name).encode(text))
+
 def get_ai_context_length(ai_vendor: Literal["openai", "azure_openai", "anthropic"]):
         if ai_vendor == "openai":
             return os.getenv("OPENAI_CONTEXT_LENGTH")
@@ -81,6 +90,32 @@ def msg_dict_to_oai(messages: List[Dict[str, Any]]) -> List[ChatCompletionMessag
 
         return [convert_message(msg) for msg in messages]
 
+def anthropic_cached_system(stable_segments: List[str], volatile: Optional[str] = None, leading_breakpoint: bool = True) -> List[PromptCachingBetaTextBlockParam]:
+    """
+    Build Anthropic system blocks with cache breakpoints after the first and the
+    last stable segment, leaving the volatile tail uncached.
+
+    The first breakpoint lets calls that share only the leading segment (the same
+    agent in another phase) still hit the cache. Anthropic allows four
+    breakpoints per request: msg_dict_to_anthropic uses up to two on the
+    messages and a forced tool carries one, so pass `leading_breakpoint=False`
+    when a tool is attached. Prefixes shorter than the model's minimum
+    cacheable length are simply not cached.
+    """
+    texts = list(stable_segments) + ([volatile] if volatile else [])
+    last_stable = len(stable_segments) - 1
+    breakpoints = {0, last_stable} if leading_breakpoint else {last_stable}
+    blocks = []
+    for i, text in enumerate(texts):
+        # Same bytes as the "\n"-joined system prompt other providers receive
+        if i < len(texts) - 1:
+            text = text + "\n"
+        if i in breakpoints:
+            blocks.append(PromptCachingBetaTextBlockParam(type="text", text=text, cache_control=PromptCachingBetaCacheControlEphemeralParam(type="ephemeral")))
+        else:
+            blocks.append(PromptCachingBetaTextBlockParam(type="text", text=text))
+    return blocks
+
 def msg_dict_to_anthropic(messages: List[Dict[str, Any]],use_cache:bool=True,use_prefill:bool=False) -> Tuple[List[PromptCachingBetaTextBlockParam],List[MessageParam]]:
         def create_anthropic_system_message(system_message: Optional[Dict[str, Any]],use_cache:bool=True) -> List[PromptCachingBetaTextBlockParam]:
             if system_message and system_message["role"] == "system":
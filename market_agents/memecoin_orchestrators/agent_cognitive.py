@@ -102,7 +102,7 @@ class AgentCognitiveProcessor:
                             "total_reward": round(total_reward, 4)
                         })
                         
-                    agent.memory.append(memory_entry)
+                    agent.remember(memory_entry)
                 else:
                     self.logger.warning(f"No reflection JSON object for agent {agent.index}")
         else:
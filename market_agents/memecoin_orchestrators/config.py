@@ -20,6 +20,7 @@ class CryptoConfig(BaseModel):
     address: str
     max_rounds: int
     coin_name: str
+    backend: str = Field(default="hardhat", description="'hardhat' for the local EVM node, 'simulated' for the in-process ledger")
     orderbook_address: str = Field(default="")
     token_addresses: List[str] = Field(default_factory=list)
 
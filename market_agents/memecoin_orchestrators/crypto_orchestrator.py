@@ -35,7 +35,7 @@ from market_agents.memecoin_orchestrators.logger_utils import (
 from market_agents.memecoin_orchestrators.insert_simulation_data import SimulationDataInserter
 from market_agents.memecoin_orchestrators.agent_cognitive import AgentCognitiveProcessor
 
-from agent_evm_interface.agent_evm_interface import EthereumInterface
+from agent_evm_interface.agent_evm_interface import get_ethereum_interface
 
 # Define CryptoTracker for tracking crypto market-specific data
 class CryptoTracker:
@@ -121,8 +121,11 @@ class CryptoOrchestrator(BaseEnvironmentOrchestrator):
         self.agent_rewards: Dict[str, float] = {}
         self.cognitive_processor = AgentCognitiveProcessor(ai_utils, data_inserter, logger, tool_mode=self.orchestrator_config.tool_mode)
 
-        # Initialize EthereumInterface
-        self.ethereum_interface = EthereumInterface()
+        # Initialize EthereumInterface (shared with the meta orchestrator for the simulated backend)
+        self.ethereum_interface = get_ethereum_interface(
+            self.config.backend,
+            num_accounts=orchestrator_config.num_agents + 1
+        )
         # Use the first account as the minter and funder
         self.minter_account = self.ethereum_interface.accounts[0]
         self.minter_private_key = self.minter_account['private_key']
@@ -188,25 +191,36 @@ class CryptoOrchestrator(BaseEnvironmentOrchestrator):
             if token in READABLE_AMOUNTS:
                 INITIAL_AMOUNTS[token] = int(READABLE_AMOUNTS[token] * (10 ** token_decimals[token]))
 
-        for agent in self.agents:
-            # Mint USDC (quote token)
-            tx_hash = self.ethereum_interface.mint_erc20(
-                to=agent.economic_agent.ethereum_address,
-                amount=INITIAL_AMOUNTS['USDC'],
-                contract_address=self.quote_token_address,
+        # The simulated ledger mints the whole population's allocations in one array update
+        batch_mint = hasattr(self.ethereum_interface, 'mint_erc20_batch')
+        if batch_mint:
+            tx_hash = self.ethereum_interface.mint_erc20_batch(
+                addresses=[agent.economic_agent.ethereum_address for agent in self.agents],
+                amounts={token: INITIAL_AMOUNTS[token] for token in ['USDC', *supported_tokens]},
                 minter_private_key=self.minter_private_key
             )
-            self.logger.info(f"Minted {READABLE_AMOUNTS['USDC']} USDC to agent {agent.id}. TxHash: {tx_hash}")
+            self.logger.info(f"Minted USDC and {', '.join(supported_tokens)} to {len(self.agents)} agents. TxHash: {tx_hash}")
 
-            # Mint trading tokens
-            for token in supported_tokens:
+        for agent in self.agents:
+            if not batch_mint:
+                # Mint USDC (quote token)
                 tx_hash = self.ethereum_interface.mint_erc20(
                     to=agent.economic_agent.ethereum_address,
-                    amount=INITIAL_AMOUNTS[token],
-                    contract_address=token_addresses[token],
+                    amount=INITIAL_AMOUNTS['USDC'],
+                    contract_address=self.quote_token_address,
                     minter_private_key=self.minter_private_key
                 )
-                self.logger.info(f"Minted {READABLE_AMOUNTS[token]} {token} to agent {agent.id}. TxHash: {tx_hash}")
+                self.logger.info(f"Minted {READABLE_AMOUNTS['USDC']} USDC to agent {agent.id}. TxHash: {tx_hash}")
+
+                # Mint trading tokens
+                for token in supported_tokens:
+                    tx_hash = self.ethereum_interface.mint_erc20(
+                        to=agent.economic_agent.ethereum_address,
+                        amount=INITIAL_AMOUNTS[token],
+                        contract_address=token_addresses[token],
+                        minter_private_key=self.minter_private_key
+                    )
+                    self.logger.info(f"Minted {READABLE_AMOUNTS[token]} {token} to agent {agent.id}. TxHash: {tx_hash}")
 
             # Send ETH for gas
             tx_hash = self.ethereum_interface.send_eth(
@@ -69,6 +69,10 @@ class GroupChatOrchestrator:
 
         # Sub-rounds per round
         self.sub_rounds_per_round = config.sub_rounds
+
+        # Message feed: last message id seen per cohort and latest message per agent
+        self.message_cursors: Dict[str, Optional[int]] = {}
+        self.latest_agent_messages: Dict[str, Dict[str, Any]] = {}
         self.asset_name = self.orchestrator_config.agent_config.asset_name
 
     async def setup_environment(self):
@@ -162,6 +166,9 @@ class GroupChatOrchestrator:
         # Run sub-rounds
         for sub_round in range(1, self.sub_rounds_per_round + 1):
             log_sub_round_start(self.logger, 'All Cohorts', sub_round)
+            # Pull only the messages posted since the last sub-round, for all cohorts at once
+            await self.sync_messages()
+            cohort_topics = await self.api_utils.get_topics(list(self.cohorts.keys()))
             # For each cohort, run the sub-round
             tasks = []
             for cohort_id, cohort_agents in self.cohorts.items():
@@ -170,11 +177,14 @@ class GroupChatOrchestrator:
                         cohort_id=cohort_id,
                         round_num=round_num,
                         sub_round_num=sub_round,
-                        cohort_agents=cohort_agents
+                        cohort_agents=cohort_agents,
+                        topic=cohort_topics.get(cohort_id)
                     )
                 )
                 tasks.append(task)
-            await asyncio.gather(*tasks)
+            cohort_messages = await asyncio.gather(*tasks)
+            # Post every cohort's messages in a single batch
+            await self.api_utils.post_messages([message for messages in cohort_messages for message in messages])
 
         # Run reflection
         log_section(self.logger, "AGENT REFLECTIONS")
@@ -186,19 +196,28 @@ class GroupChatOrchestrator:
         round_summary = await self.get_round_summary(round_num)
         self.round_summaries.append(round_summary)
 
+    async def sync_messages(self):
+        """
+        Fetches the message deltas of all cohorts in one request and keeps
+        the latest message of every agent.
+        """
+        cursors = {cohort_id: self.message_cursors.get(cohort_id) for cohort_id in self.cohorts}
+        feeds = await self.api_utils.get_messages_bulk(cursors)
+        for cohort_id, feed in feeds.items():
+            for message in feed.get('messages', []):
+                self.latest_agent_messages[message['agent_id']] = message
+            self.message_cursors[cohort_id] = feed.get('next_since_id')
+
     async def select_topic_proposers(self):
         """
-        Selects topic proposers for each cohort using the API.
+        Selects topic proposers for all cohorts with a single API request.
         """
-        tasks = []
-        for cohort_id, cohort_agents in self.cohorts.items():
-            agent_ids = [agent.id for agent in cohort_agents]
-            task = asyncio.create_task(
-                self.api_utils.select_proposer(cohort_id, agent_ids)
-            )
-            tasks.append(task)
-        results = await asyncio.gather(*tasks)
-        for cohort_id, proposer_id in zip(self.cohorts.keys(), results):
+        proposers = await self.api_utils.select_proposers({
+            cohort_id: [agent.id for agent in cohort_agents]
+            for cohort_id, cohort_agents in self.cohorts.items()
+        })
+        for cohort_id in self.cohorts:
+            proposer_id = proposers.get(cohort_id)
             if proposer_id:
                 self.topic_proposers[cohort_id] = proposer_id
                 self.logger.info(f"Selected proposer {proposer_id} for cohort {cohort_id}")
@@ -281,8 +300,9 @@ class GroupChatOrchestrator:
         cohort_id: str,
         round_num: int,
         sub_round_num: int,
-        cohort_agents: List[MarketAgent]
-    ):
+        cohort_agents: List[MarketAgent],
+        topic: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Runs a single sub-round for a cohort.
 
@@ -291,26 +311,30 @@ class GroupChatOrchestrator:
             round_num (int): The current round number.
             sub_round_num (int): The current sub-round number.
             cohort_agents (List[MarketAgent]): The agents in the cohort.
+            topic (str, optional): The cohort topic, fetched from the API if not given.
+
+        Returns:
+            List[Dict[str, Any]]: The messages to post to the API, batched by run_round.
         """
+        api_messages = []
         # First try block for cognitive processes
         try:
-            # Get topic and messages from API
-            topic = await self.api_utils.get_topic(cohort_id)
-            messages = await self.api_utils.get_messages(cohort_id)
+            # Messages are synced for all cohorts by run_round
+            if topic is None:
+                topic = await self.api_utils.get_topic(cohort_id)
 
             if not topic:
                 self.logger.warning(f"No topic found for cohort {cohort_id}")
-                return
+                return api_messages
 
             # Get the cohort's environment mechanism and update topic
             environment = cohort_agents[0].environments['group_chat']
             environment.mechanism._update_topic(topic, round_num)
 
             for agent in cohort_agents:
-                # Filter messages to only include this agent's messages
-                agent_messages = [msg for msg in messages if msg.get('agent_id') == agent.id]
+                # Latest message posted by this agent
                 agent.last_observation = {
-                    'messages': agent_messages[-1] if agent_messages else None
+                    'messages': self.latest_agent_messages.get(agent.id)
                 }
 
             # Agents perceive the messages
@@ -329,28 +353,23 @@ class GroupChatOrchestrator:
             actions = await self.cognitive_processor.run_parallel_action(cohort_agents, self.config.name)
 
         except Exception:
-            return
+            return api_messages
 
         # Second try block for data insertion
         try:
             # Prepare messages for both API posting and database insertion
             messages_to_insert = []
-            api_tasks = []
 
             for agent, action in zip(cohort_agents, actions):
                 content = self.extract_message_content(action)
                 if content:
-                    # Prepare API task
-                    api_task = asyncio.create_task(
-                        self.api_utils.post_message(
-                            agent_id=agent.id,
-                            cohort_id=cohort_id,
-                            content=content,
-                            round_num=round_num,
-                            sub_round_num=sub_round_num
-                        )
-                    )
-                    api_tasks.append(api_task)
+                    api_messages.append({
+                        'agent_id': agent.id,
+                        'cohort_id': cohort_id,
+                        'content': content,
+                        'round_num': round_num,
+                        'sub_round_num': sub_round_num
+                    })
 
                     messages_to_insert.append({
                         'message_id': str(uuid.uuid4()),
@@ -369,8 +388,6 @@ class GroupChatOrchestrator:
                 else:
                     self.logger.warning(f"Failed to extract message content for agent {agent.id}")
 
-            # Execute API posts in parallel
-            await asyncio.gather(*api_tasks)
             agents_data = [
                 {
                     'id': str(agent.id),
@@ -391,6 +408,8 @@ class GroupChatOrchestrator:
         except Exception as e:
             self.logger.warning(f"Error during data insertion in sub-round {sub_round_num} for cohort {cohort_id}: {e}")
 
+        return api_messages
+
     def extract_message_content(self, action) -> Optional[str]:
         """
         Extracts the message content from the action.
@@ -464,6 +483,10 @@ class GroupChatOrchestrator:
         }
         return summary
 
+    async def close(self):
+        """Release the API client session"""
+        await self.api_utils.close()
+
     def print_summary(self):
         """Print a summary of the simulation results"""
         log_section(self.logger, "GROUP CHAT SIMULATION SUMMARY")
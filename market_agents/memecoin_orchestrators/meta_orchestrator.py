@@ -16,7 +16,7 @@ from market_agents.agents.personas.persona import Persona, generate_persona, sav
 from market_agents.agents.protocols.acl_message import ACLMessage
 from market_agents.memecoin_orchestrators.crypto_agent import CryptoEconomicAgent
 from market_agents.memecoin_orchestrators.crypto_models import Crypto, Endowment as CryptoEndowment, Portfolio, Position
-from market_agents.inference.parallel_inference import ParallelAIUtilities, RequestLimits
+from market_agents.inference.parallel_inference import ParallelAIUtilities, RequestLimits, set_ai_utilities
 from market_agents.memecoin_orchestrators.base_orchestrator import BaseEnvironmentOrchestrator
 from market_agents.memecoin_orchestrators.config import OrchestratorConfig, load_config
 from market_agents.memecoin_orchestrators.groupchat_orchestrator import GroupChatOrchestrator
@@ -51,7 +51,8 @@ class MetaOrchestrator:
             oai_request_limits=oai_request_limits,
             anthropic_request_limits=anthropic_request_limits
         )
-        return ai_utils
+        # Agents calling inference on their own go through the same client and rate budget
+        return set_ai_utilities(ai_utils)
 
     def _initialize_data_inserter(self):
         db_config = self.config.database_config
@@ -89,8 +90,12 @@ class MetaOrchestrator:
         num_agents = len(personas)
 
         # Initialize EthereumInterface here for all agents
-        from agent_evm_interface.agent_evm_interface import EthereumInterface
-        ethereum_interface = EthereumInterface()
+        from agent_evm_interface.agent_evm_interface import get_ethereum_interface
+        crypto_config = self.config.environment_configs.get('crypto_market')
+        backend = getattr(crypto_config, 'backend', 'hardhat')
+        ethereum_interface = get_ethereum_interface(backend, num_accounts=self.config.num_agents + 1)
+        # Hand out accounts from a copy so the shared interface keeps the minter account
+        available_accounts = list(ethereum_interface.accounts)
         
         for i, persona in enumerate(personas):
             agent_uuid = str(uuid.uuid4())
@@ -100,7 +105,7 @@ class MetaOrchestrator:
             agent_config = self.config.agent_config.dict()
 
             # Get Ethereum account for this agent
-            account = ethereum_interface.accounts.pop()
+            account = available_accounts.pop()
 
             # Create initial portfolio
             initial_portfolio = Portfolio(
@@ -228,6 +233,11 @@ class MetaOrchestrator:
         for orchestrator in self.environment_orchestrators.values():
             orchestrator.print_summary()
 
+        # Release client sessions held by the orchestrators
+        for orchestrator in self.environment_orchestrators.values():
+            if hasattr(orchestrator, 'close'):
+                await orchestrator.close()
+
     async def start(self):
         print_ascii_art()
         log_section(self.logger, "Simulation Starting")
@@ -3,20 +3,116 @@
 import asyncio
 from datetime import datetime
 import logging
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 from market_agents.agents.market_agent import MarketAgent
+from market_agents.inference.message_models import LLMOutput, LLMPromptContext
+from market_agents.orchestrators.data_writer import persist
 from market_agents.orchestrators.logger_utils import (
     log_persona,
     log_perception,
     log_reflection
 )
 
+class BatchSlot:
+    """One participant's place in a PromptBatcher."""
+
+    def __init__(self, batcher: 'PromptBatcher'):
+        self._batcher = batcher
+        self._arrived = False
+
+    async def complete(self, prompts: List[LLMPromptContext]) -> List[Optional[LLMOutput]]:
+        """Add `prompts` to the shared batch and wait for it; outputs are in prompt order, None where missing."""
+        if self._arrived:
+            raise RuntimeError("This batch slot has already been used")
+        self._batcher._pending.extend(prompts)
+        self._arrive()
+        outputs = await asyncio.shield(self._batcher._outputs)
+        return [outputs.get(prompt.id) for prompt in prompts]
+
+    def leave(self):
+        """Give up the slot without submitting, so the others are not kept waiting. No-op once used."""
+        if not self._arrived:
+            self._arrive()
+
+    def _arrive(self):
+        self._arrived = True
+        self._batcher._waiting -= 1
+        if self._batcher._waiting == 0:
+            self._batcher._dispatch_task = asyncio.create_task(self._batcher._dispatch())
+
+
+class PromptBatcher:
+    """
+    Coalesces the prompts of concurrent callers (e.g. every cohort of a
+    group chat sub-round) into a single run_parallel_ai_completion call.
+
+    Reserve one slot per caller with `join()` before any of them starts; the
+    batch is dispatched once every slot has either submitted its prompts or
+    left, and outputs are routed back by source id, so prompt ids must be
+    unique across the batch.
+    """
+
+    def __init__(self, ai_utils, data_inserter):
+        self.ai_utils = ai_utils
+        self.data_inserter = data_inserter
+        self._pending: List[LLMPromptContext] = []
+        self._waiting = 0
+        self._outputs: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    def join(self) -> BatchSlot:
+        if self._outputs.done() or self._dispatch_task is not None:
+            raise RuntimeError("Cannot join a batch that has already been dispatched")
+        self._waiting += 1
+        return BatchSlot(self)
+
+    async def _dispatch(self):
+        try:
+            outputs = []
+            if self._pending:
+                outputs = await self.ai_utils.run_parallel_ai_completion(self._pending, update_history=True)
+                await persist(self.data_inserter, 'insert_ai_requests', self.ai_utils.get_all_requests())
+            self._outputs.set_result({output.source_id: output for output in outputs})
+        except Exception as e:
+            self._outputs.set_exception(e)
+
+
 class AgentCognitiveProcessor:
     def __init__(self, ai_utils, data_inserter, logger: logging.Logger, tool_mode=False):
         self.ai_utils = ai_utils
         self.data_inserter = data_inserter
         self.logger = logger
         self.tool_mode = tool_mode
+        # Per phase: input tokens sent and how many of them were served from the provider's prompt cache
+        self.cache_usage: Dict[str, Dict[str, int]] = {}
+
+    def record_cache_usage(self, phase: str, outputs: List[Optional[LLMOutput]]):
+        """Add a batch's prompt cache hits to `cache_usage[phase]` and log the batch's hit rate."""
+        input_tokens = cached_tokens = 0
+        for output in outputs:
+            try:
+                usage = output.usage if output is not None else None
+            except Exception:
+                # Failed requests carry no usage; they must not break the round
+                usage = None
+            if usage is None:
+                continue
+            cached = usage.cache_read_input_tokens or 0
+            if usage.cache_creation_input_tokens is not None:
+                # Anthropic counts cache reads and writes separately from input_tokens
+                input_tokens += usage.prompt_tokens + cached + usage.cache_creation_input_tokens
+            else:
+                input_tokens += usage.prompt_tokens
+            cached_tokens += cached
+        if not input_tokens:
+            return
+        totals = self.cache_usage.setdefault(phase, {'input_tokens': 0, 'cache_read_input_tokens': 0})
+        totals['input_tokens'] += input_tokens
+        totals['cache_read_input_tokens'] += cached_tokens
+        self.logger.info(
+            f"Prompt cache ({phase}): {cached_tokens}/{input_tokens} input tokens read from cache "
+            f"({cached_tokens / input_tokens:.0%}); {totals['cache_read_input_tokens']}/{totals['input_tokens']} so far"
+        )
 
     async def run_parallel_perceive(self, agents: List[MarketAgent], environment_name: str) -> List[Any]:
         perception_prompts = []
@@ -24,8 +120,10 @@ class AgentCognitiveProcessor:
             perception_prompt = await agent.perceive(environment_name, return_prompt=True, structured_tool=self.tool_mode)
             perception_prompts.append(perception_prompt)
         
-        perceptions = await self.ai_utils.run_parallel_ai_completion(perception_prompts, update_history=False)
-        self.data_inserter.insert_ai_requests(self.ai_utils.get_all_requests())
+        # Record each reply in its prompt's history; agents with a context policy carry it into their next prompt
+        perceptions = await self.ai_utils.run_parallel_ai_completion(perception_prompts, update_history=True)
+        await persist(self.data_inserter, 'insert_ai_requests', self.ai_utils.get_all_requests())
+        self.record_cache_usage(f"{environment_name}/perception", perceptions)
         
         # Log personas and perceptions, and update agent states
         for agent, perception in zip(agents, perceptions):
@@ -39,13 +137,26 @@ class AgentCognitiveProcessor:
             
         return perceptions
 
-    async def run_parallel_action(self, agents: List[MarketAgent], environment_name: str) -> List[Any]:
+    def batcher(self) -> PromptBatcher:
+        """A PromptBatcher that shares this processor's inference utilities and data inserter."""
+        return PromptBatcher(self.ai_utils, self.data_inserter)
+
+    async def run_parallel_action(self, agents: List[MarketAgent], environment_name: str, slot: Optional[BatchSlot] = None) -> List[Any]:
         action_prompts = []
-        for agent in agents:
-            action_prompt = await agent.generate_action(environment_name, agent.last_perception, return_prompt=True, structured_tool=self.tool_mode)
-            action_prompts.append(action_prompt)
-        actions = await self.ai_utils.run_parallel_ai_completion(action_prompts, update_history=False)
-        self.data_inserter.insert_ai_requests(self.ai_utils.get_all_requests())
+        try:
+            for agent in agents:
+                action_prompt = await agent.generate_action(environment_name, agent.last_perception, return_prompt=True, structured_tool=self.tool_mode)
+                action_prompts.append(action_prompt)
+        finally:
+            if slot is not None and len(action_prompts) < len(agents):
+                slot.leave()
+        if slot is not None:
+            # Dispatched together with the other slots of the batch, one output per agent
+            actions = await slot.complete(action_prompts)
+        else:
+            actions = await self.ai_utils.run_parallel_ai_completion(action_prompts, update_history=True)
+            await persist(self.data_inserter, 'insert_ai_requests', self.ai_utils.get_all_requests())
+        self.record_cache_usage(f"{environment_name}/action", actions)
         return actions
 
     async def run_parallel_reflect(self, agents: List[MarketAgent], environment_name: str) -> None:
@@ -58,8 +169,9 @@ class AgentCognitiveProcessor:
                 agents_with_observations.append(agent)
                 
         if reflection_prompts:
-            reflections = await self.ai_utils.run_parallel_ai_completion(reflection_prompts, update_history=False)
-            self.data_inserter.insert_ai_requests(self.ai_utils.get_all_requests())
+            reflections = await self.ai_utils.run_parallel_ai_completion(reflection_prompts, update_history=True)
+            await persist(self.data_inserter, 'insert_ai_requests', self.ai_utils.get_all_requests())
+            self.record_cache_usage(f"{environment_name}/reflection", reflections)
             
             for agent, reflection in zip(agents_with_observations, reflections):
                 if reflection.json_object:
@@ -102,7 +214,7 @@ class AgentCognitiveProcessor:
                             "total_reward": round(total_reward, 4)
                         })
                         
-                    agent.memory.append(memory_entry)
+                    agent.remember(memory_entry)
                 else:
                     self.logger.warning(f"No reflection JSON object for agent {agent.index}")
         else:
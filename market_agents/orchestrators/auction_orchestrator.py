@@ -4,7 +4,7 @@ import asyncio
 from datetime import datetime
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from market_agents.orchestrators.base_orchestrator import BaseEnvironmentOrchestrator
 from market_agents.agents.market_agent import MarketAgent
@@ -22,7 +22,10 @@ from market_agents.economics.econ_models import (
     Bid,
     Trade
 )
+from market_agents.economics.equilibrium import Equilibrium
+from market_agents.economics.zi_engine import ZiPopulation
 from market_agents.orchestrators.config import AuctionConfig, OrchestratorConfig
+from market_agents.orchestrators.data_writer import persist
 from market_agents.orchestrators.logger_utils import (
     log_section,
     log_environment_setup,
@@ -67,7 +70,8 @@ class AuctionTracker:
             "total_quantity": sum(self.per_round_quantities)
         }
 
-    def get_trades_data(self) -> List[Dict]:
+    def get_trades_data(self, round_num: int = None) -> List[Dict]:
+        """Trades recorded so far, or only those of `round_num`."""
         return [
             {
                 'buyer_id': trade['buyer_id'],
@@ -80,6 +84,7 @@ class AuctionTracker:
                 'round': trade['round']
             }
             for trade in self.all_trades
+            if round_num is None or trade['round'] == round_num
         ]
 
 # Implement the AuctionOrchestrator class
@@ -102,9 +107,15 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
         )
         self.orchestrator_config = orchestrator_config
         self.environment_name = 'auction'
+        self.state_reads = {'perception', 'memory', 'system_prompt', 'economic_state'}
+        self.state_writes = {'perception', 'action', 'observation', 'memory', 'interactions', 'system_prompt', 'economic_state'}
         self.environment = None
         self.tracker = AuctionTracker()
         self.agent_surpluses: Dict[str, float] = {}
+        self.equilibria: Dict[str, Dict[str, Any]] = {}
+        # Agents with use_llm=False quote through the vectorized ZI engine
+        self.zi_agents: List[MarketAgent] = []
+        self.zi_population: Optional[ZiPopulation] = None
         self.logger = logger or logging.getlogger(__name__)
         self.cognitive_processor = AgentCognitiveProcessor(ai_utils, data_inserter, self.logger, self.orchestrator_config.tool_mode)
 
@@ -126,7 +137,8 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
             max_steps=self.config.max_rounds,
             action_space=AuctionActionSpace(),
             observation_space=AuctionObservationSpace(),
-            mechanism=double_auction
+            mechanism=double_auction,
+            prompt_window_rounds=self.config.prompt_window_rounds
         )
         
         # Assign the environment to agents
@@ -135,6 +147,20 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
                 agent.environments = {}
             agent.environments[self.environment_name] = self.environment
             
+        # Theoretical benchmark for the run, stored once so per-round efficiency is a lookup
+        good_name = self.orchestrator_config.agent_config.good_name
+        equilibrium = Equilibrium(
+            agents=[agent.economic_agent for agent in self.agents if agent.economic_agent is not None],
+            goods=[good_name]
+        )
+        self.equilibria = {good: result.model_dump() for good, result in equilibrium.equilibrium.items()}
+        self.data_inserter.insert_equilibria(list(self.equilibria.values()))
+
+        self.zi_agents = [agent for agent in self.agents if not getattr(agent, 'use_llm', True)]
+        if self.zi_agents:
+            self.zi_population = ZiPopulation.from_agents([agent.economic_agent for agent in self.zi_agents], [good_name])
+            self.logger.info(f"{len(self.zi_agents)} agents without an LLM quote through the ZI engine")
+
         log_environment_setup(self.logger, self.environment_name)
         self.logger.info("Auction environment setup complete.")
         
@@ -154,6 +180,11 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
         # Reset agents' pending orders at the beginning of the round
         for agent in self.agents:
             agent.economic_agent.reset_all_pending_orders()
+            if agent.state is not None:
+                agent.state.reset_pending()
+        if self.zi_population is not None:
+            self.zi_population.store.reset_pending()
+        llm_agents = [agent for agent in self.agents if getattr(agent, 'use_llm', True)]
 
         # Set system messages for agents
         self.set_agent_system_messages(round_num, env.mechanism.good_name)
@@ -161,14 +192,14 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
         log_section(self.logger, "AGENT PERCEPTIONS")
         # Run agents' perception in parallel using imported cognitive method
         perceptions = await self.cognitive_processor.run_parallel_perceive(
-            self.agents, 
+            llm_agents, 
             self.environment_name
         )
 
         # Map perceptions to agents
         perceptions_map = {perception.source_id: perception for perception in perceptions}
 
-        for agent in self.agents:
+        for agent in llm_agents:
             perception = perceptions_map.get(agent.id)
             if perception:
                 log_persona(self.logger, agent.index, agent.persona)
@@ -179,20 +210,20 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
                 agent.last_perception = None
 
         # Extract perception contents for action generation
-        perception_contents = [agent.last_perception or "" for agent in self.agents]
+        perception_contents = [agent.last_perception or "" for agent in llm_agents]
 
         log_section(self.logger, "AGENT ACTIONS")
         # Run agents' action generation in parallel using imported cognitive method
         actions = await self.cognitive_processor.run_parallel_action(
-            self.agents,
+            llm_agents,
             self.environment_name
         )
 
         actions_map = {action.source_id: action for action in actions}
 
         # Collect actions from agents
-        agent_actions = {}
-        for agent in self.agents:
+        agent_actions = self._zi_actions(env.mechanism.good_name)
+        for agent in llm_agents:
             action = actions_map.get(agent.id)
             if action:
                 try:
@@ -212,6 +243,8 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
                         # Update agent's pending orders
                         good_name = env.mechanism.good_name
                         agent.economic_agent.pending_orders.setdefault(good_name, []).append(auction_action)
+                        if agent.state is not None:
+                            agent.state.add_order(good_name, auction_action)
 
                         action_type = "Bid" if isinstance(auction_action, Bid) else "Ask"
                         log_action(self.logger, agent.index, f"{action_type}: {auction_action}")
@@ -234,7 +267,7 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
 
         # Process the environment state
         if isinstance(env_state.global_observation, AuctionGlobalObservation):
-            self.process_environment_state(env_state)
+            self.process_environment_state(env_state, round_num)
 
         # Store the last environment state
         self.last_env_state = env_state
@@ -242,15 +275,39 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
         # Run reflection step
         log_section(self.logger, "AGENT REFLECTIONS")
         await self.cognitive_processor.run_parallel_reflect(
-            self.agents,
+            llm_agents,
             self.environment_name
         )
 
+    def _zi_actions(self, good_name: str) -> Dict[str, AuctionAction]:
+        """Quote for every non-LLM agent in one vectorized draw and record the quotes as pending orders."""
+        if self.zi_population is None:
+            return {}
+        quotes = self.zi_population.draw_quotes(good_name)
+        zi_actions = {}
+        for rows, prices, order_type in ((quotes.bid_rows, quotes.bid_prices, Bid), (quotes.ask_rows, quotes.ask_prices, Ask)):
+            for row, price in zip(rows.tolist(), prices.tolist()):
+                agent = self.zi_agents[row]
+                order = order_type(price=price, quantity=1)
+                agent.economic_agent.pending_orders.setdefault(good_name, []).append(order)
+                if agent.state is not None:
+                    agent.state.add_order(good_name, order)
+                zi_actions[agent.id] = AuctionAction(agent_id=agent.id, action=order)
+        self.logger.info(f"ZI engine quoted {len(quotes.bid_rows)} bids and {len(quotes.ask_rows)} asks")
+        return zi_actions
+
     def set_agent_system_messages(self, round_num: int, good_name: str):
         # Set system messages for agents based on their role and round number
         for agent in self.agents:
-            current_cash = agent.economic_agent.endowment.current_basket.cash
-            current_goods = agent.economic_agent.endowment.current_basket.get_good_quantity(good_name)
+            if not getattr(agent, 'use_llm', True):
+                continue
+            if agent.state is not None:
+                current_cash = agent.state.cash
+                current_goods = agent.state.holding(good_name)
+            else:
+                current_basket = agent.economic_agent.endowment.current_basket
+                current_cash = current_basket.cash
+                current_goods = current_basket.get_good_quantity(good_name)
             if round_num == 1:
                 if agent.role == "buyer":
                     current_value = agent.economic_agent.get_current_value(good_name)
@@ -304,7 +361,7 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
                         else:
                             agent.system = f"You have no more {good_name} to sell."
 
-    def process_environment_state(self, env_state: EnvironmentStep):
+    def process_environment_state(self, env_state: EnvironmentStep, round_num: int):
         global_observation = env_state.global_observation
         if not isinstance(global_observation, AuctionGlobalObservation):
             self.logger.error(f"Unexpected global observation type: {type(global_observation)}")
@@ -323,13 +380,20 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
                 buyer = next(agent for agent in self.agents if agent.id == trade.buyer_id)
                 seller = next(agent for agent in self.agents if agent.id == trade.seller_id)
                 
-                # Process the trade for both agents
+                # Process the trade for both agents; the change in each one's
+                # surplus is this trade's surplus (value - price, price - cost)
+                buyer_surplus_before = buyer.economic_agent.calculate_individual_surplus()
+                seller_surplus_before = seller.economic_agent.calculate_individual_surplus()
                 buyer.economic_agent.process_trade(trade)
                 seller.economic_agent.process_trade(trade)
+                if buyer.state is not None:
+                    buyer.state.store.apply_trade(trade)
+                if self.zi_population is not None:
+                    self.zi_population.store.apply_trade(trade)
                 
                 # Calculate surpluses
-                buyer_surplus = round(buyer.economic_agent.calculate_individual_surplus(), 2)
-                seller_surplus = round(seller.economic_agent.calculate_individual_surplus(), 2)
+                buyer_surplus = round(buyer.economic_agent.calculate_individual_surplus() - buyer_surplus_before, 2)
+                seller_surplus = round(seller.economic_agent.calculate_individual_surplus() - seller_surplus_before, 2)
                 
                 self.logger.info(f"Buyer surplus: {buyer_surplus:.2f}, Seller surplus: {seller_surplus:.2f}")
                 
@@ -337,8 +401,7 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
                 agent_surpluses[buyer.id] = round(agent_surpluses.get(buyer.id, 0) + buyer_surplus, 2)
                 agent_surpluses[seller.id] = round(agent_surpluses.get(seller.id, 0) + seller_surplus, 2)
                 
-                # Add trade to tracker with current round number from mechanism
-                self.tracker.add_trade(trade, buyer_surplus, seller_surplus, global_observation.market_summary.trades_count)
+                self.tracker.add_trade(trade, buyer_surplus, seller_surplus, round_num)
                 
                 trade_surplus = round(buyer_surplus + seller_surplus, 2)
                 round_surplus += trade_surplus
@@ -366,6 +429,9 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
 
         # Store agent_surpluses for reflection
         env_state.info['agent_rewards'] = agent_surpluses
+        for agent in self.agents:
+            if agent.state is not None and agent.id in agent_surpluses:
+                agent.state.add_reward(agent_surpluses[agent.id])
         self.agent_surpluses = agent_surpluses
 
         # Store the last environment state
@@ -378,8 +444,8 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
             'agent_states': [{
                 'id': agent.id,
                 'is_buyer': agent.role == "buyer",
-                'cash': agent.economic_agent.endowment.current_basket.cash,
-                'goods': agent.economic_agent.endowment.current_basket.goods_dict,
+                'cash': agent.state.cash if agent.state is not None else agent.economic_agent.endowment.current_basket.cash,
+                'goods': agent.state.goods if agent.state is not None else agent.economic_agent.endowment.current_basket.goods_dict,
                 'last_action': agent.last_action,
                 'memory': agent.memory[-1] if agent.memory else None
             } for agent in self.agents],
@@ -390,23 +456,17 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
 
     async def process_round_results(self, round_num: int):
         try:
-            agents_data = [
-                {
-                    'id': str(agent.id),
-                    'role': agent.role,
-                    'is_llm': agent.use_llm,
-                    'max_iter': self.orchestrator_config.max_rounds,
-                    'llm_config': agent.llm_config if isinstance(agent.llm_config, dict) else agent.llm_config.dict()
-                }
-                for agent in self.agents
-            ]
-            agent_id_map = self.data_inserter.insert_agents(agents_data)
+            agents_data = self.data_inserter.build_agents_data(self.agents, self.orchestrator_config.max_rounds)
+            agent_id_map = await persist(self.data_inserter, 'insert_agents', agents_data)
             
-            trades_data = self.tracker.get_trades_data()
+            # Earlier rounds' trades are already stored (and counted in round_metrics)
+            trades_data = self.tracker.get_trades_data(round_num)
             if trades_data:
-                self.data_inserter.insert_trades(trades_data, agent_id_map)
+                await persist(self.data_inserter, 'insert_trades', trades_data, agent_id_map)
             
-            self.data_inserter.insert_round_data(
+            await persist(
+                self.data_inserter,
+                'insert_round_data',
                 round_num,
                 self.agents,
                 {self.environment_name: self.environment},
@@ -444,7 +504,7 @@ class AuctionOrchestrator(BaseEnvironmentOrchestrator):
         print(f"Total Empirical Surplus: {total_empirical_surplus:.2f}")
 
         global_state = self.environment.get_global_state()
-        equilibria = global_state.get('equilibria', {})
+        equilibria = global_state.get('equilibria') or self.equilibria
 
         if equilibria:
             theoretical_total_surplus = sum(data['total_surplus'] for data in equilibria.values())
@@ -1,7 +1,8 @@
 # base_environment_orchestrator.py
-from typing import List, Union, Dict
+from typing import List, Set, Union, Dict
 from market_agents.agents.market_agent import MarketAgent
 from market_agents.inference.parallel_inference import ParallelAIUtilities
+from market_agents.orchestrators.data_writer import SimulationDataWriter
 from market_agents.orchestrators.insert_simulation_data import SimulationDataInserter
 from pydantic import BaseModel, Field
 from abc import ABC, abstractmethod
@@ -12,9 +13,16 @@ class BaseEnvironmentOrchestrator(BaseModel, ABC):
     config: Union[AuctionConfig, GroupChatConfig]
     agents: List['MarketAgent']
     ai_utils: 'ParallelAIUtilities'
-    data_inserter: 'SimulationDataInserter'
+    data_inserter: Union['SimulationDataInserter', 'SimulationDataWriter']
     logger: logging.Logger = Field(default=None)
     environment_name: str = Field(default="")
+    # Agent state this environment reads and writes during a round: any of
+    # 'perception', 'action', 'observation', 'memory', 'interactions',
+    # 'system_prompt', 'economic_state' and 'cohort', or '*' for all of it.
+    # The MetaOrchestrator runs environments concurrently when they share no
+    # agents or their declarations do not conflict.
+    state_reads: Set[str] = Field(default_factory=lambda: {'*'})
+    state_writes: Set[str] = Field(default_factory=lambda: {'*'})
 
     class Config:
         arbitrary_types_allowed = True
@@ -25,6 +33,10 @@ class BaseEnvironmentOrchestrator(BaseModel, ABC):
         if self.logger is None:
             self.logger = logging.getLogger(self.__class__.__name__)
 
+    def agent_scope(self) -> Set[str]:
+        """Ids of the agents this environment touches."""
+        return {str(agent.id) for agent in self.agents}
+
     @abstractmethod
     def setup_environment(self):
         pass
@@ -1,11 +1,13 @@
 # config.py
 
 from pydantic import BaseModel, Field
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import yaml
 from pathlib import Path
 
+from market_agents.inference.message_models import ContextPolicy
+
 class AgentConfig(BaseModel):
     num_units: int
     buyer_base_value: float
@@ -18,12 +20,16 @@ class AgentConfig(BaseModel):
     good_name: str
     noise_factor: float
     max_relative_spread: float
+    memory_window: Optional[int] = None
+    context_policy: Optional[ContextPolicy] = None
 
 class AuctionConfig(BaseModel):
     name: str
     address: str
     max_rounds: int
     good_name: str
+    agent_indices: Optional[List[int]] = None
+    prompt_window_rounds: Optional[int] = None
 
 class GroupChatConfig(BaseModel):
     name: str
@@ -33,6 +39,8 @@ class GroupChatConfig(BaseModel):
     groupchat_api_url: str = Field(default="http://localhost:8001")
     sub_rounds: int = Field(default=3)
     group_size: int = Field(default=100)
+    agent_indices: Optional[List[int]] = None
+    prompt_window_rounds: Optional[int] = None
 
 class LLMConfigModel(BaseModel):
     name: str
@@ -49,6 +57,13 @@ class DatabaseConfig(BaseSettings):
     db_password: str = Field(..., env='DB_PASSWORD')
     db_host: str = Field('localhost', env='DB_HOST')
     db_port: str = Field('5432', env='DB_PORT')
+    write_behind: bool = True
+    write_queue_size: int = 1000
+    write_workers: int = 1
+    pool_size: int = 4
+    dedupe_prompts: bool = True
+    compress_responses: bool = False
+    rounds_per_partition: int = 100
 
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
@@ -62,6 +77,10 @@ class OrchestratorConfig(BaseSettings):
     protocol: str
     database_config: DatabaseConfig = DatabaseConfig()
     tool_mode: bool
+    concurrent_environments: bool = True
+    pipeline_persistence: bool = False
+    full_request_validation: bool = False
+    agent_state_store: bool = False
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
 def load_config(config_path: Path) -> OrchestratorConfig:
@@ -0,0 +1,332 @@
+# data_writer.py
+
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Set, Tuple, Union
+
+from market_agents.orchestrators.insert_simulation_data import SimulationDataInserter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Write:
+    """One pending call to a SimulationDataInserter method taking a list of rows."""
+    method: str
+    rows: List[Any]
+    args: Tuple[Any, ...] = ()
+
+
+_STOP = object()
+
+
+class SimulationDataWriter:
+    """
+    Write-behind front for `SimulationDataInserter`.
+
+    Exposes the same insert_* methods, but they only snapshot their arguments
+    and enqueue them. Writer threads, each with its own pooled connection,
+    drain the queue, merge pending writes for the same table into one bulk
+    insert and commit each drained batch in a single transaction, so the event
+    loop never waits on the database.
+
+    The queue is bounded: when the writers fall `max_pending` writes behind,
+    callers wait until they catch up. Async code calls the insert methods
+    through `submit()` (or `persist()`), which waits off the event loop;
+    direct calls block only when made outside a running loop. `flush()` waits until everything queued
+    so far is committed and is meant to be awaited at round boundaries;
+    `close()` flushes and stops the threads, and also runs at interpreter exit.
+
+    With more than one worker, batches commit in parallel and may land out of
+    order, so agents must already exist before rows referencing them are queued.
+    """
+
+    def __init__(self, inserter: SimulationDataInserter, max_pending: int = 1000, num_workers: int = 1):
+        self.inserter = inserter
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._local = threading.local()
+        self._spilled: Set[asyncio.Task] = set()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"simulation-data-writer-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        atexit.register(self.close)
+
+    def _put(self, item: Any):
+        if self._closed:
+            raise RuntimeError("SimulationDataWriter is closed")
+        collected = getattr(self._local, 'collected', None)
+        if collected is not None:
+            # Inside submit(), which waits for room itself
+            collected.append(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                logger.warning("Simulation data writer is falling behind; waiting for pending writes")
+                self._queue.put(item)
+                return
+            # Never block the event loop: hand the write to a task that waits for room
+            logger.warning("Simulation data writer is falling behind; use `await submit(...)` from async code")
+            task = loop.create_task(self._put_async(item))
+            self._spilled.add(task)
+            task.add_done_callback(self._spilled.discard)
+
+    async def _put_async(self, item: Any):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            logger.warning("Simulation data writer is falling behind; waiting for pending writes")
+            await asyncio.to_thread(self._queue.put, item)
+
+    async def submit(self, method: str, *args, **kwargs) -> Any:
+        """
+        Call insert method `method` from async code.
+
+        Queues the same writes as calling it directly, but when the queue is
+        full it waits for room in a worker thread instead of blocking the
+        event loop. Returns what the method returns.
+        """
+        collected: List[Any] = []
+        self._local.collected = collected
+        try:
+            result = getattr(self, method)(*args, **kwargs)
+        finally:
+            self._local.collected = None
+        for item in collected:
+            await self._put_async(item)
+        return result
+
+    def _enqueue(self, method: str, rows: List[Any], *args):
+        if rows:
+            # Pin rows to the round they were queued in; the writers may only
+            # get to them after the simulation has moved on
+            round_num = self.inserter.current_round
+            rows = [
+                {**row, 'round': round_num} if isinstance(row, dict) and 'round' not in row else row
+                for row in rows
+            ]
+            self._put(_Write(method, rows, args))
+
+    # Writer thread
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    self._queue.task_done()
+                    return
+                batch = [item]
+                stop = False
+                # Drain whatever else is already queued
+                while True:
+                    try:
+                        next_item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if next_item is _STOP:
+                        stop = True
+                        break
+                    batch.append(next_item)
+                try:
+                    self._write_batch(batch)
+                finally:
+                    for _ in range(len(batch) + stop):
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            self.inserter.release_connection()
+
+    def _write_batch(self, batch: List[_Write]):
+        groups = self._coalesce(batch)
+        try:
+            with self.inserter.transaction():
+                for write in groups:
+                    self._apply(write)
+        except Exception as e:
+            # Retry table by table so one bad group does not drop the whole batch
+            logger.error(f"Error writing batch of {len(batch)} queued writes, retrying per table: {e}")
+            for write in groups:
+                try:
+                    with self.inserter.transaction():
+                        self._apply(write)
+                except Exception as e:
+                    logger.error(f"Dropping {len(write.rows)} rows for {write.method}: {e}")
+
+    def _apply(self, write: _Write):
+        if write.method == 'write_round_data':
+            for round_data in write.rows:
+                self.inserter.write_round_data(round_data)
+        else:
+            getattr(self.inserter, write.method)(write.rows, *write.args)
+
+    @staticmethod
+    def _coalesce(writes: List[_Write]) -> List[_Write]:
+        """
+        Merge writes to the same method (and same scalar arguments) into one.
+
+        Agent id maps passed along with the rows are merged. Agent upserts are
+        moved first so rows referencing newly seen agents satisfy the foreign keys.
+        """
+        groups: Dict[Tuple[Any, ...], _Write] = {}
+        for write in writes:
+            key = (write.method,) + tuple(arg for arg in write.args if not isinstance(arg, dict))
+            group = groups.get(key)
+            if group is None:
+                groups[key] = _Write(
+                    write.method,
+                    list(write.rows),
+                    tuple(dict(arg) if isinstance(arg, dict) else arg for arg in write.args)
+                )
+                continue
+            group.rows.extend(write.rows)
+            for merged, arg in zip(group.args, write.args):
+                if isinstance(arg, dict):
+                    merged.update(arg)
+        return sorted(groups.values(), key=lambda write: write.method != 'insert_agents')
+
+    # Inserter interface
+
+    @property
+    def run_id(self) -> int:
+        return self.inserter.run_id
+
+    @property
+    def current_round(self) -> int:
+        return self.inserter.current_round
+
+    def start_run(self, name: str, config: Any = None, max_rounds: int = 0, rounds_per_partition: int = 100) -> int:
+        # Rows still queued belong to the previous run
+        self.flush_sync()
+        return self.inserter.start_run(name, config, max_rounds, rounds_per_partition)
+
+    def set_round(self, round_num: int):
+        self.inserter.set_round(round_num)
+
+    def finish_run(self):
+        self.flush_sync()
+        self.inserter.finish_run()
+
+    def build_agents_data(self, agents: List[Any], max_iter: int) -> List[Dict[str, Any]]:
+        return self.inserter.build_agents_data(agents, max_iter)
+
+    def register_agents(self, agents: List[Any], max_iter: int) -> Dict[str, uuid.UUID]:
+        """Upsert the population synchronously, so queued rows never reference missing agents."""
+        return self.inserter.register_agents(agents, max_iter)
+
+    def insert_agents(self, agents_data: List[Dict[str, Any]]) -> Dict[str, uuid.UUID]:
+        """Queue the upsert of new or changed agents and return the agent id map, which is the agent ids themselves."""
+        agent_id_map = {}
+        for agent in agents_data:
+            try:
+                agent_id_map[str(agent['id'])] = uuid.UUID(str(agent['id'])) if isinstance(agent['id'], (str, int)) else agent['id']
+            except ValueError as e:
+                logger.error(f"Error queueing agent: {str(e)}")
+        self._enqueue('insert_agents', self.inserter.changed_agents(agents_data))
+        return agent_id_map
+
+    def insert_agent_memories(self, memories: List[Dict[str, Any]]):
+        self._enqueue('insert_agent_memories', memories)
+
+    def insert_groupchat_messages(self, messages: List[Dict[str, Any]], round_num: int, agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_groupchat_messages', messages, round_num, agent_id_map)
+
+    def insert_allocations(self, allocations: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_allocations', allocations, agent_id_map)
+
+    def insert_schedules(self, schedules_data: List[Dict[str, Any]]):
+        self._enqueue('insert_schedules', schedules_data)
+
+    def insert_orders(self, orders: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_orders', orders, agent_id_map)
+
+    def insert_trades(self, trades_data: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_trades', trades_data, agent_id_map)
+
+    def insert_equilibria(self, equilibria: List[Dict[str, Any]]):
+        self._enqueue('insert_equilibria', equilibria)
+
+    def insert_interactions(self, interactions: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_interactions', interactions, agent_id_map)
+
+    def insert_observations(self, observations: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_observations', observations, agent_id_map)
+
+    def insert_reflections(self, reflections: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_reflections', reflections, agent_id_map)
+
+    def insert_perceptions(self, perceptions: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_perceptions', perceptions, agent_id_map)
+
+    def insert_actions(self, actions: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
+        self._enqueue('insert_actions', actions, agent_id_map)
+
+    def insert_ai_requests(self, ai_requests):
+        self._enqueue('_insert_ai_requests_to_db', self.inserter.prepare_ai_requests(ai_requests))
+
+    def insert_round_data(
+        self,
+        round_num: int,
+        agents: List[Any],
+        environment: Any,
+        config: Any,
+        tracker: Any,
+        environment_name: str = 'auction'
+    ):
+        try:
+            round_data = self.inserter.prepare_round_data(round_num, agents, environment, config, tracker, environment_name)
+        except Exception as e:
+            logger.error(f"Error preparing data for round {round_num}: {str(e)}")
+            logger.exception("Exception details:")
+            return
+        self._put(_Write('write_round_data', [round_data]))
+
+    def write_round_data(self, round_data: Dict[str, Any]):
+        self._put(_Write('write_round_data', [round_data]))
+
+    def check_tables_exist(self) -> bool:
+        self.flush_sync()
+        return self.inserter.check_tables_exist()
+
+    # Lifecycle
+
+    def flush_sync(self):
+        """Block until every queued write is committed."""
+        self._queue.join()
+
+    async def flush(self):
+        """Wait, without blocking the event loop, until every queued write is committed."""
+        if self._spilled:
+            await asyncio.gather(*self._spilled)
+        await asyncio.to_thread(self.flush_sync)
+
+    def close(self):
+        """Commit everything still queued and stop the writer threads."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        atexit.unregister(self.close)
+
+
+async def persist(data_inserter: Union[SimulationDataInserter, SimulationDataWriter], method: str, *args, **kwargs) -> Any:
+    """Call insert method `method` of either persistence backend from async code, without blocking on a full write queue."""
+    if isinstance(data_inserter, SimulationDataWriter):
+        return await data_inserter.submit(method, *args, **kwargs)
+    return getattr(data_inserter, method)(*args, **kwargs)
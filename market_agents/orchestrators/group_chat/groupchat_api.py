@@ -2,7 +2,10 @@
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from bisect import bisect_right
+import itertools
+import threading
 import uvicorn
 import random
 import logging
@@ -18,6 +21,15 @@ messages: Dict[str, List[Dict]] = {}
 agents: Dict[str, Dict] = {}
 proposers: Dict[str, str] = {} 
 
+# Message indexes: ids are global and increasing, so every per-cohort list is sorted by id
+message_ids: Dict[str, List[int]] = {}
+agent_message_index: Dict[Tuple[str, str], List[int]] = {}
+round_message_index: Dict[Tuple[str, int], List[int]] = {}
+message_counter = itertools.count(1)
+# Sync endpoints run in FastAPI's threadpool; ids, positions and the indexes
+# must change together for the since_id cursors to stay valid
+message_lock = threading.Lock()
+
 # Pydantic models
 class Agent(BaseModel):
     id: str
@@ -55,6 +67,21 @@ class ProposerResponse(BaseModel):
 class GetMessagesResponse(BaseModel):
     cohort_id: str
     messages: List[Dict]
+    next_since_id: Optional[int] = None
+    has_more: bool = False
+
+class TopicsRequest(BaseModel):
+    cohort_ids: List[str]
+
+class PostMessageResult(BaseModel):
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class MessagesFeedRequest(BaseModel):
+    cursors: Dict[str, Optional[int]]
+    agent_id: Optional[str] = None
+    round_num: Optional[int] = None
+    limit: Optional[int] = None
 
 class GetTopicResponse(BaseModel):
     cohort_id: str
@@ -74,23 +101,35 @@ def form_cohorts(request: CohortFormationRequest):
     agent_ids = request.agent_ids
     cohort_size = request.cohort_size
     random.shuffle(agent_ids)
-    cohorts = {}
-    cohort_responses = []
-    for i in range(0, len(agent_ids), cohort_size):
-        cohort_agent_ids = agent_ids[i:i + cohort_size]
-        cohort_id = f"cohort_{i // cohort_size}"
-        cohorts[cohort_id] = cohort_agent_ids
-        cohort_responses.append(CohortResponse(cohort_id=cohort_id, agent_ids=cohort_agent_ids))
-        # Initialize messages and topics for the cohort
-        messages[cohort_id] = []
-        topics[cohort_id] = ""
-        proposers[cohort_id] = ""  # Initialize proposer
-        logger.info(f"Cohort formed: {cohort_id} with agents {cohort_agent_ids}")
+    with message_lock:
+        cohorts = {}
+        agent_message_index.clear()
+        round_message_index.clear()
+        cohort_responses = []
+        for i in range(0, len(agent_ids), cohort_size):
+            cohort_agent_ids = agent_ids[i:i + cohort_size]
+            cohort_id = f"cohort_{i // cohort_size}"
+            cohorts[cohort_id] = cohort_agent_ids
+            cohort_responses.append(CohortResponse(cohort_id=cohort_id, agent_ids=cohort_agent_ids))
+            # Initialize messages and topics for the cohort
+            messages[cohort_id] = []
+            message_ids[cohort_id] = []
+            topics[cohort_id] = ""
+            proposers[cohort_id] = ""  # Initialize proposer
+            logger.info(f"Cohort formed: {cohort_id} with agents {cohort_agent_ids}")
     return cohort_responses
 
 # Endpoint to select a topic proposer for a cohort
 @app.post("/select_proposer", response_model=ProposerResponse)
 def select_proposer(request: ProposerSelectionRequest):
+    return _select_proposer(request)
+
+# Endpoint to select topic proposers for many cohorts in one request
+@app.post("/select_proposers", response_model=List[ProposerResponse])
+def select_proposers(requests: List[ProposerSelectionRequest]):
+    return [_select_proposer(request) for request in requests if request.cohort_id in cohorts]
+
+def _select_proposer(request: ProposerSelectionRequest) -> ProposerResponse:
     cohort_id = request.cohort_id
     agent_ids = request.agent_ids
     if cohort_id not in cohorts:
@@ -127,30 +166,118 @@ def get_topic(cohort_id: str):
         raise HTTPException(status_code=404, detail="Topic not set for this cohort")
     return GetTopicResponse(cohort_id=cohort_id, topic=topic)
 
+# Endpoint to get the topics of many cohorts in one request, cohorts without a topic are omitted
+@app.post("/get_topics", response_model=List[GetTopicResponse])
+def get_topics(request: TopicsRequest):
+    return [
+        GetTopicResponse(cohort_id=cohort_id, topic=topics[cohort_id])
+        for cohort_id in request.cohort_ids
+        if topics.get(cohort_id)
+    ]
+
 # Endpoint for agents to post messages
 @app.post("/post_message")
 def post_message(message: Message):
+    message_id = _store_message(message)
+    return {"message": "Message posted", "id": message_id}
+
+# Endpoint to post many messages in one request, each message succeeds or fails on its own
+@app.post("/post_messages", response_model=List[PostMessageResult])
+def post_messages(batch: List[Message]):
+    results = []
+    for message in batch:
+        try:
+            results.append(PostMessageResult(id=_store_message(message)))
+        except HTTPException as e:
+            results.append(PostMessageResult(error=e.detail))
+    logger.debug(f"Batch of {len(batch)} messages posted")
+    return results
+
+def _store_message(message: Message) -> int:
     cohort_id = message.cohort_id
     if cohort_id not in cohorts:
         raise HTTPException(status_code=404, detail="Cohort not found")
     if message.agent_id not in cohorts[cohort_id]:
         raise HTTPException(status_code=403, detail="Agent not part of this cohort")
-    message_entry = {
-        "agent_id": message.agent_id,
-        "content": message.content,
-        "round_num": message.round_num,
-        "sub_round_num": message.sub_round_num,
-    }
-    messages[cohort_id].append(message_entry)
+    with message_lock:
+        message_entry = {
+            "id": next(message_counter),
+            "agent_id": message.agent_id,
+            "content": message.content,
+            "round_num": message.round_num,
+            "sub_round_num": message.sub_round_num,
+        }
+        position = len(messages[cohort_id])
+        messages[cohort_id].append(message_entry)
+        message_ids[cohort_id].append(message_entry["id"])
+        agent_message_index.setdefault((cohort_id, message.agent_id), []).append(position)
+        round_message_index.setdefault((cohort_id, message.round_num), []).append(position)
     logger.debug(f"Message from {message.agent_id} in {cohort_id}: {message.content}")
-    return {"message": "Message posted"}
+    return message_entry["id"]
+
+def query_messages(
+    cohort_id: str,
+    since_id: Optional[int] = None,
+    agent_id: Optional[str] = None,
+    round_num: Optional[int] = None,
+    limit: Optional[int] = None
+) -> GetMessagesResponse:
+    """
+    Return the messages of a cohort with id > since_id, optionally filtered by
+    agent and/or round, using the per-agent and per-round position indexes.
+    """
+    with message_lock:
+        if cohort_id not in messages:
+            raise HTTPException(status_code=404, detail="No messages for this cohort")
+        cohort_messages = messages[cohort_id]
+        ids = message_ids[cohort_id]
+
+        if agent_id is not None:
+            positions = agent_message_index.get((cohort_id, agent_id), [])
+        elif round_num is not None:
+            positions = round_message_index.get((cohort_id, round_num), [])
+        else:
+            positions = None
 
-# Endpoint to get messages for a cohort
+        if positions is None:
+            start = bisect_right(ids, since_id) if since_id is not None else 0
+            selected = cohort_messages[start:]
+        else:
+            start = bisect_right(positions, since_id, key=lambda p: ids[p]) if since_id is not None else 0
+            selected = [cohort_messages[p] for p in positions[start:]]
+            if agent_id is not None and round_num is not None:
+                selected = [m for m in selected if m["round_num"] == round_num]
+
+    has_more = limit is not None and len(selected) > limit
+    if has_more:
+        selected = selected[:limit]
+    next_since_id = selected[-1]["id"] if selected else since_id
+    return GetMessagesResponse(
+        cohort_id=cohort_id,
+        messages=selected,
+        next_since_id=next_since_id,
+        has_more=has_more
+    )
+
+# Endpoint to get messages for a cohort, optionally only those after a cursor
 @app.get("/get_messages/{cohort_id}", response_model=GetMessagesResponse)
-def get_messages(cohort_id: str):
-    if cohort_id not in messages:
-        raise HTTPException(status_code=404, detail="No messages for this cohort")
-    return GetMessagesResponse(cohort_id=cohort_id, messages=messages[cohort_id])
+def get_messages(
+    cohort_id: str,
+    since_id: Optional[int] = None,
+    agent_id: Optional[str] = None,
+    round_num: Optional[int] = None,
+    limit: Optional[int] = None
+):
+    return query_messages(cohort_id, since_id, agent_id, round_num, limit)
+
+# Endpoint to get the new messages of many cohorts in one request
+@app.post("/get_messages_bulk", response_model=List[GetMessagesResponse])
+def get_messages_bulk(request: MessagesFeedRequest):
+    return [
+        query_messages(cohort_id, since_id, request.agent_id, request.round_num, request.limit)
+        for cohort_id, since_id in request.cursors.items()
+        if cohort_id in messages
+    ]
 
 # Endpoint to get agents in a cohort
 @app.get("/get_cohort_agents/{cohort_id}")
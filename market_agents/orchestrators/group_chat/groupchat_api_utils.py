@@ -6,23 +6,38 @@ import logging
 from typing import Any, Dict, List, Tuple, Optional
 
 class GroupChatAPIUtils:
-    def __init__(self, api_url: str, logger: logging.Logger):
+    def __init__(self, api_url: str, logger: logging.Logger, max_connections: int = 100):
         self.api_url = api_url
         self.logger = logger
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
         self.logger.info(f"Initializing GroupChat API Utils with URL: {api_url}")  # Add this line
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     async def check_api_health(self) -> bool:
         """Check if the GroupChat API is healthy."""
         try:
             self.logger.info(f"Checking GroupChat API health at {self.api_url}/health")  # Add this line
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.api_url}/health", timeout=5) as resp:  # Add timeout
-                    if resp.status == 200:
-                        self.logger.info("GroupChat API is healthy")
-                        return True
-                    else:
-                        self.logger.error(f"GroupChat API health check failed: {resp.status}")
-                        return False
+            session = await self._get_session()
+            async with session.get(f"{self.api_url}/health", timeout=5) as resp:  # Add timeout
+                if resp.status == 200:
+                    self.logger.info("GroupChat API is healthy")
+                    return True
+                else:
+                    self.logger.error(f"GroupChat API health check failed: {resp.status}")
+                    return False
         except aiohttp.ClientError as e:
             self.logger.error(f"Connection error to GroupChat API: {e}")
             return False
@@ -32,17 +47,17 @@ class GroupChatAPIUtils:
 
     async def register_agents(self, agents: List[Any]) -> None:
         """Register multiple agents with the GroupChat API."""
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for agent in agents:
-                payload = {"id": agent.id, "index": agent.index}
-                tasks.append(self._register_agent(session, payload))
-            results = await asyncio.gather(*tasks)
-            for success, agent_id in results:
-                if success:
-                    self.logger.info(f"Registered agent {agent_id}")
-                else:
-                    self.logger.error(f"Failed to register agent {agent_id}")
+        session = await self._get_session()
+        tasks = []
+        for agent in agents:
+            payload = {"id": agent.id, "index": agent.index}
+            tasks.append(self._register_agent(session, payload))
+        results = await asyncio.gather(*tasks)
+        for success, agent_id in results:
+            if success:
+                self.logger.info(f"Registered agent {agent_id}")
+            else:
+                self.logger.error(f"Failed to register agent {agent_id}")
 
     async def _register_agent(self, session: aiohttp.ClientSession, payload: Dict[str, Any]) -> Tuple[bool, str]:
         """Helper method to register a single agent."""
@@ -60,39 +75,57 @@ class GroupChatAPIUtils:
     async def form_cohorts(self, agent_ids: List[str], cohort_size: int) -> List[Dict[str, Any]]:
         """Form cohorts using the GroupChat API."""
         payload = {"agent_ids": agent_ids, "cohort_size": cohort_size}
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(f"{self.api_url}/form_cohorts", json=payload) as resp:
-                    if resp.status == 200:
-                        cohorts_info = await resp.json()
-                        self.logger.info(f"Cohorts formed: {[cohort['cohort_id'] for cohort in cohorts_info]}")
-                        return cohorts_info
-                    else:
-                        error_detail = await resp.text()
-                        self.logger.error(f"Failed to form cohorts: {resp.status}, {error_detail}")
-                        raise Exception("Failed to form cohorts")
-            except Exception as e:
-                self.logger.error(f"Exception while forming cohorts: {e}")
-                raise
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/form_cohorts", json=payload) as resp:
+                if resp.status == 200:
+                    cohorts_info = await resp.json()
+                    self.logger.info(f"Cohorts formed: {[cohort['cohort_id'] for cohort in cohorts_info]}")
+                    return cohorts_info
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to form cohorts: {resp.status}, {error_detail}")
+                    raise Exception("Failed to form cohorts")
+        except Exception as e:
+            self.logger.error(f"Exception while forming cohorts: {e}")
+            raise
 
     async def select_proposer(self, cohort_id: str, agent_ids: List[str]) -> Optional[str]:
         """Select a topic proposer for a cohort."""
         payload = {"cohort_id": cohort_id, "agent_ids": agent_ids}
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(f"{self.api_url}/select_proposer", json=payload) as resp:
-                    if resp.status == 200:
-                        proposer_info = await resp.json()
-                        proposer_id = proposer_info.get('proposer_id')
-                        self.logger.info(f"Selected proposer {proposer_id} for cohort {cohort_id}")
-                        return proposer_id
-                    else:
-                        error_detail = await resp.text()
-                        self.logger.error(f"Failed to select proposer for cohort {cohort_id}: {resp.status}, {error_detail}")
-                        return None
-            except Exception as e:
-                self.logger.error(f"Exception while selecting proposer for cohort {cohort_id}: {e}")
-                return None
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/select_proposer", json=payload) as resp:
+                if resp.status == 200:
+                    proposer_info = await resp.json()
+                    proposer_id = proposer_info.get('proposer_id')
+                    self.logger.info(f"Selected proposer {proposer_id} for cohort {cohort_id}")
+                    return proposer_id
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to select proposer for cohort {cohort_id}: {resp.status}, {error_detail}")
+                    return None
+        except Exception as e:
+            self.logger.error(f"Exception while selecting proposer for cohort {cohort_id}: {e}")
+            return None
+
+    async def select_proposers(self, cohorts: Dict[str, List[str]]) -> Dict[str, str]:
+        """Select topic proposers for many cohorts in one request. Returns cohort_id -> proposer_id."""
+        payload = [{"cohort_id": cohort_id, "agent_ids": agent_ids} for cohort_id, agent_ids in cohorts.items()]
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/select_proposers", json=payload) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    self.logger.info(f"Selected proposers for {len(data)} cohorts")
+                    return {item['cohort_id']: item['proposer_id'] for item in data}
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to select proposers: {resp.status}, {error_detail}")
+                    return {}
+        except Exception as e:
+            self.logger.error(f"Exception while selecting proposers: {e}")
+            return {}
 
     async def propose_topic(self, agent_id: str, cohort_id: str, topic: str, round_num: int) -> bool:
         """Submit a topic proposal for a cohort."""
@@ -102,55 +135,87 @@ class GroupChatAPIUtils:
             "topic": topic,
             "round_num": round_num
         }
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(f"{self.api_url}/propose_topic", json=payload) as resp:
-                    if resp.status == 200:
-                        self.logger.info(f"Topic proposed by agent {agent_id} for cohort {cohort_id}")
-                        return True
-                    else:
-                        error_detail = await resp.text()
-                        self.logger.error(f"Failed to propose topic for cohort {cohort_id}: {resp.status}, {error_detail}")
-                        return False
-            except Exception as e:
-                self.logger.error(f"Exception while proposing topic for cohort {cohort_id}: {e}")
-                return False
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/propose_topic", json=payload) as resp:
+                if resp.status == 200:
+                    self.logger.info(f"Topic proposed by agent {agent_id} for cohort {cohort_id}")
+                    return True
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to propose topic for cohort {cohort_id}: {resp.status}, {error_detail}")
+                    return False
+        except Exception as e:
+            self.logger.error(f"Exception while proposing topic for cohort {cohort_id}: {e}")
+            return False
 
     async def get_topic(self, cohort_id: str) -> Optional[str]:
         """Retrieve the current topic for a cohort."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{self.api_url}/get_topic/{cohort_id}") as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        topic = data.get('topic', '')
-                        self.logger.debug(f"Retrieved topic for cohort {cohort_id}: {topic}")
-                        return topic
-                    else:
-                        error_detail = await resp.text()
-                        self.logger.error(f"Failed to get topic for cohort {cohort_id}: {resp.status}, {error_detail}")
-                        return None
-            except Exception as e:
-                self.logger.error(f"Exception while getting topic for cohort {cohort_id}: {e}")
-                return None
-
-    async def get_messages(self, cohort_id: str) -> List[Dict[str, Any]]:
-        """Retrieve messages for a cohort."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{self.api_url}/get_messages/{cohort_id}") as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        messages = data.get('messages', [])
-                        self.logger.info(f"Retrieved messages for cohort {cohort_id}")
-                        return messages
-                    else:
-                        error_detail = await resp.text()
-                        self.logger.error(f"Failed to get messages for cohort {cohort_id}: {resp.status}, {error_detail}")
-                        return []
-            except Exception as e:
-                self.logger.error(f"Exception while getting messages for cohort {cohort_id}: {e}")
-                return []
+        session = await self._get_session()
+        try:
+            async with session.get(f"{self.api_url}/get_topic/{cohort_id}") as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    topic = data.get('topic', '')
+                    self.logger.debug(f"Retrieved topic for cohort {cohort_id}: {topic}")
+                    return topic
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to get topic for cohort {cohort_id}: {resp.status}, {error_detail}")
+                    return None
+        except Exception as e:
+            self.logger.error(f"Exception while getting topic for cohort {cohort_id}: {e}")
+            return None
+
+    async def get_topics(self, cohort_ids: List[str]) -> Dict[str, str]:
+        """Retrieve the current topics of many cohorts in one request. Cohorts without a topic are omitted."""
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/get_topics", json={"cohort_ids": cohort_ids}) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    self.logger.debug(f"Retrieved topics for {len(data)} cohorts")
+                    return {item['cohort_id']: item['topic'] for item in data}
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to get topics: {resp.status}, {error_detail}")
+                    return {}
+        except Exception as e:
+            self.logger.error(f"Exception while getting topics: {e}")
+            return {}
+
+    async def get_messages(
+        self,
+        cohort_id: str,
+        since_id: Optional[int] = None,
+        agent_id: Optional[str] = None,
+        round_num: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve messages for a cohort, optionally only those after `since_id` and matching the filters."""
+        params = {
+            key: value for key, value in {
+                "since_id": since_id,
+                "agent_id": agent_id,
+                "round_num": round_num,
+                "limit": limit
+            }.items() if value is not None
+        }
+        session = await self._get_session()
+        try:
+            async with session.get(f"{self.api_url}/get_messages/{cohort_id}", params=params) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    messages = data.get('messages', [])
+                    self.logger.info(f"Retrieved messages for cohort {cohort_id}")
+                    return messages
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to get messages for cohort {cohort_id}: {resp.status}, {error_detail}")
+                    return []
+        except Exception as e:
+            self.logger.error(f"Exception while getting messages for cohort {cohort_id}: {e}")
+            return []
 
     async def post_message(self, agent_id: str, cohort_id: str, content: str, round_num: int, sub_round_num: int) -> bool:
         """Post a message to a cohort."""
@@ -161,16 +226,78 @@ class GroupChatAPIUtils:
             "round_num": round_num,
             "sub_round_num": sub_round_num
         }
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(f"{self.api_url}/post_message", json=payload) as resp:
-                    if resp.status == 200:
-                        self.logger.info(f"Message posted by agent {agent_id} in cohort {cohort_id}")
-                        return True
-                    else:
-                        error_detail = await resp.text()
-                        self.logger.error(f"Failed to post message for cohort {cohort_id}: {resp.status}, {error_detail}")
-                        return False
-            except Exception as e:
-                self.logger.error(f"Exception while posting message for cohort {cohort_id}: {e}")
-                return False
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/post_message", json=payload) as resp:
+                if resp.status == 200:
+                    self.logger.info(f"Message posted by agent {agent_id} in cohort {cohort_id}")
+                    return True
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to post message for cohort {cohort_id}: {resp.status}, {error_detail}")
+                    return False
+        except Exception as e:
+            self.logger.error(f"Exception while posting message for cohort {cohort_id}: {e}")
+            return False
+
+    async def post_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Post many messages (possibly across cohorts) in one request.
+
+        Each message has the same fields as `post_message`. Returns the
+        number of messages accepted; rejected ones are logged.
+        """
+        if not messages:
+            return 0
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/post_messages", json=messages) as resp:
+                if resp.status == 200:
+                    results = await resp.json()
+                    posted = 0
+                    for message, result in zip(messages, results):
+                        if result.get('id') is not None:
+                            posted += 1
+                        else:
+                            self.logger.error(
+                                f"Failed to post message for agent {message['agent_id']} "
+                                f"in cohort {message['cohort_id']}: {result.get('error')}"
+                            )
+                    self.logger.info(f"Posted {posted}/{len(messages)} messages")
+                    return posted
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to post messages: {resp.status}, {error_detail}")
+                    return 0
+        except Exception as e:
+            self.logger.error(f"Exception while posting messages: {e}")
+            return 0
+
+    async def get_messages_bulk(
+        self,
+        cursors: Dict[str, Optional[int]],
+        agent_id: Optional[str] = None,
+        round_num: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieve the new messages of many cohorts in one request.
+
+        `cursors` maps cohort_id to the last message id already seen (None for
+        all). Returns cohort_id -> {"messages", "next_since_id", "has_more"}.
+        """
+        payload = {"cursors": cursors, "agent_id": agent_id, "round_num": round_num, "limit": limit}
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.api_url}/get_messages_bulk", json=payload) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    self.logger.info(f"Retrieved message deltas for {len(data)} cohorts")
+                    return {feed['cohort_id']: feed for feed in data}
+                else:
+                    error_detail = await resp.text()
+                    self.logger.error(f"Failed to get message deltas: {resp.status}, {error_detail}")
+                    return {}
+        except Exception as e:
+            self.logger.error(f"Exception while getting message deltas: {e}")
+            return {}
@@ -2,13 +2,14 @@
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from datetime import datetime
 import uuid
 from market_agents.environments.environment import MultiAgentEnvironment
 from market_agents.agents.market_agent import MarketAgent
 from market_agents.environments.mechanisms.group_chat import GroupChat, GroupChatActionSpace, GroupChatObservationSpace
 from market_agents.orchestrators.config import GroupChatConfig, OrchestratorConfig
+from market_agents.orchestrators.data_writer import persist
 from market_agents.orchestrators.logger_utils import (
     log_perception,
     log_persona,
@@ -22,7 +23,7 @@ from market_agents.orchestrators.logger_utils import (
 from market_agents.orchestrators.insert_simulation_data import SimulationDataInserter
 
 from market_agents.orchestrators.group_chat.groupchat_api_utils import GroupChatAPIUtils
-from market_agents.orchestrators.agent_cognitive import AgentCognitiveProcessor
+from market_agents.orchestrators.agent_cognitive import AgentCognitiveProcessor, BatchSlot
 
 
 class GroupChatOrchestrator:
@@ -49,6 +50,10 @@ class GroupChatOrchestrator:
         self.data_inserter = data_inserter
         self.logger = logger or logging.getLogger(__name__)
 
+        # Agent state touched per round, see BaseEnvironmentOrchestrator
+        self.state_reads = {'perception', 'memory', 'cohort'}
+        self.state_writes = {'perception', 'action', 'observation', 'memory', 'interactions'}
+
         # Initialize API utils
         self.api_utils = GroupChatAPIUtils(self.config.groupchat_api_url, self.logger)
 
@@ -70,6 +75,14 @@ class GroupChatOrchestrator:
         # Sub-rounds per round
         self.sub_rounds_per_round = config.sub_rounds
 
+        # Message feed: last message id seen per cohort and latest message per agent
+        self.message_cursors: Dict[str, Optional[int]] = {}
+        self.latest_agent_messages: Dict[str, Dict[str, Any]] = {}
+
+    def agent_scope(self) -> Set[str]:
+        """Ids of the agents this environment touches."""
+        return {str(agent.id) for agent in self.agents}
+
     async def setup_environment(self):
         """
         Sets up the environment by checking API health, registering agents,
@@ -106,7 +119,8 @@ class GroupChatOrchestrator:
                 max_steps=self.config.max_rounds,
                 action_space=GroupChatActionSpace(),
                 observation_space=GroupChatObservationSpace(),
-                mechanism=group_chat
+                mechanism=group_chat,
+                prompt_window_rounds=self.config.prompt_window_rounds
             )
 
             # Assign environment and cohort_id to agents
@@ -161,6 +175,11 @@ class GroupChatOrchestrator:
         # Run sub-rounds
         for sub_round in range(1, self.sub_rounds_per_round + 1):
             log_sub_round_start(self.logger, 'All Cohorts', sub_round)
+            # Pull only the messages posted since the last sub-round, for all cohorts at once
+            await self.sync_messages()
+            cohort_topics = await self.api_utils.get_topics(list(self.cohorts.keys()))
+            # All cohorts' action prompts go out as one inference batch
+            batcher = self.cognitive_processor.batcher()
             # For each cohort, run the sub-round
             tasks = []
             for cohort_id, cohort_agents in self.cohorts.items():
@@ -169,11 +188,15 @@ class GroupChatOrchestrator:
                         cohort_id=cohort_id,
                         round_num=round_num,
                         sub_round_num=sub_round,
-                        cohort_agents=cohort_agents
+                        cohort_agents=cohort_agents,
+                        topic=cohort_topics.get(cohort_id),
+                        slot=batcher.join()
                     )
                 )
                 tasks.append(task)
-            await asyncio.gather(*tasks)
+            cohort_messages = await asyncio.gather(*tasks)
+            # Post every cohort's messages in a single batch
+            await self.api_utils.post_messages([message for messages in cohort_messages for message in messages])
 
         # Run reflection
         log_section(self.logger, "AGENT REFLECTIONS")
@@ -185,19 +208,28 @@ class GroupChatOrchestrator:
         round_summary = await self.get_round_summary(round_num)
         self.round_summaries.append(round_summary)
 
+    async def sync_messages(self):
+        """
+        Fetches the message deltas of all cohorts in one request and keeps
+        the latest message of every agent.
+        """
+        cursors = {cohort_id: self.message_cursors.get(cohort_id) for cohort_id in self.cohorts}
+        feeds = await self.api_utils.get_messages_bulk(cursors)
+        for cohort_id, feed in feeds.items():
+            for message in feed.get('messages', []):
+                self.latest_agent_messages[message['agent_id']] = message
+            self.message_cursors[cohort_id] = feed.get('next_since_id')
+
     async def select_topic_proposers(self):
         """
-        Selects topic proposers for each cohort using the API.
+        Selects topic proposers for all cohorts with a single API request.
         """
-        tasks = []
-        for cohort_id, cohort_agents in self.cohorts.items():
-            agent_ids = [agent.id for agent in cohort_agents]
-            task = asyncio.create_task(
-                self.api_utils.select_proposer(cohort_id, agent_ids)
-            )
-            tasks.append(task)
-        results = await asyncio.gather(*tasks)
-        for cohort_id, proposer_id in zip(self.cohorts.keys(), results):
+        proposers = await self.api_utils.select_proposers({
+            cohort_id: [agent.id for agent in cohort_agents]
+            for cohort_id, cohort_agents in self.cohorts.items()
+        })
+        for cohort_id in self.cohorts:
+            proposer_id = proposers.get(cohort_id)
             if proposer_id:
                 self.topic_proposers[cohort_id] = proposer_id
                 self.logger.info(f"Selected proposer {proposer_id} for cohort {cohort_id}")
@@ -231,8 +263,8 @@ class GroupChatOrchestrator:
             proposer_prompts.append(prompt)
 
         # Run prompts in parallel
-        proposals = await self.ai_utils.run_parallel_ai_completion(proposer_prompts, update_history=False)
-        self.data_inserter.insert_ai_requests(self.ai_utils.get_all_requests())
+        proposals = await self.ai_utils.run_parallel_ai_completion(proposer_prompts, update_history=True)
+        await persist(self.data_inserter, 'insert_ai_requests', self.ai_utils.get_all_requests())
 
         tasks = []
         for (cohort_id, proposer_agent), proposal in zip(proposer_agents, proposals):
@@ -281,8 +313,10 @@ class GroupChatOrchestrator:
         cohort_id: str,
         round_num: int,
         sub_round_num: int,
-        cohort_agents: List[MarketAgent]
-    ):
+        cohort_agents: List[MarketAgent],
+        topic: Optional[str] = None,
+        slot: Optional[BatchSlot] = None
+    ) -> List[Dict[str, Any]]:
         """
         Runs a single sub-round for a cohort.
 
@@ -291,26 +325,31 @@ class GroupChatOrchestrator:
             round_num (int): The current round number.
             sub_round_num (int): The current sub-round number.
             cohort_agents (List[MarketAgent]): The agents in the cohort.
+            topic (str, optional): The cohort topic, fetched from the API if not given.
+            slot (BatchSlot, optional): Slot in the sub-round's shared action batch.
+
+        Returns:
+            List[Dict[str, Any]]: The messages to post to the API, batched by run_round.
         """
+        api_messages = []
         # First try block for cognitive processes
         try:
-            # Get topic and messages from API
-            topic = await self.api_utils.get_topic(cohort_id)
-            messages = await self.api_utils.get_messages(cohort_id)
+            # Messages are synced for all cohorts by run_round
+            if topic is None:
+                topic = await self.api_utils.get_topic(cohort_id)
 
             if not topic:
                 self.logger.warning(f"No topic found for cohort {cohort_id}")
-                return
+                return api_messages
 
             # Get the cohort's environment mechanism and update topic
             environment = cohort_agents[0].environments['group_chat']
             environment.mechanism._update_topic(topic, round_num)
 
             for agent in cohort_agents:
-                # Filter messages to only include this agent's messages
-                agent_messages = [msg for msg in messages if msg.get('agent_id') == agent.id]
+                # Latest message posted by this agent
                 agent.last_observation = {
-                    'messages': agent_messages[-1] if agent_messages else None
+                    'messages': self.latest_agent_messages.get(agent.id)
                 }
 
         #    # Agents perceive the messages
@@ -326,31 +365,30 @@ class GroupChatOrchestrator:
         #        agent.last_perception = perception.json_object.object if perception.json_object else perception.str_content
 
             # Agents generate actions (messages)
-            actions = await self.cognitive_processor.run_parallel_action(cohort_agents, self.config.name)
+            actions = await self.cognitive_processor.run_parallel_action(cohort_agents, self.config.name, slot=slot)
 
         except Exception:
-            return
+            return api_messages
+        finally:
+            # Cohorts that return early must not hold up the shared batch
+            if slot is not None:
+                slot.leave()
 
         # Second try block for data insertion
         try:
             # Prepare messages for both API posting and database insertion
             messages_to_insert = []
-            api_tasks = []
 
             for agent, action in zip(cohort_agents, actions):
                 content = self.extract_message_content(action)
                 if content:
-                    # Prepare API task
-                    api_task = asyncio.create_task(
-                        self.api_utils.post_message(
-                            agent_id=agent.id,
-                            cohort_id=cohort_id,
-                            content=content,
-                            round_num=round_num,
-                            sub_round_num=sub_round_num
-                        )
-                    )
-                    api_tasks.append(api_task)
+                    api_messages.append({
+                        'agent_id': agent.id,
+                        'cohort_id': cohort_id,
+                        'content': content,
+                        'round_num': round_num,
+                        'sub_round_num': sub_round_num
+                    })
 
                     messages_to_insert.append({
                         'message_id': str(uuid.uuid4()),
@@ -369,28 +407,18 @@ class GroupChatOrchestrator:
                 else:
                     self.logger.warning(f"Failed to extract message content for agent {agent.id}")
 
-            # Execute API posts in parallel
-            await asyncio.gather(*api_tasks)
-            agents_data = [
-                {
-                    'id': str(agent.id),
-                    'role': agent.role,
-                    'is_llm': agent.use_llm,
-                    'max_iter': self.config.max_rounds,
-                    'llm_config': agent.llm_config if isinstance(agent.llm_config, dict) else agent.llm_config.dict()
-                }
-                for agent in cohort_agents
-            ]
-            
-            # Get agent ID mappings
-            agent_id_map = self.data_inserter.insert_agents(agents_data)
+            # Get agent ID mappings; agents registered at simulation start are not rewritten
+            agents_data = self.data_inserter.build_agents_data(cohort_agents, self.orchestrator_config.max_rounds)
+            agent_id_map = await persist(self.data_inserter, 'insert_agents', agents_data)
             # Insert messages into database
             if messages_to_insert:
-                self.data_inserter.insert_groupchat_messages(messages_to_insert, round_num, agent_id_map)
+                await persist(self.data_inserter, 'insert_groupchat_messages', messages_to_insert, round_num, agent_id_map)
 
         except Exception as e:
             self.logger.warning(f"Error during data insertion in sub-round {sub_round_num} for cohort {cohort_id}: {e}")
 
+        return api_messages
+
     def extract_message_content(self, action) -> Optional[str]:
         """
         Extracts the message content from the action.
@@ -429,7 +457,9 @@ class GroupChatOrchestrator:
                 cohort_env_name = f"group_chat_{cohort_id}"
                 environment = cohort_agents[0].environments['group_chat']
                 
-                self.data_inserter.insert_round_data(
+                await persist(
+                    self.data_inserter,
+                    'insert_round_data',
                     round_num=round_num,
                     agents=cohort_agents,
                     environment=environment,
@@ -465,6 +495,10 @@ class GroupChatOrchestrator:
         }
         return summary
 
+    async def close(self):
+        """Release the API client session"""
+        await self.api_utils.close()
+
     def print_summary(self):
         """Print a summary of the simulation results"""
         log_section(self.logger, "GROUP CHAT SIMULATION SUMMARY")
@@ -2,14 +2,24 @@ import psycopg2
 import psycopg2.extras
 import os
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from contextlib import contextmanager
 from psycopg2.extensions import register_adapter, AsIs
+import hashlib
 import json
 import logging
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from market_agents.economics.econ_models import Bid, BuyerPreferenceSchedule, SellerPreferenceSchedule
-from market_agents.agents.db.setup_database import create_database, create_tables
+from market_agents.agents.db.db_pool import get_connection_pool
+from market_agents.agents.db.setup_database import create_database, create_run, create_tables, finish_run
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 def json_serial(obj):
     """JSON serializer for objects not serializable by default json code"""
@@ -51,25 +61,227 @@ def validate_json(data):
     return None
 
 class SimulationDataInserter:
-    def __init__(self, db_params):
+    def __init__(
+        self,
+        db_params,
+        page_size: int = 1000,
+        pool_size: int = 4,
+        dedupe_prompts: bool = True,
+        compress_responses: bool = False,
+        blob_cache_size: int = 100000
+    ):
         create_database(db_params)
         
-        # Connect to the database
-        self.conn = psycopg2.connect(**db_params)
-        self.cursor = self.conn.cursor()
+        # Each thread using the inserter gets its own connection from the shared pool
+        self.pool = get_connection_pool(db_params, maxconn=pool_size)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Last agents row written per agent id, so unchanged agents are never re-upserted
+        self._agent_rows: Dict[str, tuple] = {}
+        self._agent_rows_lock = threading.Lock()
+        # Rows sent per multi-row INSERT statement
+        self.page_size = page_size
+        # Store request prompts as shared prompt_blobs segments instead of full copies
+        self.dedupe_prompts = dedupe_prompts
+        if compress_responses and zstandard is None:
+            logging.warning("zstandard is not installed; raw responses will be stored uncompressed")
+            compress_responses = False
+        self.compress_responses = compress_responses
+        # Content hash -> prompt_blobs id of recently stored segments (LRU)
+        self._blob_ids: "OrderedDict[bytes, int]" = OrderedDict()
+        self._blob_cache_size = blob_cache_size
+        self._blob_ids_lock = threading.Lock()
+        # Run and round stamped on rows that do not carry their own round.
+        # Run 0 is the default partition, used until `start_run` is called.
+        self.run_id = 0
+        self.current_round = 0
         
         create_tables(db_params)
 
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn.closed:
+            conn = self.pool.getconn()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @property
+    def _in_transaction(self) -> bool:
+        return getattr(self._local, 'in_transaction', False)
+
+    @_in_transaction.setter
+    def _in_transaction(self, value: bool):
+        self._local.in_transaction = value
+
+    def release_connection(self):
+        """Return the calling thread's connection to the pool."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        if not self.pool.closed:
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    def close(self):
+        """Return the connections borrowed by the inserter to the pool."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            if not self.pool.closed:
+                self.pool.putconn(conn, close=bool(conn.closed))
+        self._local = threading.local()
+
     def __del__(self):
-        if hasattr(self, 'cursor') and self.cursor:
-            self.cursor.close()
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+        if hasattr(self, '_connections') and hasattr(self, 'pool'):
+            self.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several inserts into a single transaction.
+
+        Inside the block the insert_* methods do not commit or roll back on
+        their own; everything is committed on exit, or rolled back together
+        if any insert fails. Nested blocks join the outer transaction.
+        """
+        if self._in_transaction:
+            yield
+            return
+        self._in_transaction = True
+        self._local.on_commit = []
+        try:
+            yield
+            self.conn.commit()
+            for callback in self._local.on_commit:
+                callback()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+            self._local.on_commit = []
+
+    def _commit(self):
+        if not self._in_transaction:
+            self.conn.commit()
+
+    def _after_commit(self, callback):
+        """Run `callback` once the current write is committed, i.e. now outside a transaction."""
+        if self._in_transaction:
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def _rollback(self):
+        if not self._in_transaction:
+            self.conn.rollback()
+
+    def start_run(self, name: str, config: Any = None, max_rounds: int = 0, rounds_per_partition: int = 100) -> int:
+        """Register a new run and create its table partitions; later rows are written to it."""
+        with self.transaction():
+            with self.conn.cursor() as cur:
+                self.run_id = create_run(cur, name, config, max_rounds, rounds_per_partition)
+        self.current_round = 0
+        logging.info(f"Started simulation run {self.run_id}")
+        return self.run_id
+
+    def set_round(self, round_num: int):
+        self.current_round = round_num
+
+    def finish_run(self):
+        if not self.run_id:
+            return
+        with self.transaction():
+            with self.conn.cursor() as cur:
+                finish_run(cur, self.run_id)
+        logging.info(f"Finished simulation run {self.run_id}")
+
+    def _round(self, item: Dict[str, Any]) -> int:
+        return item.get('round', self.current_round)
+
+    def _execute_values(self, cur, query: str, rows: List[tuple], fetch: bool = False):
+        """Send `rows` as multi-row INSERTs of `page_size` rows instead of one round-trip per row."""
+        if not rows:
+            return []
+        return psycopg2.extras.execute_values(cur, query, rows, page_size=self.page_size, fetch=fetch)
+
+    def _map_agent_rows(self, items: List[Dict[str, Any]], key: str, agent_id_map: Dict[str, uuid.UUID],
+                        build_row) -> List[tuple]:
+        """Resolve `item[key]` through `agent_id_map` and build one row per mapped item."""
+        rows = []
+        for item in items:
+            agent_id = agent_id_map.get(str(item[key]))
+            if agent_id is None:
+                logging.error(f"No matching UUID found for {key}: {item[key]}")
+                continue
+            rows.append(build_row(agent_id, item))
+        return rows
+
+    def _build_agent_rows(self, agents_data) -> Tuple[Dict[str, tuple], Dict[str, str]]:
+        """One agents row per distinct agent, keyed by canonical UUID string, plus canonical id -> caller id."""
+        # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement
+        rows = {}
+        keys = {}
+        for agent in agents_data:
+            try:
+                agent_id = uuid.UUID(str(agent['id'])) if isinstance(agent['id'], (str, int)) else agent['id']
+            except ValueError as e:
+                logging.error(f"Error inserting agent: {str(e)}")
+                continue
+            rows[str(agent_id)] = (
+                agent_id,
+                agent['role'],
+                agent['is_llm'],
+                agent['max_iter'],
+                json.dumps(agent['llm_config'], sort_keys=True)
+            )
+            keys[str(agent_id)] = str(agent['id'])
+        return rows, keys
+
+    def _remember_agent_rows(self, rows: Dict[str, tuple]):
+        if rows:
+            with self._agent_rows_lock:
+                self._agent_rows.update(rows)
+
+    def changed_agents(self, agents_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The agents in `agents_data` that are new or differ from what was last written."""
+        rows, keys = self._build_agent_rows(agents_data)
+        with self._agent_rows_lock:
+            dirty = {keys[key] for key, row in rows.items() if self._agent_rows.get(key) != row}
+        return [agent for agent in agents_data if str(agent['id']) in dirty]
+
+    def build_agents_data(self, agents: List[Any], max_iter: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                'id': str(agent.id),
+                'role': agent.role,
+                'is_llm': agent.use_llm,
+                'max_iter': max_iter,
+                'llm_config': agent.llm_config if isinstance(agent.llm_config, dict) else agent.llm_config.dict()
+            }
+            for agent in agents
+        ]
+
+    def register_agents(self, agents: List[Any], max_iter: int) -> Dict[str, uuid.UUID]:
+        """
+        Upsert the whole population once, at simulation start.
+
+        Later `insert_agents` calls only write agents whose fields changed
+        (e.g. llm_config), so steady-state rounds issue no agents-table writes.
+        """
+        return self.insert_agents(self.build_agents_data(agents, max_iter))
 
     def insert_agents(self, agents_data):
         query = """
             INSERT INTO agents (id, role, is_llm, max_iter, llm_config)
-            VALUES (%s, %s, %s, %s, %s)
+            VALUES %s
             ON CONFLICT (id) DO UPDATE SET
                 role = EXCLUDED.role,
                 is_llm = EXCLUDED.is_llm,
@@ -77,100 +289,109 @@ class SimulationDataInserter:
                 llm_config = EXCLUDED.llm_config
             RETURNING id
         """
-        agent_id_map = {}
-        for agent in agents_data:
-            try:
-                agent_id = uuid.UUID(str(agent['id'])) if isinstance(agent['id'], (str, int)) else agent['id']
-                with self.conn.cursor() as cur:
-                    cur.execute(query, (
-                        agent_id,
-                        agent['role'],
-                        agent['is_llm'],
-                        agent['max_iter'],
-                        json.dumps(agent['llm_config'])
-                    ))
-                    inserted_id = cur.fetchone()
-                    if inserted_id:
-                        agent_id_map[str(agent['id'])] = inserted_id[0]
-                    else:
-                        logging.warning(f"No id returned for agent: {agent['id']}")
-                self.conn.commit()
-            except Exception as e:
-                logging.error(f"Error inserting agent: {str(e)}")
-                self.conn.rollback()
+        rows, keys = self._build_agent_rows(agents_data)
+        with self._agent_rows_lock:
+            dirty = {key: row for key, row in rows.items() if self._agent_rows.get(key) != row}
+        # Agents already written unchanged map straight to their stored id
+        agent_id_map = {keys[key]: row[0] for key, row in rows.items() if key not in dirty}
+        if not dirty:
+            return agent_id_map
+
+        try:
+            with self.conn.cursor() as cur:
+                inserted = self._execute_values(cur, query, list(dirty.values()), fetch=True)
+            self._commit()
+        except Exception as e:
+            logging.error(f"Error inserting agents: {str(e)}")
+            self._rollback()
+            if self._in_transaction:
+                raise
+            return agent_id_map
+
+        for (inserted_id,) in inserted:
+            agent_id_map[keys[str(inserted_id)]] = inserted_id
+        for key in keys.values():
+            if key not in agent_id_map:
+                logging.warning(f"No id returned for agent: {key}")
+
+        # Only trust the cache once the rows are committed
+        written = {key: row for key, row in dirty.items() if keys[key] in agent_id_map}
+        self._after_commit(lambda: self._remember_agent_rows(written))
         return agent_id_map
 
     def insert_agent_memories(self, memories: List[Dict[str, Any]]):
+        query = """
+        INSERT INTO agent_memories (run_id, round, agent_id, step_id, memory_data)
+        VALUES %s
+        """
+        rows = []
         for memory in memories:
-            try:
-                agent_id = uuid.UUID(str(memory['agent_id'])) if isinstance(memory['agent_id'], (str, int)) else memory['agent_id']
-                with self.conn.cursor() as cur:
-                    cur.execute("""
-                    INSERT INTO agent_memories (agent_id, step_id, memory_data)
-                    VALUES (%s, %s, %s)
-                    """, (agent_id, memory['step_id'], psycopg2.extras.Json(memory['memory_data'])))
-                self.conn.commit()
-            except Exception as e:
-                self.conn.rollback()
-                logging.error(f"Error inserting agent memory: {e}")
+            agent_id = uuid.UUID(str(memory['agent_id'])) if isinstance(memory['agent_id'], (str, int)) else memory['agent_id']
+            rows.append((
+                self.run_id, memory.get('round', memory['step_id']), agent_id, memory['step_id'],
+                psycopg2.extras.Json(memory['memory_data'])
+            ))
+        try:
+            with self.conn.cursor() as cur:
+                self._execute_values(cur, query, rows)
+            self._commit()
+        except Exception as e:
+            self._rollback()
+            logging.error(f"Error inserting agent memories: {e}")
+            if self._in_transaction:
+                raise
+            return
         logging.info(f"Inserted {len(memories)} agent memories into the database")
 
     def insert_groupchat_messages(self, messages: List[Dict[str, Any]], round_num: int, agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO groupchat (message_id, agent_id, round, sub_round, cohort_id, content, timestamp, topic)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO groupchat (run_id, message_id, agent_id, round, sub_round, cohort_id, content, timestamp, topic)
+        VALUES %s
         """
+        rows = self._map_agent_rows(messages, 'agent_id', agent_id_map, lambda agent_id, message: (
+            self.run_id,
+            message['message_id'],
+            agent_id,
+            round_num,
+            message['sub_round'],
+            message['cohort_id'],
+            message['content'],
+            message['timestamp'],
+            message.get('topic')
+        ))
         try:
             with self.conn.cursor() as cur:
-                for message in messages:
-                    # Get the mapped agent ID from the database
-                    agent_id = agent_id_map.get(str(message['agent_id']))
-                    if agent_id is None:
-                        logging.error(f"No matching UUID found for agent_id: {message['agent_id']}")
-                        continue
-
-                    cur.execute(query, (
-                        message['message_id'],
-                        agent_id,  # Use the mapped agent_id
-                        round_num,
-                        message['sub_round'],
-                        message['cohort_id'],
-                        message['content'],
-                        message['timestamp'],
-                        message.get('topic')
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(messages)} group chat messages")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} group chat messages")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting group chat messages: {str(e)}")
             raise
 
     def insert_allocations(self, allocations: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO allocations (agent_id, goods, cash, locked_goods, locked_cash, initial_goods, initial_cash)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO allocations (run_id, round, agent_id, goods, cash, locked_goods, locked_cash, initial_goods, initial_cash)
+        VALUES %s
         """
+        rows = self._map_agent_rows(allocations, 'agent_id', agent_id_map, lambda agent_id, allocation: (
+            self.run_id,
+            self._round(allocation),
+            agent_id,
+            allocation['goods'],
+            allocation['cash'],
+            allocation['locked_goods'],
+            allocation['locked_cash'],
+            allocation['initial_goods'],
+            allocation['initial_cash']
+        ))
         try:
             with self.conn.cursor() as cur:
-                for allocation in allocations:
-                    agent_id = agent_id_map.get(str(allocation['agent_id']))
-                    if agent_id is None:
-                        logging.error(f"No matching UUID found for agent_id: {allocation['agent_id']}")
-                        continue
-                    cur.execute(query, (
-                        agent_id,
-                        allocation['goods'],
-                        allocation['cash'],
-                        allocation['locked_goods'],
-                        allocation['locked_cash'],
-                        allocation['initial_goods'],
-                        allocation['initial_cash']
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(allocations)} allocations into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} allocations into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting allocations: {str(e)}")
             raise
     
@@ -188,261 +409,321 @@ class SimulationDataInserter:
         """
         query = """
         INSERT INTO preference_schedules (agent_id, is_buyer, values, costs, initial_endowment)
-        VALUES (%s, %s, %s, %s, %s)
+        VALUES %s
         """
         try:
+            rows = []
+            for schedule in schedules_data:
+                # Handle 'values' and 'costs' based on is_buyer
+                if schedule['is_buyer']:
+                    values_json = json.dumps(schedule['values'], default=json_serial) if schedule['values'] else None
+                    costs_json = None
+                else:
+                    values_json = None
+                    costs_json = json.dumps(schedule['costs'], default=json_serial) if schedule['costs'] else None
+
+                # Handle 'initial_endowment'
+                initial_endowment = schedule['initial_endowment']
+                if hasattr(initial_endowment, 'dict'):
+                    # Convert Basket instance to dict
+                    initial_endowment_serializable = initial_endowment.dict()
+                else:
+                    # Assume it's already a dict or another serializable type
+                    initial_endowment_serializable = initial_endowment
+
+                try:
+                    initial_endowment_json = json.dumps(initial_endowment_serializable)
+                except TypeError as e:
+                    logging.error(f"Error serializing 'initial_endowment' for agent_id {schedule['agent_id']}: {e}")
+                    raise
+
+                rows.append((
+                    schedule['agent_id'],
+                    schedule['is_buyer'],
+                    values_json,
+                    costs_json,
+                    initial_endowment_json
+                ))
+
             with self.conn.cursor() as cur:
-                for schedule in schedules_data:
-                    logging.debug(f"Inserting schedule: {schedule}")
-
-                    # Handle 'values' and 'costs' based on is_buyer
-                    if schedule['is_buyer']:
-                        values_json = json.dumps(schedule['values'], default=json_serial) if schedule['values'] else None
-                        costs_json = None
-                    else:
-                        values_json = None
-                        costs_json = json.dumps(schedule['costs'], default=json_serial) if schedule['costs'] else None
-
-                    # Handle 'initial_endowment'
-                    initial_endowment = schedule['initial_endowment']
-                    if hasattr(initial_endowment, 'dict'):
-                        # Convert Basket instance to dict
-                        initial_endowment_serializable = initial_endowment.dict()
-                    else:
-                        # Assume it's already a dict or another serializable type
-                        initial_endowment_serializable = initial_endowment
-
-                    try:
-                        initial_endowment_json = json.dumps(initial_endowment_serializable)
-                    except TypeError as e:
-                        logging.error(f"Error serializing 'initial_endowment' for agent_id {schedule['agent_id']}: {e}")
-                        raise
-
-                    # Execute the SQL Insert without ON CONFLICT
-                    try:
-                        cur.execute(query, (
-                            schedule['agent_id'],
-                            schedule['is_buyer'],
-                            values_json,
-                            costs_json,
-                            initial_endowment_json
-                        ))
-                    except psycopg2.Error as db_err:
-                        logging.error(f"Database error inserting schedule for agent_id {schedule['agent_id']}: {db_err}")
-                        raise
-            self.conn.commit()
+                self._execute_values(cur, query, rows)
+            self._commit()
             logging.info(f"Successfully inserted {len(schedules_data)} schedules")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting schedules: {str(e)}")
             logging.exception("Exception details:")
             raise
 
     def insert_orders(self, orders: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO orders (agent_id, is_buy, quantity, price, base_value, base_cost)
-        VALUES (%s, %s, %s, %s, %s, %s)
+        INSERT INTO orders (run_id, round, agent_id, is_buy, quantity, price, base_value, base_cost)
+        VALUES %s
         """
+        rows = self._map_agent_rows(orders, 'agent_id', agent_id_map, lambda agent_id, order: (
+            self.run_id,
+            self._round(order),
+            agent_id,
+            order['is_buy'],
+            order['quantity'],
+            order['price'],
+            order['base_value'],
+            order['base_cost']
+        ))
         try:
             with self.conn.cursor() as cur:
-                for order in orders:
-                    agent_id = agent_id_map.get(str(order['agent_id']))
-                    if agent_id is None:
-                        logging.error(f"No matching UUID found for agent_id: {order['agent_id']}")
-                        continue
-                    cur.execute(query, (
-                        agent_id,
-                        order['is_buy'],
-                        order['quantity'],
-                        order['price'],
-                        order['base_value'],
-                        order['base_cost']
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(orders)} orders into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} orders into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting orders: {str(e)}")
             raise
 
     def insert_trades(self, trades_data: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
-        # Add logging to debug the incoming data
-        logging.info(f"Attempting to insert trades: {trades_data}")
-        logging.info(f"Agent ID map: {agent_id_map}")
+        logging.debug(f"Attempting to insert trades: {trades_data}")
         
         query = """
-        INSERT INTO trades (buyer_id, seller_id, quantity, price, buyer_surplus, seller_surplus, total_surplus, round)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id
+        INSERT INTO trades (run_id, buyer_id, seller_id, quantity, price, buyer_surplus, seller_surplus, total_surplus, round)
+        VALUES %s
         """
+        rows = []
+        for trade in trades_data:
+            buyer_id = agent_id_map.get(str(trade['buyer_id']))
+            seller_id = agent_id_map.get(str(trade['seller_id']))
+            
+            if buyer_id is None or seller_id is None:
+                logging.error(f"Missing agent mapping - buyer_id: {trade['buyer_id']}, seller_id: {trade['seller_id']}")
+                continue
+            rows.append((
+                self.run_id,
+                buyer_id,
+                seller_id,
+                trade['quantity'],
+                trade['price'],
+                trade['buyer_surplus'],
+                trade['seller_surplus'],
+                trade['total_surplus'],
+                trade['round']
+            ))
         try:
             with self.conn.cursor() as cur:
-                for trade in trades_data:
-                    buyer_id = agent_id_map.get(str(trade['buyer_id']))
-                    seller_id = agent_id_map.get(str(trade['seller_id']))
-                    
-                    if buyer_id is None or seller_id is None:
-                        logging.error(f"Missing agent mapping - buyer_id: {trade['buyer_id']}, seller_id: {trade['seller_id']}")
-                        continue
-                    values = (
-                        buyer_id,
-                        seller_id,
-                        trade['quantity'],
-                        trade['price'],
-                        trade['buyer_surplus'],
-                        trade['seller_surplus'],
-                        trade['total_surplus'],
-                        trade['round']
-                    )
-                    logging.info(f"Inserting trade with values: {values}")
-                    
-                    cur.execute(query, values)
-                    trade_id = cur.fetchone()[0]
-                    logging.info(f"Successfully inserted trade with ID: {trade_id}")
-                    
-            self.conn.commit()
-            logging.info(f"Successfully committed {len(trades_data)} trades to database")
+                self._execute_values(cur, query, rows)
+                # Same transaction, so the aggregates never drift from the trades
+                self._update_round_metrics(cur, rows)
+            self._commit()
+            logging.info(f"Successfully inserted {len(rows)} trades to database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting trades: {str(e)}")
             logging.exception("Full exception details:")
             raise
 
+    def _update_round_metrics(self, cur, trade_rows: List[tuple]):
+        """Fold freshly inserted trades rows into round_metrics, one upsert row per round."""
+        metrics = {}
+        for run_id, _, _, quantity, price, buyer_surplus, seller_surplus, total_surplus, round_num in trade_rows:
+            m = metrics.setdefault((run_id, round_num), {
+                'count': 0, 'quantity': 0, 'value': 0.0, 'min': None, 'max': None,
+                'buyer_surplus': 0.0, 'seller_surplus': 0.0, 'total_surplus': 0.0
+            })
+            price = float(price)
+            m['count'] += 1
+            m['quantity'] += quantity
+            m['value'] += price * quantity
+            m['min'] = price if m['min'] is None else min(m['min'], price)
+            m['max'] = price if m['max'] is None else max(m['max'], price)
+            m['buyer_surplus'] += float(buyer_surplus)
+            m['seller_surplus'] += float(seller_surplus)
+            m['total_surplus'] += float(total_surplus)
+        if not metrics:
+            return
+        self._execute_values(cur, """
+            INSERT INTO round_metrics AS m
+            (run_id, round, trade_count, traded_quantity, traded_value, vwap, min_price, max_price,
+            buyer_surplus, seller_surplus, total_surplus)
+            VALUES %s
+            ON CONFLICT (run_id, round) DO UPDATE SET
+                trade_count = m.trade_count + EXCLUDED.trade_count,
+                traded_quantity = m.traded_quantity + EXCLUDED.traded_quantity,
+                traded_value = m.traded_value + EXCLUDED.traded_value,
+                vwap = (m.traded_value + EXCLUDED.traded_value) / NULLIF(m.traded_quantity + EXCLUDED.traded_quantity, 0),
+                min_price = LEAST(m.min_price, EXCLUDED.min_price),
+                max_price = GREATEST(m.max_price, EXCLUDED.max_price),
+                buyer_surplus = m.buyer_surplus + EXCLUDED.buyer_surplus,
+                seller_surplus = m.seller_surplus + EXCLUDED.seller_surplus,
+                total_surplus = m.total_surplus + EXCLUDED.total_surplus,
+                updated_at = CURRENT_TIMESTAMP
+        """, [(
+            run_id,
+            round_num,
+            m['count'],
+            m['quantity'],
+            m['value'],
+            m['value'] / m['quantity'] if m['quantity'] else None,
+            m['min'],
+            m['max'],
+            m['buyer_surplus'],
+            m['seller_surplus'],
+            m['total_surplus']
+        ) for (run_id, round_num), m in metrics.items()])
+
+    def insert_equilibria(self, equilibria: List[Dict[str, Any]]):
+        """Record the theoretical equilibrium of each good for the current run, the baseline for efficiency."""
+        query = """
+        INSERT INTO run_equilibria (run_id, good_name, price, quantity, buyer_surplus, seller_surplus, total_surplus)
+        VALUES %s
+        ON CONFLICT (run_id, good_name) DO UPDATE SET
+            price = EXCLUDED.price,
+            quantity = EXCLUDED.quantity,
+            buyer_surplus = EXCLUDED.buyer_surplus,
+            seller_surplus = EXCLUDED.seller_surplus,
+            total_surplus = EXCLUDED.total_surplus
+        """
+        # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement
+        rows = {equilibrium['good_name']: (
+            self.run_id,
+            equilibrium['good_name'],
+            equilibrium['price'],
+            equilibrium['quantity'],
+            equilibrium['buyer_surplus'],
+            equilibrium['seller_surplus'],
+            equilibrium['total_surplus']
+        ) for equilibrium in equilibria}
+        try:
+            with self.conn.cursor() as cur:
+                self._execute_values(cur, query, list(rows.values()))
+            self._commit()
+            logging.info(f"Inserted equilibria for {len(rows)} goods")
+        except Exception as e:
+            self._rollback()
+            logging.error(f"Error inserting equilibria: {str(e)}")
+            raise
+
     def insert_interactions(self, interactions: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO interactions (agent_id, round, task, response)
-        VALUES (%s, %s, %s, %s)
+        INSERT INTO interactions (run_id, agent_id, round, task, response)
+        VALUES %s
         """
+        rows = self._map_agent_rows(interactions, 'agent_id', agent_id_map, lambda agent_id, interaction: (
+            self.run_id,
+            agent_id,
+            interaction['round'],
+            interaction['task'],
+            interaction['response']
+        ))
         try:
             with self.conn.cursor() as cur:
-                for interaction in interactions:
-                    agent_id = agent_id_map.get(str(interaction['agent_id']))
-                    if agent_id is None:
-                        logging.error(f"No matching UUID found for agent_id: {interaction['agent_id']}")
-                        continue
-                    cur.execute(query, (
-                        agent_id,
-                        interaction['round'],
-                        interaction['task'],
-                        interaction['response']
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(interactions)} interactions into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} interactions into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting interactions: {str(e)}")
             raise
 
     def insert_observations(self, observations: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO observations (memory_id, environment_name, observation)
-        VALUES (%s, %s, %s)
+        INSERT INTO observations (run_id, round, memory_id, environment_name, observation)
+        VALUES %s
         """
+        rows = self._map_agent_rows(observations, 'memory_id', agent_id_map, lambda memory_id, observation: (
+            self.run_id,
+            self._round(observation),
+            memory_id,
+            observation['environment_name'],
+            psycopg2.extras.Json(observation['observation'])
+        ))
         try:
             with self.conn.cursor() as cur:
-                for observation in observations:
-                    memory_id = agent_id_map.get(str(observation['memory_id']))
-                    if memory_id is None:
-                        logging.error(f"No matching UUID found for memory_id: {observation['memory_id']}")
-                        continue
-                    cur.execute(query, (
-                        memory_id,
-                        observation['environment_name'],
-                        psycopg2.extras.Json(observation['observation'])
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(observations)} observations into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} observations into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting observations: {str(e)}")
             raise
 
     def insert_reflections(self, reflections: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO reflections (memory_id, environment_name, reflection, self_reward, environment_reward, total_reward, strategy_update)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO reflections (run_id, round, memory_id, environment_name, reflection, self_reward, environment_reward, total_reward, strategy_update)
+        VALUES %s
         """
+        rows = self._map_agent_rows(reflections, 'memory_id', agent_id_map, lambda memory_id, reflection: (
+            self.run_id,
+            self._round(reflection),
+            memory_id,
+            reflection['environment_name'],
+            reflection['reflection'],
+            reflection['self_reward'],
+            reflection['environment_reward'],
+            reflection['total_reward'],
+            reflection['strategy_update']
+        ))
         try:
             with self.conn.cursor() as cur:
-                for reflection in reflections:
-                    memory_id = agent_id_map.get(str(reflection['memory_id']))
-                    if memory_id is None:
-                        logging.error(f"No matching UUID found for memory_id: {reflection['memory_id']}")
-                        continue
-                    cur.execute(query, (
-                        memory_id,
-                        reflection['environment_name'],
-                        reflection['reflection'],
-                        reflection['self_reward'],
-                        reflection['environment_reward'],
-                        reflection['total_reward'],
-                        reflection['strategy_update']
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(reflections)} reflections into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} reflections into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting reflections: {str(e)}")
             raise
 
     def insert_perceptions(self, perceptions: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
-        INSERT INTO perceptions (memory_id, environment_name, monologue, strategy, confidence)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO perceptions (run_id, round, memory_id, environment_name, monologue, strategy, confidence)
+        VALUES %s
         """
+        rows = self._map_agent_rows(perceptions, 'memory_id', agent_id_map, lambda memory_id, perception: (
+            self.run_id,
+            self._round(perception),
+            memory_id,
+            perception['environment_name'],
+            perception['monologue'],
+            perception['strategy'],
+            perception['confidence']
+        ))
         try:
             with self.conn.cursor() as cur:
-                for perception in perceptions:
-                    memory_id = agent_id_map.get(str(perception['memory_id']))
-                    if memory_id is None:
-                        logging.error(f"No matching UUID found for memory_id: {perception['memory_id']}")
-                        continue
-                    cur.execute(query, (
-                        memory_id,
-                        perception['environment_name'],
-                        perception['monologue'],
-                        perception['strategy'],
-                        perception['confidence']
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(perceptions)} perceptions into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} perceptions into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting perceptions: {str(e)}")
             raise
 
     def insert_actions(self, actions: List[Dict[str, Any]], agent_id_map: Dict[str, uuid.UUID]):
         query = """
         INSERT INTO actions (
+            run_id,
+            round,
             memory_id, 
             environment_name, 
             action
         )
-        VALUES (%s, %s, %s)
+        VALUES %s
         """
+        rows = self._map_agent_rows(actions, 'memory_id', agent_id_map, lambda memory_id, action: (
+            self.run_id,
+            self._round(action),
+            memory_id,
+            action['environment_name'],
+            json.dumps(action['action'], default=str)
+        ))
         try:
             with self.conn.cursor() as cur:
-                for action in actions:
-                    memory_id = agent_id_map.get(str(action['memory_id']))
-                    if memory_id is None:
-                        logging.error(f"No matching UUID found for memory_id: {action['memory_id']}")
-                        continue
-                    environment_name = action['environment_name']
-                    action_data = action['action']
-                    
-                    cur.execute(query, (
-                        memory_id,
-                        environment_name,
-                        json.dumps(action_data, default=str)
-                    ))
-            self.conn.commit()
-            logging.info(f"Inserted {len(actions)} actions into the database")
+                self._execute_values(cur, query, rows)
+            self._commit()
+            logging.info(f"Inserted {len(rows)} actions into the database")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting actions: {str(e)}")
             raise
 
-    def insert_ai_requests(self, ai_requests):
+    def prepare_ai_requests(self, ai_requests) -> List[Dict[str, Any]]:
+        """Convert completed inference requests into `requests` table rows."""
         requests_data = []
         for request in ai_requests:
             start_time = request.start_time
@@ -472,50 +753,378 @@ class SimulationDataInserter:
                 'raw_response': request.raw_result,
                 'completion_tokens': request.usage.completion_tokens if request.usage else None,
                 'prompt_tokens': request.usage.prompt_tokens if request.usage else None,
-                'total_tokens': request.usage.total_tokens if request.usage else None
+                'total_tokens': request.usage.total_tokens if request.usage else None,
+                'round': self.current_round
             })
+        return requests_data
 
+    def insert_ai_requests(self, ai_requests):
+        requests_data = self.prepare_ai_requests(ai_requests)
         if requests_data:
             try:
                 self._insert_ai_requests_to_db(requests_data)
             except Exception as e:
                 logging.error(f"Error inserting AI requests: {e}")
+                if self._in_transaction:
+                    raise
+
+    def _remember_blob_ids(self, blob_ids: Dict[bytes, int]):
+        with self._blob_ids_lock:
+            self._blob_ids.update(blob_ids)
+            while len(self._blob_ids) > self._blob_cache_size:
+                self._blob_ids.popitem(last=False)
+
+    def _store_blobs(self, cur, segments: Dict[bytes, Tuple[str, bool]]) -> Dict[bytes, int]:
+        """Make sure every segment (hash -> (text, compress)) is in prompt_blobs and return hash -> id."""
+        blob_ids = {}
+        with self._blob_ids_lock:
+            for digest in segments:
+                if digest in self._blob_ids:
+                    self._blob_ids.move_to_end(digest)
+                    blob_ids[digest] = self._blob_ids[digest]
+        missing = [digest for digest in segments if digest not in blob_ids]
+        if not missing:
+            return blob_ids
+
+        rows = []
+        for digest in missing:
+            text, compress = segments[digest]
+            data = text.encode('utf-8')
+            if compress:
+                rows.append((psycopg2.Binary(digest), None, psycopg2.Binary(zstandard.ZstdCompressor().compress(data)), len(data)))
+            else:
+                rows.append((psycopg2.Binary(digest), text, None, len(data)))
+        inserted = self._execute_values(cur, """
+            INSERT INTO prompt_blobs (hash, content, content_zstd, size)
+            VALUES %s
+            ON CONFLICT (hash) DO NOTHING
+            RETURNING hash, id
+        """, rows, fetch=True)
+        new_ids = {bytes(digest): blob_id for digest, blob_id in inserted}
+        # Segments stored earlier by another process or evicted from the cache
+        existing = [psycopg2.Binary(digest) for digest in missing if digest not in new_ids]
+        if existing:
+            cur.execute("SELECT hash, id FROM prompt_blobs WHERE hash = ANY(%s)", (existing,))
+            new_ids.update({bytes(digest): blob_id for digest, blob_id in cur.fetchall()})
+
+        blob_ids.update(new_ids)
+        self._after_commit(lambda: self._remember_blob_ids(new_ids))
+        return blob_ids
+
+    def _insert_deduplicated_ai_requests(self, requests_data):
+        segments = {}
+
+        def segment(text: Optional[str], compress: bool = False) -> Optional[bytes]:
+            if text is None:
+                return None
+            # Compressed and plain copies of the same text are separate blobs
+            digest = hashlib.sha256((b'zstd:' if compress else b'') + text.encode('utf-8')).digest()
+            segments[digest] = (text, compress)
+            return digest
+
+        digests = [(
+            [segment(json.dumps(message, sort_keys=True)) for message in request['messages']],
+            segment(request['system']),
+            segment(json.dumps(request.get('tools', []), sort_keys=True)),
+            segment(json.dumps(request['raw_response']), compress=self.compress_responses)
+        ) for request in requests_data]
+
+        query = """
+        INSERT INTO request_records
+        (run_id, round, prompt_context_id, start_time, end_time, total_time, model,
+        max_tokens, temperature, message_blob_ids, system_blob_id, tools_blob_id,
+        tool_choice, raw_response_blob_id, completion_tokens, prompt_tokens, total_tokens)
+        VALUES %s
+        """
+        with self.conn.cursor() as cur:
+            blob_ids = self._store_blobs(cur, segments)
+            rows = [(
+                self.run_id,
+                self._round(request),
+                request['prompt_context_id'],
+                request['start_time'],
+                request['end_time'],
+                request['total_time'],
+                request['model'],
+                request['max_tokens'],
+                request['temperature'],
+                [blob_ids[digest] for digest in message_digests],
+                blob_ids.get(system_digest),
+                blob_ids.get(tools_digest),
+                json.dumps(request.get('tool_choice', {})),
+                blob_ids.get(response_digest),
+                request['completion_tokens'],
+                request['prompt_tokens'],
+                request['total_tokens']
+            ) for request, (message_digests, system_digest, tools_digest, response_digest) in zip(requests_data, digests)]
+            self._execute_values(cur, query, rows)
 
     def _insert_ai_requests_to_db(self, requests_data):
+        if self.dedupe_prompts:
+            try:
+                self._insert_deduplicated_ai_requests(requests_data)
+                self._commit()
+                logging.info(f"Inserted {len(requests_data)} AI requests")
+            except Exception as e:
+                self._rollback()
+                logging.error(f"Error inserting AI requests: {str(e)}")
+                raise
+            return
+
         query = """
         INSERT INTO requests 
-        (prompt_context_id, start_time, end_time, total_time, model, 
+        (run_id, round, prompt_context_id, start_time, end_time, total_time, model, 
         max_tokens, temperature, messages, system, tools, tool_choice,
         raw_response, completion_tokens, prompt_tokens, total_tokens)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES %s
         """
+        rows = [(
+            self.run_id,
+            self._round(request),
+            request['prompt_context_id'],
+            request['start_time'],
+            request['end_time'],
+            request['total_time'],
+            request['model'],
+            request['max_tokens'],
+            request['temperature'],
+            json.dumps(request['messages']),
+            request['system'],
+            json.dumps(request.get('tools', [])),
+            json.dumps(request.get('tool_choice', {})),
+            json.dumps(request['raw_response']),
+            request['completion_tokens'],
+            request['prompt_tokens'],
+            request['total_tokens']
+        ) for request in requests_data]
         try:
             with self.conn.cursor() as cur:
-                for request in requests_data:
-                    cur.execute(query, (
-                        request['prompt_context_id'],
-                        request['start_time'],
-                        request['end_time'],
-                        request['total_time'],
-                        request['model'],
-                        request['max_tokens'],
-                        request['temperature'],
-                        json.dumps(request['messages']),
-                        request['system'],
-                        json.dumps(request.get('tools', [])),
-                        json.dumps(request.get('tool_choice', {})),
-                        json.dumps(request['raw_response']),
-                        request['completion_tokens'],
-                        request['prompt_tokens'],
-                        request['total_tokens']
-                    ))
-            self.conn.commit()
+                self._execute_values(cur, query, rows)
+            self._commit()
             logging.info(f"Inserted {len(requests_data)} AI requests")
         except Exception as e:
-            self.conn.rollback()
+            self._rollback()
             logging.error(f"Error inserting AI requests: {str(e)}")
             raise
 
+    def prepare_round_data(
+        self,
+        round_num: int,
+        agents: List[Any],
+        environment: Any,
+        config: Any,
+        tracker: Any,
+        environment_name: str = 'auction'
+    ) -> Dict[str, Any]:
+        """
+        Snapshot the rows to write for a round from the live agent and environment objects.
+
+        The result only holds plain data, so it can be written later with
+        `write_round_data` while the simulation keeps mutating the agents.
+        """
+        agents_data = self.build_agents_data(agents, config.max_rounds)
+
+        memories_data = [
+            {
+                'agent_id': str(agent.id),
+                'step_id': round_num,
+                'memory_data': serialize_memory_data(agent.memory[-1] if agent.memory else {})
+            }
+            for agent in agents
+        ]
+
+        # Allocations data
+        logging.info("Preparing allocations data")
+        allocations_data = [
+            {
+                'agent_id': str(agent.id),
+                'goods': agent.economic_agent.endowment.current_basket.goods_dict.get(config.agent_config.good_name, 0),
+                'cash': agent.economic_agent.endowment.current_basket.cash,
+                'locked_goods': getattr(agent.economic_agent, 'locked_goods', {}).get(config.agent_config.good_name, 0),
+                'locked_cash': getattr(agent.economic_agent, 'locked_cash', 0),
+                'initial_goods': agent.economic_agent.endowment.initial_basket.goods_dict.get(config.agent_config.good_name, 0),
+                'initial_cash': agent.economic_agent.endowment.initial_basket.cash
+            }
+            for agent in agents
+        ]
+
+        # Schedules data
+        logging.info("Preparing schedules data")
+        schedules_data = [
+            {
+                'agent_id': str(agent.id),
+                'is_buyer': agent.role == "buyer",
+                'values': agent.economic_agent.value_schedules.get(config.agent_config.good_name, {}),
+                'costs': agent.economic_agent.cost_schedules.get(config.agent_config.good_name, {}),
+                'initial_endowment': agent.economic_agent.endowment.initial_basket
+            }
+            for agent in agents
+        ]
+
+        # Orders data
+        logging.info("Preparing orders data")
+        orders_data = [
+            {
+                'agent_id': str(agent.id),
+                'is_buy': isinstance(order, Bid),
+                'quantity': order.quantity,
+                'price': order.price,
+                'base_value': getattr(order, 'base_value', None),
+                'base_cost': getattr(order, 'base_cost', None)
+            }
+            for agent in agents
+            for order in agent.economic_agent.pending_orders.get(config.agent_config.good_name, [])
+        ]
+
+        # Interactions data
+        logging.info("Preparing interactions data")
+        interactions_data = [
+            {
+                'agent_id': str(agent.id),
+                'round': round_num,
+                'task': interaction['type'],
+                'response': serialize_memory_data(interaction['content'])
+            }
+            for agent in agents
+            for interaction in agent.interactions
+        ]
+
+        # Perceptions data
+        logging.info("Preparing perceptions data")
+        perceptions_data = []
+        for agent in agents:
+            if agent.last_perception is not None:
+                perception = validate_json(agent.last_perception)
+                if perception is not None:
+                    perceptions_data.append({
+                        'memory_id': str(agent.id),
+                        'environment_name': environment_name,
+                        'monologue': str(perception.get('monologue', '')),
+                        'strategy': str(perception.get('strategy', '')),
+                        'confidence': perception.get('confidence', 0)
+                    })
+                else:
+                    logging.warning(f"Invalid JSON perception data for agent {agent.id}: {agent.last_perception}")
+
+        # Actions data
+        logging.info("Preparing actions data")
+        actions_data = [
+            {
+                'memory_id': str(agent.id),
+                'environment_name': environment_name,
+                'action': agent.last_action
+            }
+            for agent in agents
+            if hasattr(agent, 'last_action') and agent.last_action
+        ]
+
+        # Observations and Reflections data
+        logging.info("Preparing observations and reflections data")
+        observations_data = [
+            {
+                'memory_id': str(agent.id),
+                'environment_name': environment_name,
+                'observation': serialize_memory_data(agent.last_observation)
+            }
+            for agent in agents
+            if agent.last_observation
+        ]
+
+        reflections_data = [
+            {
+                'memory_id': str(agent.id),
+                'environment_name': environment_name,
+                'reflection': reflection.get('content', ''),
+                'self_reward': reflection.get('self_reward', 0),
+                'environment_reward': reflection.get('environment_reward', 0),
+                'total_reward': reflection.get('total_reward', 0),
+                'strategy_update': reflection.get('strategy_update', '')
+            }
+            for agent in agents
+            if agent.memory and agent.memory[-1]['type'] == 'reflection'
+            for reflection in [agent.memory[-1]]
+        ]
+
+        # Trades data
+        logging.info("Preparing trades data")
+        trades_data = []
+        if hasattr(tracker, 'all_trades'):
+            logging.info(f"Found {len(tracker.all_trades)} trades in tracker")
+            for trade_info in tracker.all_trades:
+                # The trade_info is now a dictionary from the AuctionTracker
+                try:
+                    trades_data.append({
+                        'buyer_id': trade_info['buyer_id'],
+                        'seller_id': trade_info['seller_id'],
+                        'quantity': trade_info['quantity'],
+                        'price': trade_info['price'],
+                        'buyer_surplus': trade_info['buyer_surplus'],
+                        'seller_surplus': trade_info['seller_surplus'],
+                        'total_surplus': trade_info['total_surplus'],
+                        'round': trade_info['round']
+                    })
+                except Exception as e:
+                    logging.error(f"Error processing trade {trade_info}: {str(e)}")
+
+        # Group chat data
+        groupchat_data = []
+        if hasattr(environment, 'mechanism') and hasattr(environment.mechanism, 'topics'):
+            for message in environment.mechanism.messages:
+                groupchat_data.append({
+                    'message_id': str(uuid.uuid4()),
+                    'agent_id': str(message.agent_id),
+                    'round': round_num,
+                    'sub_round': getattr(message, 'sub_round', None),
+                    'cohort_id': message.cohort_id,
+                    'content': message.content,
+                    'timestamp': message.timestamp if hasattr(message, 'timestamp') else datetime.now(),
+                    'topic': environment.mechanism.topics.get(message.cohort_id, '')
+                })
+
+        # Rows are written to the partition of the round they were prepared in,
+        # even if the writer only gets to them after the simulation moved on
+        for rows in (allocations_data, orders_data, perceptions_data, actions_data, observations_data, reflections_data):
+            for row in rows:
+                row['round'] = round_num
+
+        return {
+            'round_num': round_num,
+            'agents': agents_data,
+            'memories': memories_data,
+            'allocations': allocations_data,
+            'schedules': schedules_data,
+            'orders': orders_data,
+            'interactions': interactions_data,
+            'perceptions': perceptions_data,
+            'actions': actions_data,
+            'observations': observations_data,
+            'reflections': reflections_data,
+            'trades': trades_data,
+            'groupchat': groupchat_data
+        }
+
+    def write_round_data(self, round_data: Dict[str, Any]):
+        """Write a `prepare_round_data` snapshot, all tables in one transaction."""
+        with self.transaction():
+            agent_id_map = self.insert_agents(round_data['agents'])
+            self.insert_agent_memories(round_data['memories'])
+            self.insert_allocations(round_data['allocations'], agent_id_map)
+            self.insert_schedules(round_data['schedules'])
+            self.insert_orders(round_data['orders'], agent_id_map)
+            self.insert_interactions(round_data['interactions'], agent_id_map)
+            if round_data['perceptions']:
+                self.insert_perceptions(round_data['perceptions'], agent_id_map)
+            self.insert_actions(round_data['actions'], agent_id_map)
+            self.insert_observations(round_data['observations'], agent_id_map)
+            self.insert_reflections(round_data['reflections'], agent_id_map)
+            if round_data['trades']:
+                logging.info(f"Attempting to insert {len(round_data['trades'])} trades")
+                self.insert_trades(round_data['trades'], agent_id_map)
+            else:
+                logging.warning("No trades data found to insert")
+            if round_data['groupchat']:
+                self.insert_groupchat_messages(round_data['groupchat'], round_data['round_num'], agent_id_map)
+
     def insert_round_data(
         self, 
         round_num: int, 
@@ -537,199 +1146,9 @@ class SimulationDataInserter:
             environment_name (str): Name of the environment (defaults to 'auction')
         """
         try:
-            # Insert agent data
-            agents_data = [
-                {
-                    'id': str(agent.id),
-                    'role': agent.role,
-                    'is_llm': agent.use_llm,
-                    'max_iter': config.max_rounds,
-                    'llm_config': agent.llm_config if isinstance(agent.llm_config, dict) else agent.llm_config.dict()
-                }
-                for agent in agents
-            ]
-            agent_id_map = self.insert_agents(agents_data)
-
-            # Insert agent memories
-            memories_data = [
-                {
-                    'agent_id': str(agent.id),
-                    'step_id': round_num,
-                    'memory_data': serialize_memory_data(agent.memory[-1] if agent.memory else {})
-                }
-                for agent in agents
-            ]
-            self.insert_agent_memories(memories_data)
-
-            # Allocations data
-            logging.info("Preparing allocations data")
-            allocations_data = [
-                {
-                    'agent_id': str(agent.id),
-                    'goods': agent.economic_agent.endowment.current_basket.goods_dict.get(config.agent_config.good_name, 0),
-                    'cash': agent.economic_agent.endowment.current_basket.cash,
-                    'locked_goods': getattr(agent.economic_agent, 'locked_goods', {}).get(config.agent_config.good_name, 0),
-                    'locked_cash': getattr(agent.economic_agent, 'locked_cash', 0),
-                    'initial_goods': agent.economic_agent.endowment.initial_basket.goods_dict.get(config.agent_config.good_name, 0),
-                    'initial_cash': agent.economic_agent.endowment.initial_basket.cash
-                }
-                for agent in agents
-            ]
-            self.insert_allocations(allocations_data, agent_id_map)
-
-            # Schedules data
-            logging.info("Preparing schedules data")
-            schedules_data = [
-                {
-                    'agent_id': str(agent.id),
-                    'is_buyer': agent.role == "buyer",
-                    'values': agent.economic_agent.value_schedules.get(config.agent_config.good_name, {}),
-                    'costs': agent.economic_agent.cost_schedules.get(config.agent_config.good_name, {}),
-                    'initial_endowment': agent.economic_agent.endowment.initial_basket
-                }
-                for agent in agents
-            ]
-            self.insert_schedules(schedules_data)
-
-            # Orders data
-            logging.info("Preparing orders data")
-            orders_data = [
-                {
-                    'agent_id': str(agent.id),
-                    'is_buy': isinstance(order, Bid),
-                    'quantity': order.quantity,
-                    'price': order.price,
-                    'base_value': getattr(order, 'base_value', None),
-                    'base_cost': getattr(order, 'base_cost', None)
-                }
-                for agent in agents
-                for order in agent.economic_agent.pending_orders.get(config.agent_config.good_name, [])
-            ]
-            self.insert_orders(orders_data, agent_id_map)
-
-            # Interactions data
-            logging.info("Preparing interactions data")
-            interactions_data = [
-                {
-                    'agent_id': str(agent.id),
-                    'round': round_num,
-                    'task': interaction['type'],
-                    'response': serialize_memory_data(interaction['content'])
-                }
-                for agent in agents
-                for interaction in agent.interactions
-            ]
-            self.insert_interactions(interactions_data, agent_id_map)
-
-            # Perceptions data
-            logging.info("Preparing perceptions data")
-            perceptions_data = []
-            for agent in agents:
-                if agent.last_perception is not None:
-                    perception = validate_json(agent.last_perception)
-                    if perception is not None:
-                        perceptions_data.append({
-                            'memory_id': str(agent.id),
-                            'environment_name': environment_name,
-                            'monologue': str(perception.get('monologue', '')),
-                            'strategy': str(perception.get('strategy', '')),
-                            'confidence': perception.get('confidence', 0)
-                        })
-                    else:
-                        logging.warning(f"Invalid JSON perception data for agent {agent.id}: {agent.last_perception}")
-
-            if perceptions_data:
-                self.insert_perceptions(perceptions_data, agent_id_map)
-
-            # Actions data
-            logging.info("Preparing actions data")
-            actions_data = [
-                {
-                    'memory_id': str(agent.id),
-                    'environment_name': environment_name,
-                    'action': agent.last_action
-                }
-                for agent in agents
-                if hasattr(agent, 'last_action') and agent.last_action
-            ]
-            self.insert_actions(actions_data, agent_id_map)
-
-            # Observations and Reflections data
-            logging.info("Preparing observations and reflections data")
-            observations_data = [
-                {
-                    'memory_id': str(agent.id),
-                    'environment_name': environment_name,
-                    'observation': serialize_memory_data(agent.last_observation)
-                }
-                for agent in agents
-                if agent.last_observation
-            ]
-            
-            reflections_data = [
-                {
-                    'memory_id': str(agent.id),
-                    'environment_name': environment_name,
-                    'reflection': reflection.get('content', ''),
-                    'self_reward': reflection.get('self_reward', 0),
-                    'environment_reward': reflection.get('environment_reward', 0),
-                    'total_reward': reflection.get('total_reward', 0),
-                    'strategy_update': reflection.get('strategy_update', '')
-                }
-                for agent in agents
-                if agent.memory and agent.memory[-1]['type'] == 'reflection'
-                for reflection in [agent.memory[-1]]
-            ]
-
-            self.insert_observations(observations_data, agent_id_map)
-            self.insert_reflections(reflections_data, agent_id_map)
-
-            # Trades data
-            logging.info("Preparing trades data")
-            trades_data = []
-            if hasattr(tracker, 'all_trades'):
-                logging.info(f"Found {len(tracker.all_trades)} trades in tracker")
-                for trade_info in tracker.all_trades:
-                    # The trade_info is now a dictionary from the AuctionTracker
-                    try:
-                        trades_data.append({
-                            'buyer_id': trade_info['buyer_id'],
-                            'seller_id': trade_info['seller_id'],
-                            'quantity': trade_info['quantity'],
-                            'price': trade_info['price'],
-                            'buyer_surplus': trade_info['buyer_surplus'],
-                            'seller_surplus': trade_info['seller_surplus'],
-                            'total_surplus': trade_info['total_surplus'],
-                            'round': trade_info['round']
-                        })
-                        logging.info(f"Processed trade: {trades_data[-1]}")
-                    except Exception as e:
-                        logging.error(f"Error processing trade {trade_info}: {str(e)}")
-
-            if trades_data:
-                logging.info(f"Attempting to insert {len(trades_data)} trades")
-                self.insert_trades(trades_data, agent_id_map)
-            else:
-                logging.warning("No trades data found to insert")
-
-            # Group chat data
-            groupchat_data = []
-            if hasattr(environment, 'mechanism') and hasattr(environment.mechanism, 'topics'):
-                for message in environment.mechanism.messages:
-                    groupchat_data.append({
-                        'message_id': str(uuid.uuid4()),
-                        'agent_id': str(message.agent_id),
-                        'round': round_num,
-                        'sub_round': getattr(message, 'sub_round', None),
-                        'cohort_id': message.cohort_id,
-                        'content': message.content,
-                        'timestamp': message.timestamp if hasattr(message, 'timestamp') else datetime.now(),
-                        'topic': environment.mechanism.topics.get(message.cohort_id, '')
-                    })
-            
-            if groupchat_data:
-                self.insert_groupchat_messages(groupchat_data, round_num, agent_id_map)
-
+            round_data = self.prepare_round_data(round_num, agents, environment, config, tracker, environment_name)
+            # All tables for the round are written in one transaction
+            self.write_round_data(round_data)
         except Exception as e:
             self.conn.rollback()
             logging.error(f"Error inserting data for round {round_num}: {str(e)}")
@@ -6,7 +6,7 @@ import os
 import random
 import uuid
 from pathlib import Path
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 import warnings
 
 import yaml
@@ -15,6 +15,7 @@ from market_agents.orchestrators.groupchat_orchestrator import GroupChatOrchestr
 from market_agents.agents.market_agent import MarketAgent
 from market_agents.agents.personas.persona import Persona, generate_persona, save_persona_to_file
 from market_agents.agents.protocols.acl_message import ACLMessage
+from market_agents.economics.agent_state import AgentStateStore
 from market_agents.economics.econ_agent import EconomicAgent
 from market_agents.economics.econ_models import (
     Ask,
@@ -25,10 +26,12 @@ from market_agents.economics.econ_models import (
     Good,
     SellerPreferenceSchedule,
 )
-from market_agents.inference.parallel_inference import ParallelAIUtilities, RequestLimits
+from market_agents.inference.parallel_inference import ParallelAIUtilities, RequestLimits, set_ai_utilities
 from market_agents.orchestrators.base_orchestrator import BaseEnvironmentOrchestrator
 from market_agents.orchestrators.config import OrchestratorConfig, load_config
+from market_agents.orchestrators.data_writer import SimulationDataWriter
 from market_agents.orchestrators.insert_simulation_data import SimulationDataInserter
+from market_agents.orchestrators.scheduler import EnvironmentScheduler
 from market_agents.orchestrators.logger_utils import (
     log_section,
     log_environment_setup,
@@ -45,6 +48,7 @@ class MetaOrchestrator:
     def __init__(self, config: OrchestratorConfig, environment_order: List[str] = None):
         self.config = config
         self.agents: List[MarketAgent] = []
+        self.agent_state: Optional[AgentStateStore] = None
         self.ai_utils = self._initialize_ai_utils()
         self.data_inserter = self._initialize_data_inserter()
         self.logger = orchestration_logger
@@ -57,9 +61,11 @@ class MetaOrchestrator:
         anthropic_request_limits = RequestLimits(max_requests_per_minute=20000, max_tokens_per_minute=2000000)
         ai_utils = ParallelAIUtilities(
             oai_request_limits=oai_request_limits,
-            anthropic_request_limits=anthropic_request_limits
+            anthropic_request_limits=anthropic_request_limits,
+            full_validation=self.config.full_request_validation
         )
-        return ai_utils
+        # Agents calling inference on their own go through the same client and rate budget
+        return set_ai_utilities(ai_utils)
 
     def _initialize_data_inserter(self):
         db_config = self.config.database_config
@@ -70,7 +76,18 @@ class MetaOrchestrator:
             'host': db_config.db_host,
             'port': db_config.db_port
         }
-        data_inserter = SimulationDataInserter(db_params)
+        data_inserter = SimulationDataInserter(
+            db_params,
+            pool_size=db_config.pool_size,
+            dedupe_prompts=db_config.dedupe_prompts,
+            compress_responses=db_config.compress_responses
+        )
+        if db_config.write_behind:
+            return SimulationDataWriter(
+                data_inserter,
+                max_pending=db_config.write_queue_size,
+                num_workers=db_config.write_workers
+            )
         return data_inserter
 
     def load_or_generate_personas(self) -> List[Persona]:
@@ -97,6 +114,8 @@ class MetaOrchestrator:
         num_agents = len(personas)
         num_buyers = num_agents // 2
         num_sellers = num_agents - num_buyers
+        if self.config.agent_state_store:
+            self.agent_state = AgentStateStore([self.config.agent_config.good_name], capacity=num_agents)
 
         for i, persona in enumerate(personas):
             agent_uuid = str(uuid.uuid4())
@@ -176,6 +195,11 @@ class MetaOrchestrator:
             agent.last_observation = None
             agent.last_step = None
             agent.index = i
+            # Bound what the agent keeps and re-sends as the run goes on
+            agent.memory_window = self.config.agent_config.memory_window
+            agent.context_policy = self.config.agent_config.context_policy
+            if self.agent_state is not None:
+                agent.bind_state(self.agent_state)
             self.agents.append(agent)
             log_agent_init(self.logger, agent.index, is_buyer, persona)
 
@@ -192,12 +216,17 @@ class MetaOrchestrator:
             if not env_config:
                 self.logger.warning(f"Configuration for environment '{env_name}' not found.")
                 continue
+
+            env_agents = self.agents
+            if env_config.agent_indices is not None:
+                indices = set(env_config.agent_indices)
+                env_agents = [agent for agent in self.agents if agent.index in indices]
                 
             if env_name == 'auction':
                 orchestrator = AuctionOrchestrator(
                     config=env_config,
                     orchestrator_config=self.config,
-                    agents=self.agents,
+                    agents=env_agents,
                     ai_utils=self.ai_utils,
                     data_inserter=self.data_inserter,
                     logger=self.logger
@@ -206,7 +235,7 @@ class MetaOrchestrator:
                 orchestrator = GroupChatOrchestrator(
                     config=env_config,
                     orchestrator_config=self.config,
-                    agents=self.agents,
+                    agents=env_agents,
                     ai_utils=self.ai_utils,
                     data_inserter=self.data_inserter,
                     logger=self.logger
@@ -231,39 +260,86 @@ class MetaOrchestrator:
         # Initialize environment orchestrators
         self.environment_orchestrators = self._initialize_environment_orchestrators()
         
+        # Every row of this simulation goes to the run's own partitions, including
+        # what the environments write during setup (e.g. the auction's equilibria)
+        self.data_inserter.start_run(
+            name='+'.join(self.environment_order),
+            config=self.config.model_dump(mode='json', exclude={'database_config': {'db_password'}}),
+            max_rounds=self.config.max_rounds,
+            rounds_per_partition=self.config.database_config.rounds_per_partition
+        )
+
         # Set up each environment before starting simulation
         for env_name, orchestrator in self.environment_orchestrators.items():
             self.logger.info(f"Setting up {env_name} environment...")
             await orchestrator.setup_environment()  # Properly await setup
             self.logger.info(f"Setup complete for {env_name} environment")
+
+        # Write the agents once; later rounds only upsert agents whose fields changed
+        self.data_inserter.register_agents(self.agents, self.config.max_rounds)
         
-        # Run simulation rounds - each round includes environments in sequence
+        for env_name in self.environment_order:
+            if env_name not in self.environment_orchestrators:
+                self.logger.warning(f"No orchestrator found for environment '{env_name}'. Skipping.")
+        scheduler = EnvironmentScheduler(
+            self.environment_orchestrators,
+            self.environment_order,
+            concurrent=self.config.concurrent_environments
+        )
+        if self.config.concurrent_environments:
+            self.logger.info(f"Environment stages per round: {scheduler.stages()}")
+
+        pipeline = self.config.pipeline_persistence and hasattr(self.data_inserter, 'flush')
+        if self.config.pipeline_persistence and not pipeline:
+            self.logger.warning("pipeline_persistence needs database_config.write_behind; persisting rounds synchronously")
+        pending_flush = None
+
+        # Run simulation rounds - environments that conflict run in order, the rest concurrently
         for round_num in range(1, self.config.max_rounds + 1):
             log_round(self.logger, round_num)
-            
-            # Run each environment in sequence within the same round
-            for env_name in self.environment_order:
-                orchestrator = self.environment_orchestrators.get(env_name)
-                if orchestrator is None:
-                    self.logger.warning(f"No orchestrator found for environment '{env_name}'. Skipping.")
-                    continue
-                    
+            self.data_inserter.set_round(round_num)
+
+            async def run_environment(env_name, orchestrator):
                 log_environment_setup(self.logger, env_name)
                 try:
                     # Run the environment for this round
                     await orchestrator.run_environment(round_num)
                     # Process results but maintain environment assignments
                     await orchestrator.process_round_results(round_num)
-                    
+
                     self.logger.info(f"Completed {env_name} environment for round {round_num}")
                 except Exception as e:
                     self.logger.error(f"Error running {env_name} environment: {str(e)}")
                     raise e
 
+            await scheduler.run_round(run_environment)
+
+            if pipeline:
+                # Let this round commit while the next one perceives and acts,
+                # keeping at most one round's writes in flight
+                if pending_flush is not None:
+                    await pending_flush
+                pending_flush = asyncio.create_task(self.data_inserter.flush())
+            elif hasattr(self.data_inserter, 'flush'):
+                # Make the round durable before moving on
+                await self.data_inserter.flush()
+
+        if pending_flush is not None:
+            await pending_flush
+
         # Print summaries for each environment
         for orchestrator in self.environment_orchestrators.values():
             orchestrator.print_summary()
 
+        # Release client sessions held by the orchestrators
+        for orchestrator in self.environment_orchestrators.values():
+            if hasattr(orchestrator, 'close'):
+                await orchestrator.close()
+
+        await asyncio.to_thread(self.data_inserter.finish_run)
+        if hasattr(self.data_inserter, 'close'):
+            await asyncio.to_thread(self.data_inserter.close)
+
     async def start(self):
         print_ascii_art()
         log_section(self.logger, "Simulation Starting")
@@ -0,0 +1,86 @@
+# scheduler.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+
+def _overlaps(writes: Set[str], touched: Set[str]) -> bool:
+    if not writes or not touched:
+        return False
+    return '*' in writes or '*' in touched or bool(writes & touched)
+
+
+def environments_conflict(first: Any, second: Any) -> bool:
+    """
+    Two environments conflict when they share agents and one of them writes
+    agent state the other reads or writes.
+
+    Orchestrators that do not declare `state_reads`/`state_writes` are assumed
+    to touch all agent state.
+    """
+    if not (first.agent_scope() & second.agent_scope()):
+        return False
+    first_reads = getattr(first, 'state_reads', {'*'})
+    first_writes = getattr(first, 'state_writes', {'*'})
+    second_reads = getattr(second, 'state_reads', {'*'})
+    second_writes = getattr(second, 'state_writes', {'*'})
+    return (
+        _overlaps(first_writes, second_reads | second_writes)
+        or _overlaps(second_writes, first_reads)
+    )
+
+
+class EnvironmentScheduler:
+    """
+    Runs one round of several environments, concurrently where it is safe.
+
+    Each environment depends on every earlier environment in `order` that it
+    conflicts with, so conflicting environments keep their configured order
+    while independent ones start together. Their LLM calls all go through the
+    shared ParallelAIUtilities and therefore one rate budget per client.
+    """
+
+    def __init__(self, orchestrators: Dict[str, Any], order: List[str], concurrent: bool = True):
+        self.orchestrators = orchestrators
+        self.order = [name for name in order if name in orchestrators]
+        self.dependencies: Dict[str, List[str]] = {}
+        for position, name in enumerate(self.order):
+            earlier = self.order[:position]
+            if concurrent:
+                earlier = [
+                    other for other in earlier
+                    if environments_conflict(orchestrators[name], orchestrators[other])
+                ]
+            # Without concurrency each environment waits for the one before it
+            self.dependencies[name] = earlier if concurrent else earlier[-1:]
+
+    def stages(self) -> List[List[str]]:
+        """Environments grouped by how many conflicting environments precede them, for logging."""
+        depth: Dict[str, int] = {}
+        for name in self.order:
+            depth[name] = 1 + max((depth[dep] for dep in self.dependencies[name]), default=-1)
+        stages: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for name in self.order:
+            stages[depth[name]].append(name)
+        return stages
+
+    async def run_round(self, run_environment: Callable[[str, Any], Awaitable[None]]):
+        """Call `run_environment(name, orchestrator)` for every environment, respecting dependencies."""
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(name: str):
+            dependencies = [tasks[dep] for dep in self.dependencies[name]]
+            if dependencies:
+                await asyncio.gather(*dependencies)
+            await run_environment(name, self.orchestrators[name])
+
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run(name), name=f"environment-{name}")
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            # One failed environment fails the round; do not leave the others running
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise